@@ -0,0 +1,141 @@
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Tuple, Union
+import logging
+
+from database import CrisisDatabase, get_database
+from normalization import NormalizedText
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for content addressing: no markup, NFKC, lower case, single spaces"""
+    return NormalizedText.of(text).lower
+
+
+def fingerprint(*parts: Any) -> str:
+    """Short stable hash of analyzer configuration (keyword lists, lexicons, model versions)"""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class AnalysisCache:
+    def __init__(self, version: Union[str, Callable[[], str]], db: CrisisDatabase = None,
+                 memory_entries: int = 4096):
+        """Persistent cache of article analysis results keyed by normalized text and analyzer version
+
+        The version is part of every key, so changing a keyword list or model gives
+        new keys and old results are never served; purge_stale removes them from disk.
+        A callable version is read on every lookup, so a model swapped in while the
+        process runs takes effect at once.
+        """
+        self._version = version
+        self.db = db or get_database()
+        self.memory_entries = memory_entries
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def version(self) -> str:
+        return self._version() if callable(self._version) else self._version
+
+    def key(self, text: str, version: str = None) -> str:
+        """Content address of a text under an analyzer version, the current one by default"""
+        digest = hashlib.sha256()
+        digest.update((version or self.version).encode('utf-8'))
+        digest.update(b'\x00')
+        digest.update(normalize_text(text).encode('utf-8'))
+        return digest.hexdigest()
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def get_many(self, texts: List[str], version: str = None) -> Dict[str, Dict[str, Any]]:
+        """Cached analyses for several texts with one database lookup, keyed by text"""
+        version = version or self.version
+        keys = {text: self.key(text, version) for text in texts}
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: Dict[str, str] = {}
+
+        with self._lock:
+            for text, key in keys.items():
+                result = self._memory.get(key)
+                if result is not None:
+                    self._memory.move_to_end(key)
+                    found[text] = dict(result)
+                else:
+                    missing[key] = text
+
+        if missing:
+            stored = self.db.get_analysis_results(list(missing))
+            for key, payload in stored.items():
+                try:
+                    result = json.loads(payload)
+                except ValueError:
+                    continue
+                self._remember(key, result)
+                found[missing[key]] = dict(result)
+
+        with self._lock:
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+
+        return found
+
+    def get(self, text: str) -> Optional[Dict[str, Any]]:
+        """Cached analysis for a text, None on a miss"""
+        return self.get_many([text]).get(text)
+
+    def put_many(self, items: List[Tuple[str, Dict[str, Any]]], version: str = None):
+        """Store analysis results for (text, result) pairs in one transaction
+
+        Pass the version read before the results were computed, so a model swapped in
+        meanwhile does not get the old model's results.
+        """
+        if not items:
+            return
+
+        version = version or self.version
+        rows = []
+        for text, result in items:
+            key = self.key(text, version)
+            self._remember(key, result)
+            rows.append((key, version, json.dumps(result, ensure_ascii=False)))
+
+        self.db.store_analysis_results(rows)
+
+    def put(self, text: str, result: Dict[str, Any]):
+        self.put_many([(text, result)])
+
+    def get_or_compute(self, text: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the cached analysis or compute and store it"""
+        result = self.get(text)
+        if result is None:
+            result = compute()
+            self.put(text, result)
+        return result
+
+    def purge_stale(self) -> int:
+        """Delete results written by other analyzer versions"""
+        return self.db.purge_analysis_results(self.version)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'version': self.version,
+                'memory_entries': len(self._memory),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / total * 100, 2) if total else 0.0
+            }
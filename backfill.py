@@ -0,0 +1,213 @@
+import json
+import time
+import argparse
+import multiprocessing
+from collections import deque
+from typing import List, Dict, Any, Optional, Tuple
+import logging
+
+from database import get_database, DEFAULT_DB_PATH
+from models import CrisisEvent
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Per-process classifier and language processor, built once by _init_worker
+_worker: Dict[str, Any] = {}
+
+
+def _build_analyzers():
+    from classification import CascadeClassifier
+    from language_processor import LanguageProcessor
+
+    processor = LanguageProcessor()
+    return CascadeClassifier(processor.crisis_terms), processor
+
+
+def _init_worker():
+    # Workers only report errors; progress is logged by the parent
+    logging.getLogger().setLevel(logging.WARNING)
+    _worker['classifier'], _worker['processor'] = _build_analyzers()
+
+
+def _source_text(event: CrisisEvent) -> str:
+    """Text as originally fetched; stored titles may be translations"""
+    return f"{event.display_title} {event.original_description or event.description or ''}"
+
+
+def _has_source_text(event: CrisisEvent) -> bool:
+    """False for translated rows stored before the original text was kept,
+    whose language cannot be detected from the English translation"""
+    return bool(event.original_title or event.original_description) \
+        or event.original_language in (None, '', 'English')
+
+
+def analyze_chunk(rows: List[Tuple[int, str]]) -> List[Optional[tuple]]:
+    """Classify, locate and detect the language of (id, text) rows
+
+    Returns one update tuple per row in apply_backfill_chunk's layout, or None for
+    rows the classifier no longer considers crisis-related.
+    """
+    from geocoding import extract_location, location_coordinates
+    from normalization import NormalizedText
+
+    classifier, processor = _worker['classifier'], _worker['processor']
+    views = [NormalizedText(text) for _, text in rows]
+    results = classifier.classify_batch(views)
+
+    updates = []
+    for (event_id, _), view, result in zip(rows, views, results):
+        if result is None:
+            updates.append(None)
+            continue
+        location = extract_location(view.lower)
+        latitude, longitude = location_coordinates(location)
+        updates.append((
+            result['type'], result['severity'], result['confidence'], ', '.join(result['keywords']),
+            location or 'India', latitude, longitude, processor.detect_language(view), event_id
+        ))
+    return updates
+
+
+def _stored(event: CrisisEvent) -> tuple:
+    """The row's current values in the layout of an update tuple, without the id"""
+    return (event.crisis_type, event.severity, event.confidence or 0.0, event.detected_keywords or '',
+            event.location, event.latitude, event.longitude, event.original_language)
+
+
+def _is_changed(event: CrisisEvent, update: tuple) -> bool:
+    """True if any analysed value differs from the stored row; floats within rounding"""
+    for stored, new in zip(_stored(event), update[:-1]):
+        if isinstance(new, float) and isinstance(stored, (int, float)):
+            if abs(stored - new) > 1e-6:
+                return True
+        elif stored != new:
+            return True
+    return False
+
+
+class Backfill:
+    def __init__(self, db_path: str = None, workers: int = None, chunk_size: int = 500,
+                 job: str = None, restart: bool = False, dry_run: bool = False):
+        """Reclassify stored crises with the current classifier and location tables
+
+        Rows are read in id order in chunks, analysed by a process pool and written
+        back one transaction per chunk together with the job's position, so an
+        interrupted run continues from the last written chunk. The job name defaults
+        to the classifier version: rerunning after a keyword or model change starts a
+        new job, rerunning without one resumes or finds the job already completed.
+        """
+        self.db = get_database(db_path)
+        self.workers = multiprocessing.cpu_count() if workers is None else workers
+        self.chunk_size = chunk_size
+        self.restart = restart
+        self.dry_run = dry_run
+
+        # Publish a model before the workers start, so they do not each train one
+        from ml_classifier import CrisisClassifier, model_version
+        if model_version() == 'untrained':
+            CrisisClassifier(follow=False)
+
+        classifier, _ = _build_analyzers()
+        self.version = classifier.version
+        self.job = job or f"reclassify-{self.version}"
+
+    def _chunks(self, last_id: int):
+        while True:
+            events = self.db.get_crises_after_id(last_id, self.chunk_size)
+            if not events:
+                return
+            last_id = events[-1].id
+            yield events
+
+    def _map(self, chunks):
+        """Yield (events, updates) in order, keeping a bounded number of chunks in flight"""
+        if self.workers <= 0:
+            _init_worker()
+            for events in chunks:
+                yield events, analyze_chunk([(e.id, _source_text(e)) for e in events])
+            return
+
+        context = multiprocessing.get_context('spawn')
+        with context.Pool(self.workers, initializer=_init_worker) as pool:
+            in_flight = deque()
+            for events in chunks:
+                in_flight.append((events, pool.apply_async(
+                    analyze_chunk, ([(e.id, _source_text(e)) for e in events],)
+                )))
+                if len(in_flight) >= self.workers * 2:
+                    events, result = in_flight.popleft()
+                    yield events, result.get()
+            while in_flight:
+                events, result = in_flight.popleft()
+                yield events, result.get()
+
+    def run(self) -> Dict[str, Any]:
+        if self.dry_run:
+            state = {'job': self.job, 'last_id': 0, 'processed': 0, 'changed': 0, 'status': 'dry-run'}
+        else:
+            state = self.db.start_backfill_job(self.job, self.version, self.restart)
+            if state['status'] == 'completed':
+                logger.info(f"Backfill {self.job} already completed; use --restart to run it again")
+                return state
+
+        remaining = self.db.count_crises_after_id(state['last_id'])
+        logger.info(f"Backfill {self.job}: {remaining} rows to process from id {state['last_id']} "
+                    f"with {self.workers or 'no'} workers")
+
+        started = time.time()
+        processed = changed = rejected = 0
+
+        for events, updates in self._map(self._chunks(state['last_id'])):
+            writes = []
+            for event, update in zip(events, updates):
+                if update is None:
+                    rejected += 1
+                else:
+                    if not _has_source_text(event):
+                        update = update[:7] + (event.original_language,) + update[8:]
+                    if _is_changed(event, update):
+                        writes.append(update)
+
+            if not self.dry_run:
+                self.db.apply_backfill_chunk(self.job, writes, events[-1].id, len(events), len(writes))
+
+            processed += len(events)
+            changed += len(writes)
+            elapsed = time.time() - started
+            rate = processed / elapsed if elapsed else 0.0
+            eta = (remaining - processed) / rate if rate else 0.0
+            logger.info(f"Backfill {self.job}: {processed}/{remaining} rows "
+                        f"({processed / remaining * 100 if remaining else 100:.1f}%), {changed} changed, "
+                        f"{rate:.0f} rows/s, ETA {eta:.0f}s")
+
+        if not self.dry_run:
+            self.db.finish_backfill_job(self.job)
+
+        summary = {
+            'job': self.job,
+            'version': self.version,
+            'processed': processed,
+            'changed': changed,
+            'rejected': rejected,
+            'seconds': round(time.time() - started, 2),
+            'dry_run': self.dry_run
+        }
+        if rejected:
+            logger.info(f"{rejected} rows no longer pass the crisis gate and were left unchanged")
+        return summary
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reclassify stored crisis reports with the current classifier")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database to backfill")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Worker processes (default: CPU count, 0 runs in this process)")
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--job', help="Job name to resume (default: derived from the classifier version)")
+    parser.add_argument('--restart', action='store_true', help="Start the job again from the first row")
+    parser.add_argument('--dry-run', action='store_true', help="Count changes without writing them")
+    args = parser.parse_args()
+
+    backfill = Backfill(args.db, args.workers, args.chunk_size, args.job, args.restart, args.dry_run)
+    print(json.dumps(backfill.run(), indent=2))
@@ -0,0 +1,254 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import tempfile
+import platform
+import tracemalloc
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'eval_corpus.jsonl')
+
+# Label used for texts that are not about a crisis
+NO_CRISIS = 'none'
+
+# (crisis_type, severity) predicted for one corpus item; crisis_type is NO_CRISIS when rejected
+Prediction = Tuple[str, Optional[str]]
+
+
+def load_corpus(path: str = DEFAULT_CORPUS) -> List[Dict[str, Any]]:
+    """Labeled items: text, language, crisis_type (null if not a crisis), severity, origin
+
+    origin is "synthetic" for template sentences, "handwritten" for headlines written
+    in the style of Indian news, and "bait" for non-crisis text using crisis words.
+    """
+    items = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                items.append(json.loads(line))
+    return items
+
+
+def _scratch_model():
+    """ML classifier on a copy of the current production version
+
+    The classifier publishes what it trains, so it gets a scratch registry; the
+    production registry is only read.
+    """
+    from ml_classifier import CrisisClassifier
+    from model_registry import ModelRegistry, DEFAULT_MODEL_DIR
+
+    scratch = tempfile.mkdtemp(prefix='crisis-benchmark-models-')
+    try:
+        registry = ModelRegistry(scratch)
+        loaded = ModelRegistry(DEFAULT_MODEL_DIR).load() if os.path.isdir(DEFAULT_MODEL_DIR) else None
+        if loaded:
+            _, (crisis_model, severity_model), metadata = loaded
+            registry.publish(crisis_model, severity_model, metadata)
+        return CrisisClassifier(registry=registry, follow=False)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _cascade_runner() -> Tuple[Callable, Callable]:
+    from classification import CascadeClassifier
+    from language_processor import LanguageProcessor
+
+    classifier = CascadeClassifier(LanguageProcessor().crisis_terms, model=_scratch_model())
+
+    def convert(result) -> Prediction:
+        return (result['type'], result['severity']) if result else (NO_CRISIS, None)
+
+    def predict_one(item):
+        return convert(classifier.classify(item['text']))
+
+    def predict_batch(items):
+        return [convert(r) for r in classifier.classify_batch([item['text'] for item in items])]
+
+    return predict_one, predict_batch
+
+
+def _ml_runner() -> Tuple[Callable, Callable]:
+    classifier = _scratch_model()
+
+    def predict_one(item) -> Prediction:
+        result = classifier.classify_crisis(item['text'])
+        if not result['is_crisis']:
+            return NO_CRISIS, None
+        return str(result['crisis_type']), str(result['severity'])
+
+    return predict_one, None
+
+
+def _regional_runner() -> Tuple[Callable, Callable]:
+    from language_processor import LanguageProcessor
+
+    processor = LanguageProcessor()
+
+    def predict_one(item) -> Prediction:
+        result = processor.detect_crisis_in_regional_text(item['text'], item.get('language'))
+        if not result['is_crisis']:
+            return NO_CRISIS, None
+        # The detector returns every matching type; take a deterministic one
+        return sorted(result['crisis_types'])[0], None
+
+    return predict_one, None
+
+
+CLASSIFIERS = {
+    'cascade': _cascade_runner,
+    'ml_classifier': _ml_runner,
+    'regional_lexicon': _regional_runner
+}
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+def _quality(items: List[Dict[str, Any]], predictions: List[Prediction]) -> Dict[str, Any]:
+    """Accuracy and per-class precision/recall of crisis type; severity accuracy on crisis items"""
+    true_positive = defaultdict(int)
+    predicted = defaultdict(int)
+    actual = defaultdict(int)
+    correct = 0
+    severity_total = severity_correct = 0
+
+    for item, (crisis_type, severity) in zip(items, predictions):
+        expected = item.get('crisis_type') or NO_CRISIS
+        actual[expected] += 1
+        predicted[crisis_type] += 1
+        if crisis_type == expected:
+            true_positive[expected] += 1
+            correct += 1
+        if item.get('severity') and severity is not None:
+            severity_total += 1
+            severity_correct += int(severity == item['severity'])
+
+    per_class = {}
+    for label in sorted(set(actual) | set(predicted)):
+        per_class[label] = {
+            'precision': round(true_positive[label] / predicted[label], 4) if predicted[label] else 0.0,
+            'recall': round(true_positive[label] / actual[label], 4) if actual[label] else 0.0,
+            'support': actual[label]
+        }
+
+    return {
+        'accuracy': round(correct / len(items), 4) if items else 0.0,
+        'severity_accuracy': round(severity_correct / severity_total, 4) if severity_total else None,
+        'per_class': per_class
+    }
+
+
+def benchmark_classifier(name: str, items: List[Dict[str, Any]], repeat: int = 5) -> Dict[str, Any]:
+    """Throughput, latency percentiles, peak memory and quality of one classifier"""
+    started = time.perf_counter()
+    predict_one, predict_batch = CLASSIFIERS[name]()
+    setup_seconds = time.perf_counter() - started
+
+    # Warm-up pass also provides the predictions scored for quality
+    predictions = [predict_one(item) for item in items]
+
+    latencies = []
+    for _ in range(repeat):
+        for item in items:
+            started = time.perf_counter()
+            predict_one(item)
+            latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    item_seconds = sum(latencies)
+
+    result = {
+        'items': len(items) * repeat,
+        'setup_seconds': round(setup_seconds, 4),
+        'throughput_per_sec': round(len(latencies) / item_seconds, 1) if item_seconds else None,
+        'latency_ms': {
+            'p50': round(_percentile(latencies, 50) * 1000, 4),
+            'p99': round(_percentile(latencies, 99) * 1000, 4),
+            'mean': round(item_seconds / len(latencies) * 1000, 4) if latencies else 0.0
+        }
+    }
+
+    if predict_batch is not None:
+        started = time.perf_counter()
+        for _ in range(repeat):
+            predict_batch(items)
+        batch_seconds = time.perf_counter() - started
+        result['batch_throughput_per_sec'] = round(len(items) * repeat / batch_seconds, 1) if batch_seconds else None
+
+    # Separate pass, since tracing allocations slows everything down
+    tracemalloc.start()
+    for item in items:
+        predict_one(item)
+    result['peak_memory_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+    tracemalloc.stop()
+
+    result.update(_quality(items, predictions))
+    return result
+
+
+def run(corpus_path: str = DEFAULT_CORPUS, classifiers: List[str] = None,
+        repeat: int = 5) -> Dict[str, Any]:
+    items = load_corpus(corpus_path)
+    with open(corpus_path, 'rb') as f:
+        corpus_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+
+    languages = defaultdict(int)
+    origins = defaultdict(int)
+    for item in items:
+        languages[item.get('language', 'English')] += 1
+        origins[item.get('origin', 'unknown')] += 1
+
+    report = {
+        'corpus': {
+            'path': os.path.basename(corpus_path),
+            'sha256': corpus_hash,
+            'items': len(items),
+            'languages': dict(sorted(languages.items())),
+            'origins': dict(sorted(origins.items()))
+        },
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform()
+        },
+        'repeat': repeat,
+        'classifiers': {}
+    }
+
+    for name in classifiers or list(CLASSIFIERS):
+        try:
+            report['classifiers'][name] = benchmark_classifier(name, items, repeat)
+        except Exception as e:
+            logger.error(f"Benchmark of {name} failed: {e}")
+            report['classifiers'][name] = {'error': str(e)}
+
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark speed and accuracy of the CrisisRadar classifiers")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS, help="Labeled JSONL evaluation corpus")
+    parser.add_argument('--classifiers', nargs='*', choices=list(CLASSIFIERS.keys()),
+                        help="Classifiers to benchmark (default: all)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed passes over the corpus")
+    parser.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args.corpus, args.classifiers, args.repeat), indent=2, sort_keys=True, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(report + '\n')
+    else:
+        sys.stdout.write(report + '\n')
@@ -0,0 +1,172 @@
+import time
+import threading
+from typing import Dict, Any, Optional
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Weight of the latest call in the latency average
+LATENCY_ALPHA = 0.2
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose circuit is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open, retry in {retry_in:.0f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 60.0,
+                 max_reset_timeout: float = 3600.0):
+        """Per-source circuit breaker driven by the outcome of real calls
+
+        After failure_threshold consecutive failures (timeouts, connection errors,
+        5xx) the circuit opens and calls fail immediately without touching the
+        network. A 429 opens it at once, for at least the Retry-After period. Once
+        reset_timeout has passed a single probe call is let through (half-open):
+        success closes the circuit, failure opens it again for twice as long, up to
+        max_reset_timeout.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._open_until = 0.0
+        self._current_timeout = reset_timeout
+        self._probing = False
+        self._rate_limited = False
+
+        # Passive health statistics
+        self.calls = 0
+        self.failures = 0
+        self.rejected = 0
+        self.consecutive_failures = 0
+        self.avg_latency: Optional[float] = None
+        self.last_success_at: Optional[float] = None
+        self.last_failure_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.time())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now >= self._open_until:
+            return HALF_OPEN
+        return self._state
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError; in half-open only one probe is admitted"""
+        now = time.time()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                logger.info(f"{self.name} circuit half-open, probing")
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.name, max(self._open_until - now, 0.0))
+
+    def record_success(self, latency: float = None):
+        with self._lock:
+            self._observe(latency)
+            self.last_success_at = time.time()
+            self.consecutive_failures = 0
+            if self._state != CLOSED or self._probing:
+                logger.info(f"{self.name} circuit closed")
+            self._state = CLOSED
+            self._probing = False
+            self._rate_limited = False
+            self._current_timeout = self.reset_timeout
+
+    def record_failure(self, error: str, latency: float = None, retry_after: float = None):
+        """Count a failed call; retry_after (a 429) opens the circuit immediately"""
+        now = time.time()
+        with self._lock:
+            self._observe(latency)
+            self.failures += 1
+            self.consecutive_failures += 1
+            self.last_failure_at = now
+            self.last_error = error[:200]
+
+            if self._probing or self._state != CLOSED:
+                # Failed probe: back off further
+                self._current_timeout = min(self._current_timeout * 2, self.max_reset_timeout)
+            elif retry_after is None and self.consecutive_failures < self.failure_threshold:
+                return
+
+            timeout = self._current_timeout
+            if retry_after is not None:
+                timeout = min(max(timeout, retry_after), self.max_reset_timeout)
+            self._state = OPEN
+            self._probing = False
+            self._rate_limited = retry_after is not None
+            self._open_until = now + timeout
+        logger.warning(f"{self.name} circuit open for {timeout:.0f}s: {error}")
+
+    def _observe(self, latency: Optional[float]):
+        self.calls += 1
+        if latency is not None:
+            self.avg_latency = latency if self.avg_latency is None else \
+                LATENCY_ALPHA * latency + (1 - LATENCY_ALPHA) * self.avg_latency
+
+    def reset(self):
+        """Close the circuit without waiting for a probe"""
+        with self._lock:
+            self._state = CLOSED
+            self._probing = False
+            self._rate_limited = False
+            self.consecutive_failures = 0
+            self._current_timeout = self.reset_timeout
+
+    def get_status(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            state = self._current_state(now)
+            return {
+                'state': state,
+                'rate_limited': self._rate_limited and state != CLOSED,
+                'retry_in': round(max(self._open_until - now, 0.0), 1) if state == OPEN else 0.0,
+                'calls': self.calls,
+                'failures': self.failures,
+                'rejected': self.rejected,
+                'consecutive_failures': self.consecutive_failures,
+                'success_rate': round((self.calls - self.failures) / self.calls * 100, 1) if self.calls else None,
+                'avg_latency': round(self.avg_latency, 3) if self.avg_latency is not None else None,
+                'last_success_at': self.last_success_at,
+                'last_failure_at': self.last_failure_at,
+                'last_error': self.last_error
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for a source"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Status of every breaker created in this process"""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.get_status() for breaker in breakers}
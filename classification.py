@@ -0,0 +1,337 @@
+import re
+import time
+import threading
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Union
+import logging
+
+from analysis_cache import fingerprint
+from features import SEVERITY_INDICATORS, SeverityFeatures, get_feature_extractor
+from normalization import NormalizedText
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Bump when the cascade logic changes in a way that alters results
+CASCADE_VERSION = 3
+
+# Crisis type mapping with expanded keywords
+CRISIS_PATTERNS = {
+    'flood': ['flood', 'flooding', 'inundation', 'waterlogging', 'deluge', 'submerg', 'overflow'],
+    'earthquake': ['earthquake', 'quake', 'tremor', 'seismic', 'magnitude', 'epicenter', 'aftershock'],
+    'cyclone': ['cyclone', 'hurricane', 'typhoon', 'storm', 'tempest', 'wind speed', 'landfall'],
+    'fire': ['fire', 'wildfire', 'blaze', 'burning', 'arson', 'flame', 'smoke'],
+    'drought': ['drought', 'water shortage', 'dry spell', 'arid', 'scarcity', 'reservoir low'],
+    'landslide': ['landslide', 'mudslide', 'rockfall', 'slope failure', 'hill collapse'],
+    'storm': ['thunderstorm', 'lightning', 'hailstorm', 'dust storm', 'squall'],
+    'accident': ['accident', 'crash', 'collision', 'derailment', 'explosion', 'collapse', 'building fall']
+}
+
+# General crisis vocabulary, also used to build news API queries
+CRISIS_KEYWORDS = [
+    'flood', 'flooding', 'inundation', 'waterlogging', 'deluge',
+    'earthquake', 'quake', 'tremor', 'seismic', 'magnitude',
+    'cyclone', 'hurricane', 'typhoon', 'storm', 'tempest',
+    'fire', 'wildfire', 'blaze', 'burning', 'arson',
+    'drought', 'water shortage', 'dry spell', 'arid',
+    'landslide', 'mudslide', 'rockfall', 'slope failure',
+    'accident', 'crash', 'collision', 'explosion', 'collapse',
+    'disaster', 'emergency', 'calamity', 'catastrophe',
+    'evacuation', 'rescue', 'relief', 'alert', 'warning'
+]
+
+# Words that make a text crisis-related even without a crisis type keyword
+EMERGENCY_WORDS = ['emergency', 'alert', 'warning', 'evacuate', 'rescue', 'damage', 'injured', 'killed', 'destroyed']
+
+# Words that raise confidence in a detection
+CONFIDENCE_BOOSTERS = ['emergency', 'alert', 'rescue', 'evacuate']
+
+DEFAULT_CRISIS_TYPE = 'accident'
+DEFAULT_SEVERITY = 'low'
+
+STAGES = ('gate', 'rules', 'lexicon', 'model')
+
+
+def _compile_terms(terms) -> re.Pattern:
+    """One alternation over literal terms, longest first so overlapping terms prefer the longer"""
+    unique = sorted({term.lower() for term in terms if term}, key=len, reverse=True)
+    return re.compile('|'.join(re.escape(term) for term in unique))
+
+
+def keyword_confidence(text_lower: str, extra_indicators: int = 0) -> float:
+    """Confidence from the number of crisis and emergency words in a text"""
+    total_indicators = sum(1 for kw in CRISIS_KEYWORDS if kw in text_lower) + extra_indicators
+    emergency_indicators = sum(1 for word in CONFIDENCE_BOOSTERS if word in text_lower)
+    return min(0.4 + (total_indicators * 0.15) + (emergency_indicators * 0.1), 1.0)
+
+
+class CascadeClassifier:
+    def __init__(self, regional_lexicons: Dict[str, Dict[str, List[str]]] = None,
+                 rule_min_matches: int = 2, model_min_confidence: float = 0.5,
+                 model_batch_size: int = 64, model=None):
+        """Single classification pipeline for crisis type, severity and confidence
+
+        Stages run cheapest first and each item leaves at the first stage that is sure:
+        a compiled keyword gate rejects obvious non-crisis text, English rules settle
+        texts whose best crisis type has at least rule_min_matches keywords and a clear
+        lead, regional lexicons (language code -> crisis type -> terms) settle Indian
+        language text, and only the remaining ambiguous items go to the ML model, in
+        batches of model_batch_size. The model is the process-wide CrisisClassifier,
+        loaded on first use, unless one is given.
+        """
+        self.rule_min_matches = rule_min_matches
+        self.model_min_confidence = model_min_confidence
+        self.model_batch_size = model_batch_size
+
+        # English is covered by the rule tables; the lexicon stage is for other scripts
+        lexicons = {code: terms for code, terms in (regional_lexicons or {}).items() if code != 'en'}
+        self._lexicon_terms: Dict[str, List[str]] = defaultdict(list)
+        for terms_by_type in lexicons.values():
+            for crisis_type, terms in terms_by_type.items():
+                self._lexicon_terms[crisis_type].extend(term.lower() for term in terms)
+
+        gate_terms = list(CRISIS_KEYWORDS) + EMERGENCY_WORDS
+        for keywords in CRISIS_PATTERNS.values():
+            gate_terms.extend(keywords)
+        for terms in self._lexicon_terms.values():
+            gate_terms.extend(terms)
+        self._gate = _compile_terms(gate_terms)
+        self.extractor = get_feature_extractor()
+        self._lexicon_gate = _compile_terms(
+            [term for terms in self._lexicon_terms.values() for term in terms]
+        ) if self._lexicon_terms else None
+
+        # The model version is added on every read, as new versions are swapped in while running
+        self._config_version = fingerprint(
+            CASCADE_VERSION, CRISIS_PATTERNS, SEVERITY_INDICATORS, CRISIS_KEYWORDS,
+            EMERGENCY_WORDS, CONFIDENCE_BOOSTERS, lexicons, rule_min_matches,
+            model_min_confidence
+        )
+
+        self._model = model
+        self._model_failed = False
+        self._model_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._items = 0
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._seconds: Dict[str, float] = defaultdict(float)
+        self._model_batches = 0
+        self._fallbacks = 0
+
+    @property
+    def version(self) -> str:
+        """Fingerprint of the rules, lexicons and the model version serving right now"""
+        return fingerprint(self._config_version, self._model_version())
+
+    def _model_version(self) -> str:
+        model = self._model
+        if model is not None:
+            return str(model.version) if model.version is not None else 'untrained'
+        if self._model_failed:
+            return 'unavailable'
+        # Not loaded yet; it will load the registry's current version
+        try:
+            from ml_classifier import model_version
+        except ImportError:
+            return 'unavailable'
+        return model_version()
+
+    def _get_model(self):
+        """Load the ML classifier on first use; None if it cannot be loaded"""
+        with self._model_lock:
+            if self._model is None and not self._model_failed:
+                try:
+                    from ml_classifier import get_crisis_classifier
+                    self._model = get_crisis_classifier()
+                except Exception as e:
+                    logger.error(f"ML classifier unavailable, ambiguous items use rules only: {e}")
+                    self._model_failed = True
+            return self._model
+
+    def passes_gate(self, text: Union[str, NormalizedText]) -> bool:
+        """Cheap check that a text mentions any crisis, emergency or regional crisis term"""
+        return self._gate.search(NormalizedText.of(text).lower) is not None
+
+    def _rules(self, text_lower: str, features: SeverityFeatures) -> Dict[str, Any]:
+        """Keyword scores per crisis type and the severity indicated by the text"""
+        scores = []
+        for crisis_type, keywords in CRISIS_PATTERNS.items():
+            matched = [kw for kw in keywords if kw in text_lower]
+            if matched:
+                scores.append((len(matched), crisis_type, matched))
+        # Stable sort, so the type listed first wins a tie
+        scores.sort(key=lambda score: -score[0])
+
+        # Severity words first, then reported casualties, magnitude, wind or rain
+        severity, severity_keywords = features.severity_level(SEVERITY_INDICATORS)
+        severity = severity or features.quantity_severity()
+
+        return {'scores': scores, 'severity': severity, 'severity_keywords': severity_keywords}
+
+    def _is_confident(self, scores) -> bool:
+        if not scores or scores[0][0] < self.rule_min_matches:
+            return False
+        return len(scores) == 1 or scores[0][0] > scores[1][0]
+
+    def _lexicon(self, text_lower: str) -> Optional[Dict[str, Any]]:
+        """Crisis type from regional language terms, None if the text has none"""
+        if self._lexicon_gate is None or not self._lexicon_gate.search(text_lower):
+            return None
+        best_type, best_matched = None, []
+        for crisis_type, terms in self._lexicon_terms.items():
+            matched = [term for term in terms if term in text_lower]
+            if len(matched) > len(best_matched):
+                best_type, best_matched = crisis_type, matched
+        return {'type': best_type, 'keywords': best_matched} if best_type else None
+
+    @staticmethod
+    def _result(crisis_type: str, severity: Optional[str], confidence: float,
+                keywords: List[str], stage: str) -> Dict[str, Any]:
+        return {
+            'type': crisis_type,
+            'severity': severity or DEFAULT_SEVERITY,
+            'confidence': round(confidence, 4),
+            'keywords': list(dict.fromkeys(keywords)),
+            'stage': stage
+        }
+
+    def classify_batch(self, texts: List[Union[str, NormalizedText]]) -> List[Optional[Dict[str, Any]]]:
+        """Classify texts in order; texts rejected by the gate give None
+
+        Texts may be passed already normalized (Article.normalized), so they are
+        not lower-cased again.
+
+        Results carry type, severity, confidence, keywords and the stage that
+        decided them.
+        """
+        results: List[Optional[Dict[str, Any]]] = [None] * len(texts)
+        ambiguous = []
+        hits: Dict[str, int] = defaultdict(int)
+        seconds: Dict[str, float] = defaultdict(float)
+
+        started = time.perf_counter()
+        survivors = []
+        for index, text in enumerate(texts):
+            view = NormalizedText.of(text)
+            if self._gate.search(view.lower) is not None:
+                survivors.append((index, view))
+        hits['gate'] = len(texts) - len(survivors)
+        seconds['gate'] += time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch_features = self.extractor.extract_batch([view for _, view in survivors])
+        seconds['rules'] += time.perf_counter() - started
+
+        for (index, view), features in zip(survivors, batch_features):
+            text, text_lower = view.clean, view.lower
+            started = time.perf_counter()
+            rules = self._rules(text_lower, features)
+            scores = rules['scores']
+            if self._is_confident(scores):
+                _, crisis_type, matched = scores[0]
+                results[index] = self._result(
+                    crisis_type, rules['severity'], keyword_confidence(text_lower),
+                    matched + rules['severity_keywords'], 'rules'
+                )
+                hits['rules'] += 1
+                seconds['rules'] += time.perf_counter() - started
+                continue
+            seconds['rules'] += time.perf_counter() - started
+
+            started = time.perf_counter()
+            regional = self._lexicon(text_lower) if not scores else None
+            seconds['lexicon'] += time.perf_counter() - started
+            if regional:
+                results[index] = self._result(
+                    regional['type'], rules['severity'],
+                    keyword_confidence(text_lower, len(regional['keywords'])),
+                    regional['keywords'] + rules['severity_keywords'], 'lexicon'
+                )
+                hits['lexicon'] += 1
+                continue
+
+            ambiguous.append((index, text, text_lower, rules))
+
+        started = time.perf_counter()
+        batches = self._classify_ambiguous(ambiguous, results)
+        seconds['model'] += time.perf_counter() - started
+        hits['model'] += sum(1 for index, *_ in ambiguous if results[index]['stage'] == 'model')
+        fallbacks = len(ambiguous) - hits['model']
+
+        with self._stats_lock:
+            self._items += len(texts)
+            for stage, count in hits.items():
+                self._hits[stage] += count
+            for stage, elapsed in seconds.items():
+                self._seconds[stage] += elapsed
+            self._model_batches += batches
+            self._fallbacks += fallbacks
+
+        return results
+
+    def _classify_ambiguous(self, ambiguous, results) -> int:
+        """Run the ML model over ambiguous items in batches; returns the number of batches"""
+        model = self._get_model() if ambiguous else None
+        batches = 0
+
+        for start in range(0, len(ambiguous), self.model_batch_size):
+            chunk = ambiguous[start:start + self.model_batch_size]
+            predictions = [None] * len(chunk)
+            if model is not None:
+                try:
+                    predictions = model.predict_batch([text for _, text, _, _ in chunk])
+                    batches += 1
+                except Exception as e:
+                    logger.error(f"ML batch classification failed: {e}")
+
+            for (index, _, text_lower, rules), prediction in zip(chunk, predictions):
+                scores = rules['scores']
+                rule_type = scores[0][1] if scores else DEFAULT_CRISIS_TYPE
+                matched = scores[0][2] if scores else []
+                confidence = keyword_confidence(text_lower)
+
+                if prediction and prediction['crisis_confidence'] >= self.model_min_confidence:
+                    # Rule matches for the predicted type still count as evidence
+                    model_keywords = next((kws for _, t, kws in scores if t == prediction['crisis_type']), [])
+                    results[index] = self._result(
+                        prediction['crisis_type'],
+                        rules['severity'] or prediction['severity'],
+                        (confidence + prediction['crisis_confidence']) / 2,
+                        model_keywords + rules['severity_keywords'], 'model'
+                    )
+                else:
+                    results[index] = self._result(
+                        rule_type, rules['severity'], confidence,
+                        matched + rules['severity_keywords'], 'fallback'
+                    )
+
+        return batches
+
+    def classify(self, text: Union[str, NormalizedText]) -> Optional[Dict[str, Any]]:
+        """Classify a single text, None if the gate rejects it"""
+        return self.classify_batch([text])[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Items decided per stage as a share of all items, with time spent per stage
+
+        For the gate, hits are the texts it rejected.
+        """
+        with self._stats_lock:
+            total = self._items
+            stages = {}
+            for stage in STAGES:
+                stages[stage] = {
+                    'hits': self._hits[stage],
+                    'hit_rate': round(self._hits[stage] / total * 100, 2) if total else 0.0,
+                    'seconds': round(self._seconds[stage], 4)
+                }
+            return {
+                'version': self.version,
+                'items': total,
+                'stages': stages,
+                'model_batches': self._model_batches,
+                'fallbacks': self._fallbacks,
+                'fallback_rate': round(self._fallbacks / total * 100, 2) if total else 0.0,
+                'model_loaded': self._model is not None
+            }
@@ -1,8 +1,6 @@
 import streamlit as st
 import plotly.graph_objects as go
-import requests
 import json
-import sqlite3
 import logging
 import os
 import time
@@ -11,6 +9,24 @@ from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 from language_processor import LanguageProcessor
+from database import get_database
+from telemetry import get_telemetry
+from models import Article, CrisisEvent, WeatherAlert
+from normalization import NormalizedText
+from dedup import get_deduplicator
+from incidents import get_incident_tracker
+from sms_alerts import SMSAlerter
+from analysis_cache import AnalysisCache, fingerprint
+from classification import CascadeClassifier, CRISIS_KEYWORDS
+from geocoding import INDIAN_COORDINATES, INDIAN_STATES, CITY_VARIATIONS, extract_location, location_coordinates
+from pipeline import CrisisIngestion
+from scheduler import PollingScheduler
+from circuit_breaker import CircuitOpenError, OPEN, HALF_OPEN, CLOSED
+from http_client import get_http_client
+from pagination import collect_pages, DEFAULT_PAGE_BUDGETS, RSS_ENTRY_BUDGET, NEWSAPI_MAX_RESULTS
+from seen_filter import get_seen_filter
+from ingest_server import start_ingest_server
+from utils import normalize_phone_number
 
 # Load environment variables
 load_dotenv()
@@ -104,45 +120,12 @@ def load_custom_css():
     </style>
     """, unsafe_allow_html=True)
 
-# Indian coordinates database
-INDIAN_COORDINATES = {
-    'mumbai': (19.0760, 72.8777), 'delhi': (28.6139, 77.2090), 
-    'bangalore': (12.9716, 77.5946), 'hyderabad': (17.3850, 78.4867),
-    'ahmedabad': (23.0225, 72.5714), 'chennai': (13.0827, 80.2707),
-    'kolkata': (22.5726, 88.3639), 'pune': (18.5204, 73.8567),
-    'jaipur': (26.9124, 75.7873), 'lucknow': (26.8467, 80.9462),
-    'kanpur': (26.4499, 80.3319), 'nagpur': (21.1458, 79.0882),
-    'indore': (22.7196, 75.8577), 'bhopal': (23.2599, 77.4126),
-    'visakhapatnam': (17.6868, 83.2185), 'patna': (25.5941, 85.1376),
-    'vadodara': (22.3072, 73.1812), 'ludhiana': (30.9010, 75.8573),
-    'agra': (27.1767, 78.0081), 'nashik': (19.9975, 73.7898),
-    'srinagar': (34.0837, 74.7973), 'guwahati': (26.1445, 91.7362),
-    'chandigarh': (30.7333, 76.7794), 'thiruvananthapuram': (8.5241, 76.9366),
-    'bhubaneswar': (20.2961, 85.8245), 'mysore': (12.2958, 76.6394),
-    'goa': (15.2993, 74.1240), 'coimbatore': (11.0168, 76.9558),
-    'madurai': (9.9252, 78.1198), 'varanasi': (25.3176, 82.9739),
-    'allahabad': (25.4358, 81.8463), 'jodhpur': (26.2389, 73.0243),
-    'kochi': (9.9312, 76.2673), 'vijayawada': (16.5062, 80.6480)
-}
+# How far back new stories are compared against earlier ones for near-duplicates
+DEDUP_WINDOW_HOURS = 24
+
+# Bump when the analysis code changes in a way the keyword tables do not capture
+ANALYSIS_VERSION = 2
 
-# Indian states data
-INDIAN_STATES = {
-    'Andhra Pradesh': (15.9129, 79.7400), 'Arunachal Pradesh': (28.2180, 94.7278),
-    'Assam': (26.2006, 92.9376), 'Bihar': (25.0961, 85.3131),
-    'Chhattisgarh': (21.2787, 81.8661), 'Goa': (15.2993, 74.1240),
-    'Gujarat': (22.2587, 71.1924), 'Haryana': (29.0588, 76.0856),
-    'Himachal Pradesh': (31.1048, 77.1734), 'Jharkhand': (23.6102, 85.2799),
-    'Karnataka': (15.3173, 75.7139), 'Kerala': (10.8505, 76.2711),
-    'Madhya Pradesh': (22.9734, 78.6569), 'Maharashtra': (19.7515, 75.7139),
-    'Manipur': (24.6637, 93.9063), 'Meghalaya': (25.4670, 91.3662),
-    'Mizoram': (23.1645, 92.9376), 'Nagaland': (26.1584, 94.5624),
-    'Odisha': (20.9517, 85.0985), 'Punjab': (31.1471, 75.3412),
-    'Rajasthan': (27.0238, 74.2179), 'Sikkim': (27.5330, 88.5122),
-    'Tamil Nadu': (11.1271, 78.6569), 'Telangana': (18.1124, 79.0193),
-    'Tripura': (23.9408, 91.9882), 'Uttarakhand': (30.0668, 79.0193),
-    'Uttar Pradesh': (26.8467, 80.9462), 'West Bengal': (22.9868, 87.8550),
-    'Delhi': (28.6139, 77.2090)
-}
 
 class CrisisRadarSystem:
     def __init__(self):
@@ -154,21 +137,16 @@ class CrisisRadarSystem:
         # Initialize LanguageProcessor for multilingual support
         self.language_processor = LanguageProcessor()
         
-        self.crisis_keywords = [
-            'flood', 'flooding', 'inundation', 'waterlogging', 'deluge',
-            'earthquake', 'quake', 'tremor', 'seismic', 'magnitude',
-            'cyclone', 'hurricane', 'typhoon', 'storm', 'tempest',
-            'fire', 'wildfire', 'blaze', 'burning', 'arson',
-            'drought', 'water shortage', 'dry spell', 'arid',
-            'landslide', 'mudslide', 'rockfall', 'slope failure',
-            'accident', 'crash', 'collision', 'explosion', 'collapse',
-            'disaster', 'emergency', 'calamity', 'catastrophe',
-            'evacuation', 'rescue', 'relief', 'alert', 'warning'
-        ]
-        
-        # Enhanced Indian location terms
+        self.crisis_keywords = list(CRISIS_KEYWORDS)
+        
+        # Keyword gate, rules, regional lexicons and the ML model as one cascade
+        self.classifier = CascadeClassifier(self.language_processor.crisis_terms)
+        
+        # Enhanced Indian location terms, including native spellings so regional
+        # language stories reach the lexicon stage
         self.indian_terms = [
-            'india', 'indian', 'bharath', 'bharat', 'hindustan'
+            'india', 'indian', 'bharath', 'bharat', 'hindustan',
+            'भारत', 'ভারত', 'இந்தியா', 'భారత'
         ] + list(INDIAN_COORDINATES.keys()) + [s.lower() for s in INDIAN_STATES.keys()]
         
         # RSS feeds for government alerts
@@ -180,471 +158,284 @@ class CrisisRadarSystem:
             'NDTV': 'https://feeds.feedburner.com/ndtvnews-india-news'
         }
         
-        self.init_database()
-    
-    def init_database(self):
-        """Initialize SQLite database with proper schema"""
-        try:
-            conn = sqlite3.connect('crisis_radar_production.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS crisis_events (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    crisis_type TEXT,
-                    severity TEXT,
-                    location TEXT,
-                    latitude REAL,
-                    longitude REAL,
-                    source TEXT,
-                    confidence REAL,
-                    url TEXT,
-                    detected_keywords TEXT,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS weather_alerts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    city TEXT,
-                    temperature REAL,
-                    description TEXT,
-                    wind_speed REAL,
-                    severity TEXT,
-                    latitude REAL,
-                    longitude REAL,
-                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sms_users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    phone TEXT UNIQUE,
-                    location TEXT,
-                    radius INTEGER DEFAULT 50,
-                    language TEXT DEFAULT 'English',
-                    registered_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
-            logger.info("Database initialized successfully")
-        except Exception as e:
-            logger.error(f"Database initialization error: {e}")
-    
-    def test_api_connections(self):
-        """Test all API connections and return detailed status"""
-        status = {}
+        # Shared storage layer (same database as CrisisDatabase and SMSAlerter)
+        self.db = get_database()
         
-        # Test MediaStack (most reliable)
-        if self.mediastack_key:
-            try:
-                response = requests.get(
-                    f"http://api.mediastack.com/v1/news?access_key={self.mediastack_key}&countries=in&limit=1",
-                    timeout=10
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'data' in data and len(data['data']) > 0:
-                        status['MediaStack'] = f"Connected - {len(data['data'])} articles available"
-                    else:
-                        status['MediaStack'] = "Connected but no data"
-                else:
-                    status['MediaStack'] = f"Error {response.status_code}"
-                logger.info(f"MediaStack Status: {status['MediaStack']}")
-            except Exception as e:
-                status['MediaStack'] = f'Connection Failed: {str(e)}'
-                logger.error(f"MediaStack Error: {e}")
-        else:
-            status['MediaStack'] = 'No API Key'
+        # Buffered API usage recording for every outbound call
+        self.telemetry = get_telemetry(self.db)
         
-        # Test NewsData.io
-        if self.newsdata_key:
-            try:
-                response = requests.get(
-                    f"https://newsdata.io/api/1/news?apikey={self.newsdata_key}&country=in&size=1",
-                    timeout=10
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'results' in data:
-                        status['NewsData.io'] = f"Connected - {len(data['results'])} articles"
-                    else:
-                        status['NewsData.io'] = "Connected but no results"
-                else:
-                    status['NewsData.io'] = f"Error {response.status_code}"
-                logger.info(f"NewsData.io Status: {status['NewsData.io']}")
-            except Exception as e:
-                status['NewsData.io'] = f'Connection Failed: {str(e)}'
-                logger.error(f"NewsData.io Error: {e}")
-        else:
-            status['NewsData.io'] = 'No API Key'
+        # Pooled HTTP with a circuit breaker per source; dead sources are skipped without waiting
+        self.http = get_http_client(self.telemetry)
         
-        # Test NewsAPI (might be rate limited)
-        if self.newsapi_key:
-            try:
-                response = requests.get(
-                    f"https://newsapi.org/v2/top-headlines?country=in&apiKey={self.newsapi_key}",
-                    timeout=10
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    status['NewsAPI'] = f"Connected - {len(data.get('articles', []))} articles"
-                elif response.status_code == 429:
-                    status['NewsAPI'] = "Rate Limited (Free tier exhausted)"
-                else:
-                    status['NewsAPI'] = f"Error {response.status_code}"
-                logger.info(f"NewsAPI Status: {status['NewsAPI']}")
-            except Exception as e:
-                status['NewsAPI'] = f'Connection Failed: {str(e)}'
-                logger.error(f"NewsAPI Error: {e}")
-        else:
-            status['NewsAPI'] = 'No API Key'
+        # Sources are read page by page until stories already seen, within a page budget per cycle;
+        # items seen in earlier cycles (persistent Bloom filter) are dropped right after fetch
+        self.seen_items = get_seen_filter(self.db)
+        self.page_budgets = dict(DEFAULT_PAGE_BUDGETS)
         
-        # Test Weatherstack
-        if self.weatherstack_key:
-            try:
-                response = requests.get(
-                    f"http://api.weatherstack.com/current?access_key={self.weatherstack_key}&query=Delhi",
-                    timeout=10
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    if 'current' in data:
-                        status['Weatherstack'] = "Connected - Weather data available"
-                    else:
-                        status['Weatherstack'] = "Connected but no weather data"
-                else:
-                    status['Weatherstack'] = f"Error {response.status_code}"
-                logger.info(f"Weatherstack Status: {status['Weatherstack']}")
-            except Exception as e:
-                status['Weatherstack'] = f'Connection Failed: {str(e)}'
-                logger.error(f"Weatherstack Error: {e}")
-        else:
-            status['Weatherstack'] = 'No API Key'
+        # The same story arrives from several sources; only one copy per cluster
+        # is translated, classified and stored, whichever session ingests it
+        self.deduplicator = get_deduplicator(self.db, DEDUP_WINDOW_HOURS)
         
-        return status
-    
-    def collect_crisis_data(self):
-        """Collect and analyze crisis data from multiple sources"""
-        all_data = []
+        # Reports are consolidated into incidents; the map, feed and SMS alerts use incidents
+        self.incident_tracker = get_incident_tracker(self.db)
+        self.sms_alerter = SMSAlerter(self.db)
         
-        # Collect from MediaStack (most reliable)
-        all_data.extend(self._collect_mediastack_data())
+        # Analysis results are reused for unchanged articles; any change to the
+        # classifier or location tables produces a new version and fresh results.
+        # The classifier's version is read per lookup, so hot-swapped models count
+        tables_version = fingerprint(ANALYSIS_VERSION, CITY_VARIATIONS, INDIAN_COORDINATES, INDIAN_STATES)
+        self.analysis_cache = AnalysisCache(
+            lambda: fingerprint(tables_version, self.classifier.version), self.db
+        )
+        self.analysis_cache.purge_stale()
         
-        # Collect from NewsData.io
-        all_data.extend(self._collect_newsdata_data())
+        # Polling intervals per source that make the monthly free-tier quotas last
+        self.scheduler = PollingScheduler(self.db, self.telemetry)
         
-        # Collect from RSS feeds
-        all_data.extend(self._collect_rss_data())
+        # fetch -> normalize -> filter -> dedupe -> classify -> enrich -> geocode -> translate -> store -> alert
+        self.ingestion = CrisisIngestion(self)
         
-        # Try NewsAPI if not rate limited
-        try:
-            all_data.extend(self._collect_newsapi_data())
-        except:
-            logger.info("NewsAPI skipped (likely rate limited)")
-        
-        # Filter and classify crisis data
-        crisis_data = []
-        for item in all_data:
-            if self._is_crisis_related(item['title'] + ' ' + item['description']):
-                crisis_info = self._classify_crisis(item['title'] + ' ' + item['description'])
-                location = self._extract_location(item['title'] + ' ' + item['description'])
-                coords = self._get_coordinates(location)
-
-                # Detect language and translate title and description to English
-                detected_language = self.language_processor.detect_language(item['title'] + ' ' + item['description'])
-                translated_title = item['title']
-                translated_description = item['description']
-                if detected_language != 'English':
-                    translated_title = self.language_processor.translate_text(item['title'], 'English')
-                    translated_description = self.language_processor.translate_text(item['description'], 'English')
-                
-                crisis_item = {
-                    'title': translated_title,
-                    'description': translated_description,
-                    'source': item['source'],
-                    'url': item.get('url', ''),
-                    'location': location or 'India',
-                    'latitude': coords[0],
-                    'longitude': coords[1],
-                    'crisis_type': crisis_info['type'],
-                    'severity': crisis_info['severity'],
-                    'confidence': crisis_info['confidence'],
-                    'detected_keywords': ', '.join(crisis_info['keywords']),
-                    'original_language': detected_language,
-                    'original_title': item['title'],
-                    'original_description': item['description']
-                }
-                crisis_data.append(crisis_item)
-        
-        # Store in database
-        self._store_crisis_data(crisis_data)
+        # Partner push endpoint, started once per process on the shared components
+        start_ingest_server(self)
+    
+    def test_api_connections(self):
+        """Report each source's health from its circuit breaker, without live calls
+        
+        Status comes from the outcome of real collection traffic in this process;
+        sources not polled yet are reported as such.
+        """
+        status = {}
+        keys = {
+            'MediaStack': self.mediastack_key,
+            'NewsData.io': self.newsdata_key,
+            'NewsAPI': self.newsapi_key,
+            'Weatherstack': self.weatherstack_key
+        }
+        for api, key in keys.items():
+            status[api] = self._breaker_status(self.http.breaker(api)) if key else 'No API Key'
+        
+        feeds = {name: self.http.breaker(f"RSS - {name}").get_status() for name in self.rss_feeds}
+        down = [name for name, feed in feeds.items() if feed['state'] != CLOSED]
+        polled = [name for name, feed in feeds.items() if feed['calls']]
+        if down:
+            status['RSS'] = f"Circuit Open - {len(down)}/{len(feeds)} feeds down ({', '.join(down)})"
+        elif polled:
+            status['RSS'] = f"Connected - {len(polled)}/{len(feeds)} feeds healthy"
+        else:
+            status['RSS'] = 'Not polled yet'
+        
+        for api, text in status.items():
+            logger.info(f"{api} Status: {text}")
+        return status
+    
+    @staticmethod
+    def _breaker_status(breaker):
+        """One-line status of a source from its breaker and passive health statistics"""
+        health = breaker.get_status()
+        if health['state'] == OPEN:
+            label = 'Rate Limited' if health['rate_limited'] else 'Circuit Open'
+            return (f"{label} - retry in {health['retry_in'] / 60:.0f} min "
+                    f"after {health['consecutive_failures']} failures ({health['last_error']})")
+        if health['state'] == HALF_OPEN:
+            return "Recovering - next call probes the source"
+        if not health['calls']:
+            return 'Not polled yet'
+        return (f"Connected - {health['success_rate']}% of {health['calls']} calls succeeded, "
+                f"{health['avg_latency']}s average latency")
+    
+    def collect_crisis_data(self, force=False):
+        """Collect and analyze crisis data from multiple sources
+        
+        Only sources the polling scheduler considers due are fetched, unless force is
+        set. They are fetched concurrently and their articles stream through the
+        ingestion pipeline page by page as they arrive; see pipeline.CrisisIngestion.
+        """
+        crisis_data = self.ingestion.run(force)
         logger.info(f"Collected and classified {len(crisis_data)} crisis events")
         return crisis_data
     
+    @staticmethod
+    def _analysis_text(item):
+        """Text an analysis result is addressed by"""
+        return f"{item.title}\n{item.description}"
+    
+    @staticmethod
+    def _to_article(raw, source, url_key, date_key):
+        """Article from a raw API item, None without title and description"""
+        if not (raw.get('title') and raw.get('description')):
+            return None
+        return Article(
+            title=raw['title'],
+            description=raw['description'],
+            source=source,
+            url=raw.get(url_key) or '',
+            published_at=raw.get(date_key) or ''
+        )
+    
     def _collect_mediastack_data(self):
-        """Collect data from MediaStack API"""
-        data = []
+        """Stream articles from MediaStack, following offset pages until already seen stories"""
         if not self.mediastack_key:
-            return data
+            return
         
-        try:
-            # Get news with crisis keywords
-            keywords = '|'.join(self.crisis_keywords[:10])  # Limit for URL length
-            response = requests.get(
-                f"http://api.mediastack.com/v1/news?access_key={self.mediastack_key}&countries=in&keywords={keywords}&limit=25",
+        # Get news with crisis keywords
+        keywords = '|'.join(self.crisis_keywords[:10])  # Limit for URL length
+        
+        def fetch_page(offset):
+            with self.http.get(
+                'MediaStack',
+                f"http://api.mediastack.com/v1/news?access_key={self.mediastack_key}&countries=in"
+                f"&keywords={keywords}&sort=published_desc&limit=50&offset={offset or 0}",
                 timeout=15
-            )
+            ) as (response, call):
+                result = response.json() if response.status_code == 200 else {}
+                call.items_returned = len(result.get('data', []))
             
-            if response.status_code == 200:
-                result = response.json()
-                for article in result.get('data', []):
-                    if article.get('title') and article.get('description'):
-                        data.append({
-                            'title': article['title'],
-                            'description': article['description'] or article['title'],
-                            'source': 'MediaStack',
-                            'url': article.get('url', ''),
-                            'published_at': article.get('published_at', '')
-                        })
-                
-                logger.info(f"Collected {len(data)} articles from MediaStack")
-        except Exception as e:
-            logger.error(f"MediaStack collection error: {e}")
-        
-        return data
+            page = result.get('pagination') or {}
+            next_offset = page.get('offset', 0) + page.get('count', 0)
+            return result.get('data', []), next_offset if next_offset < page.get('total', 0) else None
+        
+        yield from collect_pages(
+            'MediaStack', fetch_page, lambda raw: raw.get('url'),
+            lambda raw: self._to_article(raw, 'MediaStack', 'url', 'published_at'),
+            self.seen_items, self.page_budgets['MediaStack']
+        )
     
     def _collect_newsdata_data(self):
-        """Collect data from NewsData.io API"""
-        data = []
+        """Stream articles from NewsData.io, following nextPage tokens until already seen stories"""
         if not self.newsdata_key:
-            return data
+            return
         
-        try:
-            # Search for crisis-related news
-            keywords = ' OR '.join(self.crisis_keywords[:8])
-            response = requests.get(
-                f"https://newsdata.io/api/1/news?apikey={self.newsdata_key}&country=in&q={keywords}&size=20",
-                timeout=15
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                for article in result.get('results', []):
-                    if article.get('title') and article.get('description'):
-                        data.append({
-                            'title': article['title'],
-                            'description': article['description'] or article['title'],
-                            'source': 'NewsData.io',
-                            'url': article.get('link', ''),
-                            'published_at': article.get('pubDate', '')
-                        })
-                
-                logger.info(f"Collected {len(data)} articles from NewsData.io")
-        except Exception as e:
-            logger.error(f"NewsData.io collection error: {e}")
+        # Search for crisis-related news
+        keywords = ' OR '.join(self.crisis_keywords[:8])
         
-        return data
+        def fetch_page(token):
+            with self.http.get(
+                'NewsData.io',
+                f"https://newsdata.io/api/1/news?apikey={self.newsdata_key}&country=in&q={keywords}&size=50",
+                params={'page': token} if token else None,
+                timeout=15
+            ) as (response, call):
+                result = response.json() if response.status_code == 200 else {}
+                call.items_returned = len(result.get('results', []))
+            return result.get('results', []), result.get('nextPage')
+        
+        yield from collect_pages(
+            'NewsData.io', fetch_page, lambda raw: raw.get('link'),
+            lambda raw: self._to_article(raw, 'NewsData.io', 'link', 'pubDate'),
+            self.seen_items, self.page_budgets['NewsData.io']
+        )
     
     def _collect_newsapi_data(self):
-        """Collect data from NewsAPI (with rate limit handling)"""
-        data = []
+        """Stream articles from NewsAPI, newest first, page by page until already seen stories"""
         if not self.newsapi_key:
-            return data
+            return
         
-        try:
-            # Try a simple query first
-            response = requests.get(
-                f"https://newsapi.org/v2/everything?q=India disaster&sortBy=publishedAt&pageSize=15&apiKey={self.newsapi_key}",
+        def fetch_page(page):
+            page = page or 1
+            with self.http.get(
+                'NewsAPI',
+                f"https://newsapi.org/v2/everything?q=India disaster&sortBy=publishedAt"
+                f"&pageSize=100&page={page}&apiKey={self.newsapi_key}",
                 timeout=15
-            )
+            ) as (response, call):
+                result = response.json() if response.status_code == 200 else {}
+                call.items_returned = len(result.get('articles', []))
             
-            if response.status_code == 200:
-                result = response.json()
-                for article in result.get('articles', []):
-                    if article.get('title') and article.get('description'):
-                        data.append({
-                            'title': article['title'],
-                            'description': article['description'] or article['title'],
-                            'source': f"NewsAPI - {article.get('source', {}).get('name', 'Unknown')}",
-                            'url': article.get('url', ''),
-                            'published_at': article.get('publishedAt', '')
-                        })
-                
-                logger.info(f"Collected {len(data)} articles from NewsAPI")
-            elif response.status_code == 429:
+            if response.status_code == 429:
                 logger.warning("NewsAPI rate limit exceeded")
-        except Exception as e:
-            logger.error(f"NewsAPI collection error: {e}")
-        
-        return data
+            # Any non-200 answer (426 past the plan's result limit) ends the pages with what it returned
+            articles = result.get('articles', [])
+            more = page * 100 < min(result.get('totalResults', 0), NEWSAPI_MAX_RESULTS)
+            return articles, page + 1 if more else None
+        
+        yield from collect_pages(
+            'NewsAPI', fetch_page, lambda raw: raw.get('url'),
+            lambda raw: self._to_article(
+                raw, f"NewsAPI - {(raw.get('source') or {}).get('name', 'Unknown')}", 'url', 'publishedAt'
+            ),
+            self.seen_items, self.page_budgets['NewsAPI']
+        )
+    
+    @staticmethod
+    def _entry_key(entry):
+        """Identity of an RSS entry: its GUID, else link or title"""
+        return entry.get('id') or entry.get('link') or entry.get('title')
     
     def _collect_rss_data(self):
-        """Collect data from RSS feeds"""
-        data = []
-        
+        """Stream entries of each RSS feed, newest first, until the first already seen entry"""
         for feed_name, feed_url in self.rss_feeds.items():
-            try:
-                feed = feedparser.parse(feed_url)
-                for entry in feed.entries[:5]:  # Limit per feed
-                    title = entry.get('title', '')
-                    summary = entry.get('summary', entry.get('description', ''))
-                    
-                    if title and summary:
-                        data.append({
-                            'title': title,
-                            'description': summary,
-                            'source': f"RSS - {feed_name}",
-                            'url': entry.get('link', ''),
-                            'published_at': entry.get('published', '')
-                        })
-                
-                time.sleep(0.5)  # Rate limiting
-            except Exception as e:
-                logger.error(f"RSS collection error for {feed_name}: {e}")
-        
-        logger.info(f"Collected {len(data)} items from RSS feeds")
-        return data
+            source = f"RSS - {feed_name}"
+            
+            def fetch_page(_, source=source, feed_url=feed_url):
+                # Fetch through the HTTP client so the call is bounded by a timeout, recorded and breaker-guarded
+                with self.http.get(source, feed_url) as (response, call):
+                    feed = feedparser.parse(response.content)
+                    call.items_returned = len(feed.entries)
+                # A feed is one document: a single page without a cursor
+                return feed.entries[:RSS_ENTRY_BUDGET], None
+            
+            def to_article(entry, source=source):
+                title = entry.get('title', '')
+                summary = entry.get('summary', entry.get('description', ''))
+                if not (title and summary):
+                    return None
+                return Article(
+                    title=title,
+                    description=summary,
+                    source=source,
+                    url=entry.get('link', ''),
+                    published_at=entry.get('published', '')
+                )
+            
+            yield from collect_pages(source, fetch_page, self._entry_key, to_article, self.seen_items)
+            time.sleep(0.5)  # Rate limiting
     
     def _is_crisis_related(self, text):
-        """Enhanced crisis detection with multiple criteria"""
-        text_lower = text.lower()
+        """Enhanced crisis detection with multiple criteria; text may be Article.normalized"""
+        view = NormalizedText.of(text)
         
         # Must be India-related
-        india_related = any(term in text_lower for term in self.indian_terms)
-        if not india_related:
+        if not view.mentions(self.indian_terms):
             return False
         
-        # Must contain crisis keywords
-        crisis_related = any(keyword in text_lower for keyword in self.crisis_keywords)
-        
-        # Additional crisis indicators
-        emergency_words = ['emergency', 'alert', 'warning', 'evacuate', 'rescue', 'damage', 'injured', 'killed', 'destroyed']
-        emergency_related = any(word in text_lower for word in emergency_words)
-        
-        return crisis_related or emergency_related
-    
-    def _classify_crisis(self, text):
-        """Enhanced crisis classification with keyword detection"""
-        text_lower = text.lower()
-        detected_keywords = []
-        
-        # Crisis type mapping with expanded keywords
-        crisis_patterns = {
-            'flood': ['flood', 'flooding', 'inundation', 'waterlogging', 'deluge', 'submerg', 'overflow'],
-            'earthquake': ['earthquake', 'quake', 'tremor', 'seismic', 'magnitude', 'epicenter', 'aftershock'],
-            'cyclone': ['cyclone', 'hurricane', 'typhoon', 'storm', 'tempest', 'wind speed', 'landfall'],
-            'fire': ['fire', 'wildfire', 'blaze', 'burning', 'arson', 'flame', 'smoke'],
-            'drought': ['drought', 'water shortage', 'dry spell', 'arid', 'scarcity', 'reservoir low'],
-            'landslide': ['landslide', 'mudslide', 'rockfall', 'slope failure', 'hill collapse'],
-            'storm': ['thunderstorm', 'lightning', 'hailstorm', 'dust storm', 'squall'],
-            'accident': ['accident', 'crash', 'collision', 'derailment', 'explosion', 'collapse', 'building fall']
-        }
-        
-        # Find matching crisis type
-        crisis_type = 'accident'  # default
-        max_matches = 0
-        
-        for c_type, keywords in crisis_patterns.items():
-            matches = sum(1 for keyword in keywords if keyword in text_lower)
-            if matches > max_matches:
-                max_matches = matches
-                crisis_type = c_type
-                detected_keywords = [kw for kw in keywords if kw in text_lower]
-        
-        # Severity classification with enhanced keywords
-        severity_indicators = {
-            'high': ['severe', 'massive', 'devastating', 'major', 'critical', 'catastrophic', 'extreme', 'deadly', 'killed', 'died', 'death', 'hundreds', 'thousands'],
-            'medium': ['moderate', 'significant', 'considerable', 'notable', 'substantial', 'injured', 'damaged', 'affected'],
-            'low': ['minor', 'small', 'light', 'slight', 'minimal', 'reported', 'alert', 'warning']
-        }
-        
-        severity = 'low'  # default
-        for sev_level, keywords in severity_indicators.items():
-            if any(keyword in text_lower for keyword in keywords):
-                severity = sev_level
-                detected_keywords.extend([kw for kw in keywords if kw in text_lower])
-                break
-        
-        # Calculate confidence based on keyword matches and context
-        total_indicators = len([kw for kw in self.crisis_keywords if kw in text_lower])
-        emergency_indicators = len([word for word in ['emergency', 'alert', 'rescue', 'evacuate'] if word in text_lower])
-        
-        confidence = min(0.4 + (total_indicators * 0.15) + (emergency_indicators * 0.1), 1.0)
-        
-        return {
-            'type': crisis_type,
-            'severity': severity,
-            'confidence': confidence,
-            'keywords': list(set(detected_keywords))  # Remove duplicates
-        }
+        # Must contain crisis or emergency terms, in English or a regional language
+        return self.classifier.passes_gate(view)
     
     def _extract_location(self, text):
         """Enhanced location extraction"""
-        text_lower = text.lower()
-        
-        # Check cities first (more specific)
-        for city in INDIAN_COORDINATES.keys():
-            if city in text_lower:
-                return city.title()
-        
-        # Check for city variations
-        city_variations = {
-            'bombay': 'Mumbai', 'calcutta': 'Kolkata', 'madras': 'Chennai',
-            'new delhi': 'Delhi', 'bengaluru': 'Bangalore'
-        }
-        
-        for variation, proper_name in city_variations.items():
-            if variation in text_lower:
-                return proper_name
-        
-        # Check states
-        for state in INDIAN_STATES.keys():
-            if state.lower() in text_lower:
-                return state
-        
-        return None
+        return extract_location(NormalizedText.of(text).lower)
     
     def _get_coordinates(self, location):
         """Get coordinates for location"""
-        if not location:
-            return (20.5937, 78.9629)  # Center of India
-        
-        location_lower = location.lower()
-        
-        # Check cities
-        if location_lower in INDIAN_COORDINATES:
-            return INDIAN_COORDINATES[location_lower]
-        
-        # Check states
-        if location in INDIAN_STATES:
-            return INDIAN_STATES[location]
-        
-        return (20.5937, 78.9629)
+        return location_coordinates(location)
     
-    def collect_weather_data(self):
-        """Collect weather alerts for major cities"""
+    def collect_weather_data(self, force=False):
+        """Collect weather alerts for major cities
+        
+        Between scheduled polls the stored alerts of the last day are returned instead.
+        """
         weather_data = []
         major_cities = ['Delhi', 'Mumbai', 'Bangalore', 'Chennai', 'Kolkata', 'Hyderabad', 'Pune', 'Jaipur']
         
         if not self.weatherstack_key:
             return weather_data
         
+        if not force and not self.scheduler.due(['Weatherstack']):
+            return self.db.get_recent_weather_alerts(hours=24)
+        
+        usage = self.scheduler.usage()
+        
         for city in major_cities:
             try:
-                response = requests.get(
+                with self.http.get(
+                    'Weatherstack',
                     f"http://api.weatherstack.com/current?access_key={self.weatherstack_key}&query={city}",
                     timeout=10
-                )
+                ) as (response, call):
+                    data = response.json() if response.status_code == 200 else {}
+                    call.items_returned = 1 if 'current' in data else 0
                 
                 if response.status_code == 200:
-                    data = response.json()
                     current = data.get('current', {})
                     location = data.get('location', {})
                     
@@ -665,22 +456,28 @@ class CrisisRadarSystem:
                         severity = 'high' if (temperature > 47 or wind_speed > 80) else 'medium'
                         coords = INDIAN_COORDINATES.get(city.lower(), (20.5937, 78.9629))
                         
-                        alert = {
-                            'city': location.get('name', city),
-                            'temperature': temperature,
-                            'description': weather_desc,
-                            'wind_speed': wind_speed,
-                            'severity': severity,
-                            'latitude': location.get('lat', coords[0]),
-                            'longitude': location.get('lon', coords[1])
-                        }
+                        alert = WeatherAlert(
+                            city=location.get('name', city),
+                            temperature=temperature,
+                            description=weather_desc,
+                            wind_speed=wind_speed,
+                            severity=severity,
+                            latitude=location.get('lat', coords[0]),
+                            longitude=location.get('lon', coords[1])
+                        )
                         weather_data.append(alert)
                 
                 time.sleep(1)  # Rate limiting
+            except CircuitOpenError as e:
+                # Remaining cities would be rejected the same way
+                logger.info(f"Weatherstack skipped: {e}")
+                break
             except Exception as e:
                 logger.error(f"Weather API error for {city}: {e}")
         
         self._store_weather_data(weather_data)
+        calls = self.scheduler.usage().get('Weatherstack', 0) - usage.get('Weatherstack', 0)
+        self.scheduler.record_polls({'Weatherstack': len(weather_data)}, {'Weatherstack': calls})
         logger.info(f"Collected {len(weather_data)} weather alerts")
         return weather_data
     
@@ -689,118 +486,49 @@ class CrisisRadarSystem:
         if not data:
             return
         
-        try:
-            conn = sqlite3.connect('crisis_radar_production.db')
-            cursor = conn.cursor()
-            
-            for item in data:
-                cursor.execute('''
-                    INSERT INTO crisis_events 
-                    (title, description, crisis_type, severity, location, latitude, longitude, 
-                     source, confidence, url, detected_keywords)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    item['title'], item['description'], item['crisis_type'], 
-                    item['severity'], item['location'], item['latitude'], 
-                    item['longitude'], item['source'], item['confidence'],
-                    item['url'], item['detected_keywords']
-                ))
-            
-            conn.commit()
-            conn.close()
-            logger.info(f"Stored {len(data)} crisis events in database")
-        except Exception as e:
-            logger.error(f"Database storage error: {e}")
+        stored = self.db.store_crisis_data(data)
+        logger.info(f"Stored {stored} crisis events in database")
     
     def _store_weather_data(self, data):
         """Store weather data in database"""
         if not data:
             return
         
-        try:
-            conn = sqlite3.connect('crisis_radar_production.db')
-            cursor = conn.cursor()
-            
-            for item in data:
-                cursor.execute('''
-                    INSERT INTO weather_alerts 
-                    (city, temperature, description, wind_speed, severity, latitude, longitude)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    item['city'], item['temperature'], item['description'], 
-                    item['wind_speed'], item['severity'], item['latitude'], item['longitude']
-                ))
-            
-            conn.commit()
-            conn.close()
-            logger.info(f"Stored {len(data)} weather alerts in database")
-        except Exception as e:
-            logger.error(f"Weather storage error: {e}")
+        stored = self.db.store_weather_data(data)
+        logger.info(f"Stored {stored} weather alerts in database")
     
     def get_recent_data(self, hours=24):
         """Get recent crisis and weather data from database"""
         try:
-            conn = sqlite3.connect('crisis_radar_production.db')
-            cursor = conn.cursor()
-            
-            # Get recent crisis data
-            cursor.execute('''
-                SELECT * FROM crisis_events 
-                WHERE timestamp >= datetime('now', '-{} hours')
-                ORDER BY timestamp DESC LIMIT 50
-            '''.format(hours))
-            
-            crisis_rows = cursor.fetchall()
-            crisis_data = []
-            
-            for row in crisis_rows:
-                crisis_data.append({
-                    'id': row[0], 'title': row[1], 'description': row[2],
-                    'crisis_type': row[3], 'severity': row[4], 'location': row[5],
-                    'latitude': row[6], 'longitude': row[7], 'source': row[8],
-                    'confidence': row[9], 'url': row[10], 'detected_keywords': row[11],
-                    'timestamp': row[12]
-                })
-            
-            # Get recent weather data
-            cursor.execute('''
-                SELECT * FROM weather_alerts 
-                WHERE timestamp >= datetime('now', '-{} hours')
-                ORDER BY timestamp DESC LIMIT 20
-            '''.format(hours))
-            
-            weather_rows = cursor.fetchall()
-            weather_data = []
-            
-            for row in weather_rows:
-                weather_data.append({
-                    'id': row[0], 'city': row[1], 'temperature': row[2],
-                    'description': row[3], 'wind_speed': row[4], 'severity': row[5],
-                    'latitude': row[6], 'longitude': row[7], 'timestamp': row[8]
-                })
-            
-            conn.close()
+            crisis_data, _ = self.db.get_crises_page(hours, page_size=50)
+            weather_data, _ = self.db.get_weather_page(hours, page_size=20)
             return crisis_data, weather_data
             
         except Exception as e:
             logger.error(f"Data retrieval error: {e}")
             return [], []
     
+    def get_crisis_page(self, hours=24, page_size=50, cursor=None):
+        """Get one page of stored crises and the cursor for the next, older page"""
+        return self.db.get_crises_page(hours, page_size, cursor)
+    
+    def get_incident_page(self, hours=24, page_size=50, cursor=None):
+        """Get one page of incidents, most recently reported first, and the cursor for the next page"""
+        return self.db.get_incidents_page(hours, page_size, cursor)
+    
     def register_sms_user(self, phone, location, radius=50, language='English'):
         """Register user for SMS alerts"""
         try:
-            conn = sqlite3.connect('crisis_radar_production.db')
-            cursor = conn.cursor()
+            # Dashboard labels look like "हिंदी (Hindi)"; SMS templates are keyed by the English name
+            language = language.split('(')[-1].rstrip(')').strip()
+            latitude, longitude = self._get_coordinates(location)
             
-            cursor.execute('''
-                INSERT OR REPLACE INTO sms_users (phone, location, radius, language)
-                VALUES (?, ?, ?, ?)
-            ''', (phone, location, radius, language))
-            
-            conn.commit()
-            conn.close()
-            logger.info(f"User registered: {phone} for {location}")
-            return True
+            success = self.db.register_sms_user(
+                normalize_phone_number(phone), location, latitude, longitude, radius, language
+            )
+            if success:
+                logger.info(f"User registered: {phone} for {location}")
+            return success
         except Exception as e:
             logger.error(f"Registration error: {e}")
             return False
@@ -843,15 +571,15 @@ def create_india_map(crisis_data, weather_data, emergency_resources=None):
     
     if crisis_data:
         for item in crisis_data:
-            severity = item.get('severity', 'low')
+            severity = item.severity
             crisis_by_severity[severity].append(item)
         
         # Add high severity crises (most prominent)
         if crisis_by_severity['high']:
             high_items = crisis_by_severity['high']
             fig.add_trace(go.Scattermapbox(
-                lat=[item['latitude'] for item in high_items],
-                lon=[item['longitude'] for item in high_items],
+                lat=[item.latitude for item in high_items],
+                lon=[item.longitude for item in high_items],
                 mode='markers',
                 marker=dict(
                     size=20,
@@ -860,12 +588,13 @@ def create_india_map(crisis_data, weather_data, emergency_resources=None):
                     symbol='circle'
                 ),
                 text=[f"<b>🚨 HIGH SEVERITY CRISIS</b><br>" +
-                      f"<b>Type:</b> {item['crisis_type'].title()}<br>" +
-                      f"<b>Location:</b> {item['location']}<br>" +
-                      f"<b>Confidence:</b> {item['confidence']:.0%}<br>" +
-                      f"<b>Source:</b> {item['source']}<br>" +
-                      f"<b>Title:</b> {item['title'][:100]}...<br>" +
-                      f"<b>Keywords:</b> {item.get('detected_keywords', 'N/A')}"
+                      f"<b>Type:</b> {item.crisis_type.title()}<br>" +
+                      f"<b>Location:</b> {item.location}<br>" +
+                      f"<b>Confidence:</b> {item.confidence:.0%}<br>" +
+                      f"<b>Source:</b> {item.source}<br>" +
+                      f"<b>Reports:</b> {item.event_count}<br>" +
+                      f"<b>Title:</b> {item.title[:100]}...<br>" +
+                      f"<b>Keywords:</b> {item.detected_keywords or 'N/A'}"
                       for item in high_items],
                 hovertemplate='%{text}<extra></extra>',
                 name='High Severity Crisis',
@@ -876,8 +605,8 @@ def create_india_map(crisis_data, weather_data, emergency_resources=None):
         if crisis_by_severity['medium']:
             medium_items = crisis_by_severity['medium']
             fig.add_trace(go.Scattermapbox(
-                lat=[item['latitude'] for item in medium_items],
-                lon=[item['longitude'] for item in medium_items],
+                lat=[item.latitude for item in medium_items],
+                lon=[item.longitude for item in medium_items],
                 mode='markers',
                 marker=dict(
                     size=16,
@@ -886,12 +615,13 @@ def create_india_map(crisis_data, weather_data, emergency_resources=None):
                     symbol='circle'
                 ),
                 text=[f"<b>⚠️ MEDIUM SEVERITY CRISIS</b><br>" +
-                      f"<b>Type:</b> {item['crisis_type'].title()}<br>" +
-                      f"<b>Location:</b> {item['location']}<br>" +
-                      f"<b>Confidence:</b> {item['confidence']:.0%}<br>" +
-                      f"<b>Source:</b> {item['source']}<br>" +
-                      f"<b>Title:</b> {item['title'][:100]}...<br>" +
-                      f"<b>Keywords:</b> {item.get('detected_keywords', 'N/A')}"
+                      f"<b>Type:</b> {item.crisis_type.title()}<br>" +
+                      f"<b>Location:</b> {item.location}<br>" +
+                      f"<b>Confidence:</b> {item.confidence:.0%}<br>" +
+                      f"<b>Source:</b> {item.source}<br>" +
+                      f"<b>Reports:</b> {item.event_count}<br>" +
+                      f"<b>Title:</b> {item.title[:100]}...<br>" +
+                      f"<b>Keywords:</b> {item.detected_keywords or 'N/A'}"
                       for item in medium_items],
                 hovertemplate='%{text}<extra></extra>',
                 name='Medium Severity Crisis',
@@ -902,8 +632,8 @@ def create_india_map(crisis_data, weather_data, emergency_resources=None):
         if crisis_by_severity['low']:
             low_items = crisis_by_severity['low']
             fig.add_trace(go.Scattermapbox(
-                lat=[item['latitude'] for item in low_items],
-                lon=[item['longitude'] for item in low_items],
+                lat=[item.latitude for item in low_items],
+                lon=[item.longitude for item in low_items],
                 mode='markers',
                 marker=dict(
                     size=12,
@@ -912,12 +642,13 @@ def create_india_map(crisis_data, weather_data, emergency_resources=None):
                     symbol='circle'
                 ),
                 text=[f"<b>📋 LOW SEVERITY CRISIS</b><br>" +
-                      f"<b>Type:</b> {item['crisis_type'].title()}<br>" +
-                      f"<b>Location:</b> {item['location']}<br>" +
-                      f"<b>Confidence:</b> {item['confidence']:.0%}<br>" +
-                      f"<b>Source:</b> {item['source']}<br>" +
-                      f"<b>Title:</b> {item['title'][:100]}...<br>" +
-                      f"<b>Keywords:</b> {item.get('detected_keywords', 'N/A')}"
+                      f"<b>Type:</b> {item.crisis_type.title()}<br>" +
+                      f"<b>Location:</b> {item.location}<br>" +
+                      f"<b>Confidence:</b> {item.confidence:.0%}<br>" +
+                      f"<b>Source:</b> {item.source}<br>" +
+                      f"<b>Reports:</b> {item.event_count}<br>" +
+                      f"<b>Title:</b> {item.title[:100]}...<br>" +
+                      f"<b>Keywords:</b> {item.detected_keywords or 'N/A'}"
                       for item in low_items],
                 hovertemplate='%{text}<extra></extra>',
                 name='Low Severity Crisis',
@@ -927,8 +658,8 @@ def create_india_map(crisis_data, weather_data, emergency_resources=None):
     # Add weather alerts with enhanced details
     if weather_data:
         fig.add_trace(go.Scattermapbox(
-            lat=[item['latitude'] for item in weather_data],
-            lon=[item['longitude'] for item in weather_data],
+            lat=[item.latitude for item in weather_data],
+            lon=[item.longitude for item in weather_data],
             mode='markers',
             marker=dict(
                 size=18,
@@ -937,11 +668,11 @@ def create_india_map(crisis_data, weather_data, emergency_resources=None):
                 symbol='diamond'
             ),
             text=[f"<b>🌩️ WEATHER ALERT</b><br>" +
-                  f"<b>City:</b> {item['city']}<br>" +
-                  f"<b>Temperature:</b> {item['temperature']}°C<br>" +
-                  f"<b>Condition:</b> {item['description']}<br>" +
-                  f"<b>Wind Speed:</b> {item['wind_speed']} km/h<br>" +
-                  f"<b>Severity:</b> {item['severity'].title()}"
+                  f"<b>City:</b> {item.city}<br>" +
+                  f"<b>Temperature:</b> {item.temperature}°C<br>" +
+                  f"<b>Condition:</b> {item.description}<br>" +
+                  f"<b>Wind Speed:</b> {item.wind_speed} km/h<br>" +
+                  f"<b>Severity:</b> {item.severity.title()}"
                   for item in weather_data],
             hovertemplate='%{text}<extra></extra>',
             name='Weather Alert',
@@ -1021,7 +752,7 @@ def create_analytics_charts(crisis_data):
     # Crisis type distribution
     type_counts = {}
     for item in crisis_data:
-        crisis_type = item['crisis_type']
+        crisis_type = item.crisis_type
         type_counts[crisis_type] = type_counts.get(crisis_type, 0) + 1
     
     # Create pie chart using plotly.graph_objects only
@@ -1060,7 +791,7 @@ def create_analytics_charts(crisis_data):
     # Severity distribution
     severity_counts = {}
     for item in crisis_data:
-        severity = item['severity']
+        severity = item.severity
         severity_counts[severity] = severity_counts.get(severity, 0) + 1
     
     severity_order = ['high', 'medium', 'low']  # Ensure consistent ordering
@@ -1115,7 +846,7 @@ def create_analytics_charts(crisis_data):
     # Location analysis
     location_counts = {}
     for item in crisis_data:
-        location = item['location']
+        location = item.location
         if location and location != 'India':
             location_counts[location] = location_counts.get(location, 0) + 1
     
@@ -1183,8 +914,9 @@ def main():
     if 'crisis_system' not in st.session_state:
         with st.spinner("Initializing CrisisRadar System..."):
             st.session_state.crisis_system = CrisisRadarSystem()
-            st.session_state.crisis_data = []
+            st.session_state.incidents = []
             st.session_state.weather_data = []
+            st.session_state.incident_cursor = None
             st.session_state.last_update = None
     
     # Sidebar
@@ -1193,45 +925,69 @@ def main():
         
         # API Status Check
         if st.button("🔍 Test API Connections"):
-            with st.spinner("Testing all API connections..."):
+            with st.spinner("Checking source health..."):
                 api_status = st.session_state.crisis_system.test_api_connections()
                 
                 st.markdown("#### 📡 API Connection Status")
                 for api, status in api_status.items():
                     if 'Connected' in status:
                         st.markdown(f"✅ **{api}**: <span class='status-online'>{status}</span>", unsafe_allow_html=True)
-                    elif 'Rate Limited' in status:
+                    elif 'Rate Limited' in status or 'Recovering' in status:
                         st.markdown(f"⚠️ **{api}**: <span style='color: orange;'>{status}</span>", unsafe_allow_html=True)
+                    elif 'Not polled' in status:
+                        st.markdown(f"⏳ **{api}**: {status}", unsafe_allow_html=True)
                     else:
                         st.markdown(f"❌ **{api}**: <span class='status-offline'>{status}</span>", unsafe_allow_html=True)
         
         st.markdown("---")
         
-        # Real-time Data Collection
+        # Real-time Data Collection; sources are polled on their quota-aware schedule
+        force_poll = st.checkbox("Poll all sources now", value=False,
+                                 help="Ignore the polling schedule (spends API quota)")
         col1, col2 = st.columns(2)
         
         with col1:
             if st.button("📡 Collect Live Data"):
                 with st.spinner("Collecting real-time crisis data..."):
                     try:
-                        crisis_data = st.session_state.crisis_system.collect_crisis_data()
-                        weather_data = st.session_state.crisis_system.collect_weather_data()
+                        crisis_data = st.session_state.crisis_system.collect_crisis_data(force=force_poll)
+                        weather_data = st.session_state.crisis_system.collect_weather_data(force=force_poll)
+                        incidents, cursor = st.session_state.crisis_system.get_incident_page()
                         
-                        st.session_state.crisis_data = crisis_data
+                        st.session_state.incidents = incidents
                         st.session_state.weather_data = weather_data
+                        st.session_state.incident_cursor = cursor
                         st.session_state.last_update = datetime.now()
                         
-                        st.success(f"✅ Found {len(crisis_data)} crisis events and {len(weather_data)} weather alerts")
+                        st.success(f"✅ Found {len(crisis_data)} crisis reports ({len(incidents)} active incidents) and {len(weather_data)} weather alerts")
                     except Exception as e:
                         st.error("❌ Data collection failed. Check API keys.")
                         logger.error(f"Data collection error: {e}")
         
         with col2:
             if st.button("📂 Load Stored Data"):
-                crisis_data, weather_data = st.session_state.crisis_system.get_recent_data()
-                st.session_state.crisis_data = crisis_data
+                incidents, cursor = st.session_state.crisis_system.get_incident_page()
+                _, weather_data = st.session_state.crisis_system.get_recent_data()
+                st.session_state.incidents = incidents
                 st.session_state.weather_data = weather_data
-                st.info(f"📊 Loaded {len(crisis_data)} stored events")
+                st.session_state.incident_cursor = cursor
+                st.info(f"📊 Loaded {len(incidents)} stored incidents")
+        
+        # Keyset pagination: fetch the next older page without reloading earlier ones
+        if st.session_state.incident_cursor is not None:
+            if st.button("⏬ Load Older Incidents"):
+                older, cursor = st.session_state.crisis_system.get_incident_page(
+                    cursor=st.session_state.incident_cursor
+                )
+                st.session_state.incidents = st.session_state.incidents + older
+                st.session_state.incident_cursor = cursor
+                st.info(f"📊 Loaded {len(older)} older incidents")
+        
+        with st.expander("⏱️ Polling Schedule"):
+            for source, status in st.session_state.crisis_system.scheduler.get_status().items():
+                quota = f"{status['remaining']}/{status['quota']} calls left" if status['quota'] else "unmetered"
+                st.markdown(f"**{source}**: next poll in {status['next_poll_in_minutes']} min, "
+                            f"{quota}, {status['yield_per_poll']} new/poll")
         
         st.markdown("---")
         
@@ -1283,8 +1039,8 @@ def main():
     # Main Dashboard Metrics
     col1, col2, col3, col4 = st.columns(4)
     
-    total_crises = len(st.session_state.crisis_data)
-    high_severity = len([c for c in st.session_state.crisis_data if c.get('severity') == 'high'])
+    total_crises = len(st.session_state.incidents)
+    high_severity = len([c for c in st.session_state.incidents if c.severity == 'high'])
     weather_alerts = len(st.session_state.weather_data)
     last_update = st.session_state.last_update.strftime("%H:%M:%S") if st.session_state.last_update else "Never"
     
@@ -1327,13 +1083,13 @@ def main():
         st.markdown("### 🗺️ Real-Time Crisis Map of India")
         
         # Apply filters
-        filtered_crisis = st.session_state.crisis_data
+        filtered_crisis = st.session_state.incidents
         if crisis_filter:
-            filtered_crisis = [c for c in filtered_crisis if c.get('crisis_type') in crisis_filter]
+            filtered_crisis = [c for c in filtered_crisis if c.crisis_type in crisis_filter]
         if severity_filter:
-            filtered_crisis = [c for c in filtered_crisis if c.get('severity') in severity_filter]
+            filtered_crisis = [c for c in filtered_crisis if c.severity in severity_filter]
         
-        filtered_crisis = [c for c in filtered_crisis if c.get('confidence', 0) >= confidence_threshold]
+        filtered_crisis = [c for c in filtered_crisis if c.confidence >= confidence_threshold]
         
         if filtered_crisis or st.session_state.weather_data:
             # Prepare emergency resources data for map
@@ -1357,26 +1113,26 @@ def main():
             # Enhanced legend
             st.markdown("""
             #### 🎯 Map Legend & Information
-            - 🔴 **Red Circles**: High Severity Crisis Events
-            - 🟠 **Orange Circles**: Medium Severity Crisis Events
-            - 🟡 **Yellow Circles**: Low Severity Crisis Events
+            - 🔴 **Red Circles**: High Severity Incidents
+            - 🟠 **Orange Circles**: Medium Severity Incidents
+            - 🟡 **Yellow Circles**: Low Severity Incidents
             - 🔵 **Blue Circles**: Extreme Weather Alerts
             
-            **Click on any marker for detailed information including source, confidence level, and detected keywords.**
+            **Click on any marker for detailed information including sources, number of reports, confidence level, and detected keywords.**
             """)
             
             # Summary statistics
             if filtered_crisis:
-                st.markdown(f"**Displaying {len(filtered_crisis)} crisis events** (filtered from {len(st.session_state.crisis_data)} total)")
+                st.markdown(f"**Displaying {len(filtered_crisis)} incidents** from {sum(c.event_count for c in filtered_crisis)} reports (filtered from {len(st.session_state.incidents)} total)")
         else:
             st.info("🔍 No crisis data matching current filters. Try adjusting filters or collecting new data.")
     
     with tab2:
         st.markdown("### 📊 Crisis Analytics Dashboard")
         
-        if st.session_state.crisis_data:
+        if st.session_state.incidents:
             # Filter data for analytics
-            filtered_data = [c for c in st.session_state.crisis_data if c.get('confidence', 0) >= confidence_threshold]
+            filtered_data = [c for c in st.session_state.incidents if c.confidence >= confidence_threshold]
             
             if filtered_data:
                 col1, col2 = st.columns(2)
@@ -1396,12 +1152,13 @@ def main():
                     # Enhanced statistics
                     st.markdown("#### 📈 Detailed Statistics")
                     
-                    unique_locations = len(set(c['location'] for c in filtered_data if c['location'] and c['location'] != 'India'))
-                    avg_confidence = sum(c['confidence'] for c in filtered_data) / len(filtered_data)
-                    most_common_type = max(set(c['crisis_type'] for c in filtered_data), 
-                                         key=lambda x: sum(1 for c in filtered_data if c['crisis_type'] == x))
+                    unique_locations = len(set(c.location for c in filtered_data if c.location and c.location != 'India'))
+                    avg_confidence = sum(c.confidence for c in filtered_data) / len(filtered_data)
+                    most_common_type = max(set(c.crisis_type for c in filtered_data), 
+                                         key=lambda x: sum(1 for c in filtered_data if c.crisis_type == x))
                     
-                    st.metric("Total Verified Reports", len(filtered_data))
+                    st.metric("Active Incidents", len(filtered_data))
+                    st.metric("Total Verified Reports", sum(c.event_count for c in filtered_data))
                     st.metric("Unique Affected Locations", unique_locations)
                     st.metric("Average Detection Confidence", f"{avg_confidence:.0%}")
                     st.metric("Most Common Crisis Type", most_common_type.title())
@@ -1409,12 +1166,12 @@ def main():
                     # Source breakdown
                     sources = {}
                     for item in filtered_data:
-                        source = item['source']
-                        sources[source] = sources.get(source, 0) + 1
+                        for source in item.source_list:
+                            sources[source] = sources.get(source, 0) + 1
                     
                     st.markdown("**Data Sources:**")
                     for source, count in sources.items():
-                        st.write(f"• {source}: {count} reports")
+                        st.write(f"• {source}: {count} incidents")
             else:
                 st.warning("No data meets the current confidence threshold. Try lowering the threshold.")
         else:
@@ -1423,30 +1180,32 @@ def main():
     with tab3:
         st.markdown("### 📰 Live Crisis Intelligence Feed")
         
-        if st.session_state.crisis_data:
+        if st.session_state.incidents:
             # Filter and sort data
-            display_data = [c for c in st.session_state.crisis_data if c.get('confidence', 0) >= confidence_threshold]
-            display_data.sort(key=lambda x: x.get('confidence', 0), reverse=True)
+            display_data = [c for c in st.session_state.incidents if c.confidence >= confidence_threshold]
+            display_data.sort(key=lambda x: x.confidence, reverse=True)
             
             for i, alert in enumerate(display_data[:15]):  # Show top 15
                 severity_colors = {"high": "#FF1744", "medium": "#FF9800", "low": "#FFC107"}
-                color = severity_colors.get(alert.get('severity', 'low'), '#999999')
+                color = severity_colors.get(alert.severity, '#999999')
                 
                 st.markdown(f"""
                 <div class="crisis-card" style="border-left: 5px solid {color};">
-                    <h4>🚨 {alert.get('title', 'Crisis Alert')}</h4>
+                    <h4>🚨 {alert.title or 'Crisis Alert'}</h4>
                     <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
-                        <span><strong>Type:</strong> {alert.get('crisis_type', 'Unknown').title()}</span>
-                        <span><strong>Severity:</strong> {alert.get('severity', 'Unknown').title()}</span>
-                        <span><strong>Confidence:</strong> {alert.get('confidence', 0):.0%}</span>
+                        <span><strong>Type:</strong> {(alert.crisis_type or 'Unknown').title()}</span>
+                        <span><strong>Severity:</strong> {(alert.severity or 'Unknown').title()}</span>
+                        <span><strong>Confidence:</strong> {alert.confidence or 0:.0%}</span>
+                        <span><strong>Reports:</strong> {alert.event_count}</span>
                     </div>
-                    <p><strong>Location:</strong> {alert.get('location', 'Unknown')} | 
-                       <strong>Source:</strong> {alert.get('source', 'Unknown')}</p>
-                    <p>{alert.get('description', 'No description available')}</p>
+                    <p><strong>Location:</strong> {alert.location or 'Unknown'} | 
+                       <strong>Source:</strong> {alert.source or 'Unknown'}</p>
+                    <p>{alert.description or 'No description available'}</p>
                     <p style="font-size: 0.9em; color: #666;">
-                        <strong>Detected Keywords:</strong> {alert.get('detected_keywords', 'N/A')}
+                        <strong>Detected Keywords:</strong> {alert.detected_keywords or 'N/A'}
                     </p>
-                    {f'<p><a href="{alert.get("url", "#")}" target="_blank">📰 Read Full Article</a></p>' if alert.get('url') else ''}
+                    {f'<p style="font-size: 0.9em; color: #666;"><strong>Also reported by:</strong> {alert.corroborating_sources}</p>' if alert.corroborating_sources else ''}
+                    {f'<p><a href="{alert.url}" target="_blank">📰 Read Full Article</a></p>' if alert.url else ''}
                 </div>
                 """, unsafe_allow_html=True)
         else:
@@ -1536,7 +1295,7 @@ def main():
         <p><strong>CrisisRadar - Production</strong> | Real-Time Crisis Intelligence for India</p>
         <p>System Status: <span style="color: #4CAF50;">🟢 ONLINE</span> | 
            Last Data Collection: {last_update} | 
-           Total Events Monitored: {len(st.session_state.crisis_data)}</p>
+           Total Events Monitored: {sum(i.event_count for i in st.session_state.incidents)}</p>
         <p> Powered by Multiple APIs • Made for India's Safety</p>
     </div>
     """, unsafe_allow_html=True)
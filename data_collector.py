@@ -1,20 +1,35 @@
-import requests
 import feedparser
 import json
 from datetime import datetime, timedelta
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 import time
 import logging
 from utils import get_coordinates, clean_text
-import trafilatura
+from telemetry import ApiTelemetry, get_telemetry
+from circuit_breaker import CircuitOpenError
+from http_client import get_http_client
+from pagination import collect_pages, DEFAULT_PAGE_BUDGETS, RSS_ENTRY_BUDGET, NEWSAPI_MAX_RESULTS
+from seen_filter import get_seen_filter
+from models import Article, WeatherAlert
+from normalization import NormalizedText
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class DataCollector:
-    def __init__(self):
+    def __init__(self, telemetry: ApiTelemetry = None):
         """Initialize data collector with API keys"""
+        # Every outbound call is recorded through the buffered usage writer and
+        # guarded by its source's circuit breaker
+        self.telemetry = telemetry or get_telemetry()
+        self.http = get_http_client(self.telemetry)
+        
+        # Sources are read page by page until stories already seen, within a page budget per cycle;
+        # items seen in earlier cycles (persistent Bloom filter) are dropped right after fetch
+        self.seen_items = get_seen_filter()
+        self.page_budgets = dict(DEFAULT_PAGE_BUDGETS)
+        
         self.newsapi_key = os.getenv("NEWSAPI_KEY")
         self.mediastack_key = os.getenv("MEDIASTACK_KEY")
         self.newsdata_key = os.getenv("NEWSDATA_KEY")
@@ -47,6 +62,7 @@ class DataCollector:
             "Mizoram", "Sikkim", "Delhi", "Puducherry", "Chandigarh", "Andaman and Nicobar Islands",
             "Dadra and Nagar Haveli and Daman and Diu", "Lakshadweep"
         ]
+        self._location_terms = [location.lower() for location in self.indian_locations]
         
         # Crisis keywords for filtering
         self.crisis_keywords = [
@@ -56,8 +72,12 @@ class DataCollector:
             'coldwave', 'accident', 'explosion', 'collapse', 'leak', 'spill'
         ]
     
-    def collect_news_data(self) -> List[Dict[str, Any]]:
-        """Collect news data from multiple news APIs"""
+    def collect_news_data(self) -> List[Article]:
+        """Collect news data from multiple news APIs
+        
+        Pass the articles to mark_seen once they are processed; until then they are
+        collected again.
+        """
         all_news = []
         
         # Collect from NewsAPI
@@ -69,163 +89,140 @@ class DataCollector:
         # Collect from NewsData.io
         all_news.extend(self._collect_newsdata_data())
         
+        self.seen_items.flush()
         return all_news
     
-    def _collect_newsapi_data(self) -> List[Dict[str, Any]]:
-        """Collect data from NewsAPI"""
+    def _located_article(self, raw: Dict[str, Any], **fields) -> Union[Article, None]:
+        """Article with location from a raw API item, None if it is not about India"""
+        text = NormalizedText((raw.get('title') or '') + ' ' + (raw.get('description') or ''))
+        if not self._is_india_related(text):
+            return None
+        location = self._extract_location(text)
+        coordinates = get_coordinates(location) if location else (20.5937, 78.9629)
+        return Article(
+            title=raw.get('title', ''),
+            description=raw.get('description', ''),
+            location=location,
+            latitude=coordinates[0],
+            longitude=coordinates[1],
+            **fields
+        )
+    
+    def _collect_newsapi_data(self) -> List[Article]:
+        """Collect data from NewsAPI, newest first, page by page until already seen stories"""
         if not self.newsapi_key:
             logger.warning("NewsAPI key not found")
             return []
         
-        try:
-            news_data = []
-            
-            # Search for crisis-related news in India
-            for keyword in self.crisis_keywords[:5]:  # Limit to avoid API quota
-                url = "https://newsapi.org/v2/everything"
-                params = {
-                    'q': f'{keyword} India',
-                    'country': 'in',
-                    'language': 'en',
-                    'sortBy': 'publishedAt',
-                    'from': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
-                    'pageSize': 20,
-                    'apiKey': self.newsapi_key
-                }
-                
-                response = requests.get(url, params=params, timeout=10)
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    for article in data.get('articles', []):
-                        if self._is_india_related(article.get('title', '') + ' ' + article.get('description', '')):
-                            location = self._extract_location(article.get('title', '') + ' ' + article.get('description', ''))
-                            coordinates = get_coordinates(location) if location else (20.5937, 78.9629)
-                            
-                            news_item = {
-                                'title': article.get('title', ''),
-                                'description': article.get('description', ''),
-                                'text': article.get('content', article.get('description', '')),
-                                'source': article.get('source', {}).get('name', 'NewsAPI'),
-                                'url': article.get('url', ''),
-                                'published_at': article.get('publishedAt', ''),
-                                'location': location,
-                                'latitude': coordinates[0],
-                                'longitude': coordinates[1],
-                                'api_source': 'newsapi'
-                            }
-                            news_data.append(news_item)
-                
-                time.sleep(0.5)  # Rate limiting
-            
-            logger.info(f"Collected {len(news_data)} articles from NewsAPI")
-            return news_data
-            
-        except Exception as e:
-            logger.error(f"Error collecting NewsAPI data: {str(e)}")
-            return []
+        # One OR query for all keywords: a single call instead of one per keyword
+        keywords = ' OR '.join(self.crisis_keywords[:5])
+        url = "https://newsapi.org/v2/everything"
+        params = {
+            'q': f'({keywords}) AND India',
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'from': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d'),
+            'pageSize': 100,
+            'apiKey': self.newsapi_key
+        }
+        
+        def fetch_page(page):
+            page = page or 1
+            with self.http.get('NewsAPI', url, params={**params, 'page': page}, timeout=10) as (response, call):
+                data = response.json() if response.status_code == 200 else {}
+                call.items_returned = len(data.get('articles', []))
+            # Any non-200 answer (426 past the plan's result limit) ends the pages with what it returned
+            more = page * params['pageSize'] < min(data.get('totalResults', 0), NEWSAPI_MAX_RESULTS)
+            return data.get('articles', []), page + 1 if more else None
+        
+        def convert(article):
+            return self._located_article(
+                article,
+                text=article.get('content', article.get('description', '')),
+                source=(article.get('source') or {}).get('name', 'NewsAPI'),
+                url=article.get('url', ''),
+                published_at=article.get('publishedAt', ''),
+                api_source='newsapi'
+            )
+        
+        return list(collect_pages('NewsAPI', fetch_page, lambda article: article.get('url'), convert,
+                                  self.seen_items, self.page_budgets['NewsAPI']))
     
-    def _collect_mediastack_data(self) -> List[Dict[str, Any]]:
-        """Collect data from MediaStack API"""
+    def _collect_mediastack_data(self) -> List[Article]:
+        """Collect data from MediaStack API, following offset pages until already seen stories"""
         if not self.mediastack_key:
             logger.warning("MediaStack key not found")
             return []
         
-        try:
-            news_data = []
-            
-            url = "http://api.mediastack.com/v1/news"
-            params = {
-                'access_key': self.mediastack_key,
-                'countries': 'in',
-                'languages': 'en',
-                'keywords': ','.join(self.crisis_keywords[:10]),
-                'limit': 50,
-                'date': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                for article in data.get('data', []):
-                    if self._is_india_related(article.get('title', '') + ' ' + article.get('description', '')):
-                        location = self._extract_location(article.get('title', '') + ' ' + article.get('description', ''))
-                        coordinates = get_coordinates(location) if location else (20.5937, 78.9629)
-                        
-                        news_item = {
-                            'title': article.get('title', ''),
-                            'description': article.get('description', ''),
-                            'text': article.get('description', ''),
-                            'source': article.get('source', 'MediaStack'),
-                            'url': article.get('url', ''),
-                            'published_at': article.get('published_at', ''),
-                            'location': location,
-                            'latitude': coordinates[0],
-                            'longitude': coordinates[1],
-                            'api_source': 'mediastack'
-                        }
-                        news_data.append(news_item)
-            
-            logger.info(f"Collected {len(news_data)} articles from MediaStack")
-            return news_data
-            
-        except Exception as e:
-            logger.error(f"Error collecting MediaStack data: {str(e)}")
-            return []
+        url = "http://api.mediastack.com/v1/news"
+        params = {
+            'access_key': self.mediastack_key,
+            'countries': 'in',
+            'languages': 'en',
+            'keywords': ','.join(self.crisis_keywords[:10]),
+            'sort': 'published_desc',
+            'limit': 50,
+            'date': (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
+        }
+        
+        def fetch_page(offset):
+            with self.http.get('MediaStack', url, params={**params, 'offset': offset or 0},
+                               timeout=10) as (response, call):
+                data = response.json() if response.status_code == 200 else {}
+                call.items_returned = len(data.get('data', []))
+            page = data.get('pagination') or {}
+            next_offset = page.get('offset', 0) + page.get('count', 0)
+            return data.get('data', []), next_offset if next_offset < page.get('total', 0) else None
+        
+        def convert(article):
+            return self._located_article(
+                article,
+                text=article.get('description', ''),
+                source=article.get('source', 'MediaStack'),
+                url=article.get('url', ''),
+                published_at=article.get('published_at', ''),
+                api_source='mediastack'
+            )
+        
+        return list(collect_pages('MediaStack', fetch_page, lambda article: article.get('url'), convert,
+                                  self.seen_items, self.page_budgets['MediaStack']))
     
-    def _collect_newsdata_data(self) -> List[Dict[str, Any]]:
-        """Collect data from NewsData.io API"""
+    def _collect_newsdata_data(self) -> List[Article]:
+        """Collect data from NewsData.io API, following nextPage tokens until already seen stories"""
         if not self.newsdata_key:
             logger.warning("NewsData key not found")
             return []
         
-        try:
-            news_data = []
-            
-            url = "https://newsdata.io/api/1/news"
-            params = {
-                'apikey': self.newsdata_key,
-                'country': 'in',
-                'language': 'en',
-                'q': ' OR '.join(self.crisis_keywords[:10]),
-                'size': 50
-            }
-            
-            response = requests.get(url, params=params, timeout=10)
-            
-            if response.status_code == 200:
-                data = response.json()
-                
-                for article in data.get('results', []):
-                    if self._is_india_related(article.get('title', '') + ' ' + article.get('description', '')):
-                        location = self._extract_location(article.get('title', '') + ' ' + article.get('description', ''))
-                        coordinates = get_coordinates(location) if location else (20.5937, 78.9629)
-                        
-                        news_item = {
-                            'title': article.get('title', ''),
-                            'description': article.get('description', ''),
-                            'text': article.get('content', article.get('description', '')),
-                            'source': article.get('source_id', 'NewsData'),
-                            'url': article.get('link', ''),
-                            'published_at': article.get('pubDate', ''),
-                            'location': location,
-                            'latitude': coordinates[0],
-                            'longitude': coordinates[1],
-                            'api_source': 'newsdata'
-                        }
-                        news_data.append(news_item)
-            
-            logger.info(f"Collected {len(news_data)} articles from NewsData")
-            return news_data
-            
-        except Exception as e:
-            logger.error(f"Error collecting NewsData data: {str(e)}")
-            return []
+        url = "https://newsdata.io/api/1/news"
+        params = {
+            'apikey': self.newsdata_key,
+            'country': 'in',
+            'language': 'en',
+            'q': ' OR '.join(self.crisis_keywords[:10]),
+            'size': 50
+        }
+        
+        def fetch_page(token):
+            page_params = {**params, 'page': token} if token else params
+            with self.http.get('NewsData.io', url, params=page_params, timeout=10) as (response, call):
+                data = response.json() if response.status_code == 200 else {}
+                call.items_returned = len(data.get('results', []))
+            return data.get('results', []), data.get('nextPage')
+        
+        def convert(article):
+            return self._located_article(
+                article,
+                text=article.get('content', article.get('description', '')),
+                source=article.get('source_id', 'NewsData'),
+                url=article.get('link', ''),
+                published_at=article.get('pubDate', ''),
+                api_source='newsdata'
+            )
+        
+        return list(collect_pages('NewsData.io', fetch_page, lambda article: article.get('link'), convert,
+                                  self.seen_items, self.page_budgets['NewsData.io']))
     
-    def collect_weather_alerts(self) -> List[Dict[str, Any]]:
+    def collect_weather_alerts(self) -> List[WeatherAlert]:
         """Collect weather alerts from Weatherstack API"""
         if not self.weatherstack_key:
             logger.warning("Weatherstack key not found")
@@ -245,10 +242,11 @@ class DataCollector:
                     'units': 'm'
                 }
                 
-                response = requests.get(url, params=params, timeout=10)
+                with self.http.get('Weatherstack', url, params=params, timeout=10) as (response, call):
+                    data = response.json() if response.status_code == 200 else {}
+                    call.items_returned = 1 if 'current' in data else 0
                 
                 if response.status_code == 200:
-                    data = response.json()
                     current = data.get('current', {})
                     location = data.get('location', {})
                     
@@ -261,18 +259,18 @@ class DataCollector:
                     if (temperature > 45 or temperature < 0 or wind_speed > 60 or 
                         any(extreme in weather_desc for extreme in ['storm', 'heavy', 'severe', 'extreme'])):
                         
-                        alert = {
-                            'type': 'weather_alert',
-                            'city': location.get('name', city),
-                            'country': location.get('country', 'India'),
-                            'latitude': location.get('lat', 0),
-                            'longitude': location.get('lon', 0),
-                            'temperature': temperature,
-                            'description': weather_desc,
-                            'wind_speed': wind_speed,
-                            'timestamp': datetime.now().isoformat(),
-                            'severity': self._assess_weather_severity(temperature, wind_speed, weather_desc)
-                        }
+                        alert = WeatherAlert(
+                            alert_type='weather_alert',
+                            city=location.get('name', city),
+                            country=location.get('country', 'India'),
+                            latitude=location.get('lat', 0),
+                            longitude=location.get('lon', 0),
+                            temperature=temperature,
+                            description=weather_desc,
+                            wind_speed=wind_speed,
+                            timestamp=datetime.now().isoformat(),
+                            severity=self._assess_weather_severity(temperature, wind_speed, weather_desc)
+                        )
                         weather_alerts.append(alert)
                 
                 time.sleep(1)  # Rate limiting
@@ -280,66 +278,104 @@ class DataCollector:
             logger.info(f"Collected {len(weather_alerts)} weather alerts")
             return weather_alerts
             
+        except CircuitOpenError as e:
+            # Cities after the breaker opened are skipped; keep what was collected
+            logger.info(f"Weatherstack skipped: {e}")
+            return weather_alerts
         except Exception as e:
             logger.error(f"Error collecting weather data: {str(e)}")
             return []
     
-    def collect_rss_feeds(self) -> List[Dict[str, Any]]:
-        """Collect data from RSS feeds"""
+    def collect_rss_feeds(self) -> List[Article]:
+        """Collect data from RSS feeds; pass processed articles to mark_seen"""
         all_rss_data = []
         
         for source_name, feed_url in self.rss_feeds.items():
             try:
-                feed = feedparser.parse(feed_url)
+                # Fetch through the HTTP client so the call is bounded by a timeout, recorded and breaker-guarded
+                with self.http.get(f"RSS - {source_name}", feed_url, timeout=10) as (response, call):
+                    feed = feedparser.parse(response.content)
+                    call.items_returned = len(feed.entries)
                 
-                for entry in feed.entries[:10]:  # Limit entries per feed
+                # Newest first: stop at the first entry already read in an earlier cycle
+                source = f"RSS - {source_name}"
+                entries = []
+                for entry in feed.entries[:RSS_ENTRY_BUDGET]:
+                    if self.seen_items.is_seen(source, entry.get('id') or entry.get('link') or entry.get('title')):
+                        break
+                    entries.append(entry)
+                
+                skipped = []
+                for entry in entries:
+                    key = entry.get('id') or entry.get('link') or entry.get('title')
                     # Check if entry is crisis-related
                     title = entry.get('title', '')
                     summary = entry.get('summary', entry.get('description', ''))
                     
-                    if self._contains_crisis_keywords(title + ' ' + summary):
-                        location = self._extract_location(title + ' ' + summary)
+                    text = NormalizedText(title + ' ' + summary)
+                    if self._contains_crisis_keywords(text):
+                        location = self._extract_location(text)
                         coordinates = get_coordinates(location) if location else (20.5937, 78.9629)
                         
-                        rss_item = {
-                            'title': title,
-                            'description': summary,
-                            'text': summary,
-                            'source': source_name,
-                            'url': entry.get('link', ''),
-                            'published_at': entry.get('published', entry.get('updated', '')),
-                            'location': location,
-                            'latitude': coordinates[0],
-                            'longitude': coordinates[1],
-                            'api_source': 'rss'
-                        }
+                        rss_item = Article(
+                            title=title,
+                            description=summary,
+                            text=summary,
+                            source=source_name,
+                            url=entry.get('link', ''),
+                            published_at=entry.get('published', entry.get('updated', '')),
+                            location=location,
+                            latitude=coordinates[0],
+                            longitude=coordinates[1],
+                            api_source='rss'
+                        )
+                        rss_item.seen_key = (source, key) if key else None
                         all_rss_data.append(rss_item)
+                    else:
+                        skipped.append(key)
+                self.seen_items.add(source, skipped)
                 
                 time.sleep(0.5)  # Rate limiting
                 
+            except CircuitOpenError as e:
+                logger.info(f"RSS feed {source_name} skipped: {e}")
             except Exception as e:
                 logger.error(f"Error collecting RSS data from {source_name}: {str(e)}")
         
+        self.seen_items.flush()
         logger.info(f"Collected {len(all_rss_data)} items from RSS feeds")
         return all_rss_data
     
-    def _is_india_related(self, text: str) -> bool:
+    def mark_seen(self, articles: List[Article]):
+        """Add collected articles to the seen filter once the caller has processed them
+        
+        Until then the articles are fetched again on the next collection, so none is
+        lost if processing fails.
+        """
+        keys = {}
+        for article in articles:
+            if article.seen_key:
+                source, key = article.seen_key
+                keys.setdefault(source, []).append(key)
+        for source, source_keys in keys.items():
+            self.seen_items.add(source, source_keys)
+        self.seen_items.flush()
+    
+    def _is_india_related(self, text: Union[str, NormalizedText]) -> bool:
         """Check if text is related to India"""
-        text_lower = text.lower()
-        return any(location.lower() in text_lower for location in self.indian_locations)
+        return NormalizedText.of(text).mentions(self._location_terms)
     
-    def _extract_location(self, text: str) -> str:
+    def _extract_location(self, text: Union[str, NormalizedText]) -> str:
         """Extract Indian location from text"""
-        text_lower = text.lower()
-        for location in self.indian_locations:
-            if location.lower() in text_lower:
+        text_lower = NormalizedText.of(text).lower
+        for location, term in zip(self.indian_locations, self._location_terms):
+            if term in text_lower:
                 return location
         return None
     
-    def _contains_crisis_keywords(self, text: str) -> bool:
+    def _contains_crisis_keywords(self, text: Union[str, NormalizedText]) -> bool:
         """Check if text contains crisis-related keywords"""
-        text_lower = text.lower()
-        return any(keyword in text_lower for keyword in self.crisis_keywords)
+        return NormalizedText.of(text).mentions(self.crisis_keywords)
     
     def _assess_weather_severity(self, temperature: float, wind_speed: float, description: str) -> str:
         """Assess weather alert severity"""
@@ -1,550 +1,1536 @@
 import sqlite3
 import json
+import threading
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 import logging
 import os
 
+from utils import get_coordinates
+from query_cache import QueryCache
+from models import CrisisEvent, WeatherAlert, Incident
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Single database file shared by the dashboard, collectors and SMS alerter
+DEFAULT_DB_PATH = os.getenv("CRISIS_DB_PATH", "crisis_data.db")
+
+# Databases written by earlier versions; their rows are imported once by migration
+LEGACY_DASHBOARD_DB = 'crisis_radar_production.db'
+LEGACY_SMS_DB = 'sms_users.db'
+
+CRISIS_COLUMNS = ['id', 'title', 'description', 'crisis_type', 'severity', 'location',
+                  'latitude', 'longitude', 'source', 'url', 'published_at', 'detected_at',
+                  'confidence', 'api_source', 'is_verified', 'status', 'detected_keywords',
+                  'original_language', 'corroborating_sources', 'original_title', 'original_description']
+
+WEATHER_COLUMNS = ['id', 'alert_type', 'city', 'country', 'latitude', 'longitude',
+                   'temperature', 'description', 'wind_speed', 'severity', 'timestamp',
+                   'is_active']
+
+SMS_USER_COLUMNS = ['id', 'phone_number', 'location', 'latitude', 'longitude', 'alert_radius',
+                    'language', 'crisis_types', 'registered_at', 'active']
+
+INCIDENT_COLUMNS = ['id', 'crisis_type', 'title', 'description', 'location', 'latitude', 'longitude',
+                    'severity', 'confidence', 'event_count', 'sources', 'detected_keywords', 'url',
+                    'first_seen', 'last_seen', 'status']
+
+# Tables whose row counts are kept in table_counters by triggers
+COUNTED_TABLES = ['crisis_data', 'weather_alerts', 'user_locations', 'crisis_statistics', 'api_usage',
+                  'sms_users', 'sent_alerts']
+
+# Counter name for the number of active SMS subscribers
+ACTIVE_SMS_USERS_COUNTER = 'sms_users_active'
+
+
+def _column_names(cursor: sqlite3.Cursor, table: str, schema: str = 'main') -> List[str]:
+    """Return column names of a table, empty if the table does not exist"""
+    cursor.execute(f'PRAGMA {schema}.table_info({table})')
+    return [row[1] for row in cursor.fetchall()]
+
+
+def _add_column_if_missing(cursor: sqlite3.Cursor, table: str, column: str, declaration: str):
+    """Add a column unless an older schema already has it"""
+    if column not in _column_names(cursor, table):
+        cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {declaration}')
+
+
+def _migration_base_schema(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Create the original crisis database tables"""
+    # Crisis data table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS crisis_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT,
+            crisis_type TEXT NOT NULL,
+            severity TEXT NOT NULL,
+            location TEXT,
+            latitude REAL,
+            longitude REAL,
+            source TEXT,
+            url TEXT,
+            published_at TEXT,
+            detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            confidence REAL DEFAULT 0.0,
+            api_source TEXT,
+            is_verified BOOLEAN DEFAULT FALSE,
+            status TEXT DEFAULT 'active'
+        )
+    ''')
+
+    # Weather alerts table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS weather_alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            alert_type TEXT NOT NULL,
+            city TEXT NOT NULL,
+            country TEXT DEFAULT 'India',
+            latitude REAL,
+            longitude REAL,
+            temperature REAL,
+            description TEXT,
+            wind_speed REAL,
+            severity TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+    ''')
+
+    # User locations for targeted alerts
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS user_locations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            location_name TEXT NOT NULL,
+            latitude REAL NOT NULL,
+            longitude REAL NOT NULL,
+            alert_radius INTEGER DEFAULT 50,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+    ''')
+
+    # Crisis statistics table
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS crisis_statistics (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            date DATE NOT NULL,
+            crisis_type TEXT NOT NULL,
+            location TEXT,
+            count INTEGER DEFAULT 1,
+            severity_high INTEGER DEFAULT 0,
+            severity_medium INTEGER DEFAULT 0,
+            severity_low INTEGER DEFAULT 0,
+            UNIQUE(date, crisis_type, location)
+        )
+    ''')
+
+    # RSS feed tracking
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rss_tracking (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            feed_name TEXT NOT NULL,
+            feed_url TEXT NOT NULL,
+            last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_successful TIMESTAMP,
+            items_processed INTEGER DEFAULT 0,
+            error_count INTEGER DEFAULT 0,
+            is_active BOOLEAN DEFAULT TRUE
+        )
+    ''')
+
+    # API usage tracking
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS api_usage (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            api_name TEXT NOT NULL,
+            endpoint TEXT,
+            timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status_code INTEGER,
+            response_time REAL,
+            items_returned INTEGER DEFAULT 0,
+            error_message TEXT
+        )
+    ''')
+
+    # Historical trends
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS historical_trends (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            period_start DATE NOT NULL,
+            period_end DATE NOT NULL,
+            location TEXT NOT NULL,
+            crisis_type TEXT NOT NULL,
+            total_incidents INTEGER DEFAULT 0,
+            avg_severity REAL DEFAULT 0.0,
+            trend_direction TEXT,
+            confidence_score REAL DEFAULT 0.0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+    # Create indexes for better performance
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_type ON crisis_data(crisis_type)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_location ON crisis_data(location)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_severity ON crisis_data(severity)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_date ON crisis_data(detected_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_city ON weather_alerts(city)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_date ON weather_alerts(timestamp)')
+
+
+def _migration_unified_schema(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Add dashboard columns and the SMS subscriber tables to the shared schema"""
+    _add_column_if_missing(cursor, 'crisis_data', 'detected_keywords', 'TEXT')
+    _add_column_if_missing(cursor, 'crisis_data', 'original_language', 'TEXT')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sms_users (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            phone_number TEXT UNIQUE NOT NULL,
+            location TEXT,
+            latitude REAL,
+            longitude REAL,
+            alert_radius INTEGER DEFAULT 50,
+            language TEXT DEFAULT 'English',
+            crisis_types TEXT DEFAULT 'all',
+            registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            active BOOLEAN DEFAULT TRUE
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sent_alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            phone_number TEXT NOT NULL,
+            alert_type TEXT NOT NULL,
+            crisis_type TEXT,
+            location TEXT,
+            sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            message_sid TEXT
+        )
+    ''')
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_dedupe ON crisis_data(title, location, crisis_type)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_dedupe ON weather_alerts(city, alert_type, timestamp)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sms_users_active ON sms_users(active)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sent_alerts_recent ON sent_alerts(phone_number, crisis_type, location, sent_at)')
+
+
+def _read_legacy_table(path: str, table: str) -> Tuple[List[str], List[tuple]]:
+    """Read all rows of a table from a legacy database file"""
+    conn = sqlite3.connect(f'file:{path}?mode=ro', uri=True)
+    try:
+        cursor = conn.cursor()
+        columns = _column_names(cursor, table)
+        if not columns:
+            return [], []
+        cursor.execute(f'SELECT {", ".join(columns)} FROM {table}')
+        return columns, cursor.fetchall()
+    finally:
+        conn.close()
+
+
+def _migration_import_legacy(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Import rows from the dashboard and SMS databases used by earlier versions"""
+    unified_path = os.path.abspath(db.db_path)
+
+    dashboard_path = os.path.abspath(LEGACY_DASHBOARD_DB)
+    if os.path.exists(dashboard_path) and dashboard_path != unified_path:
+        columns, rows = _read_legacy_table(dashboard_path, 'crisis_events')
+        for row in rows:
+            event = dict(zip(columns, row))
+            cursor.execute('''
+                INSERT INTO crisis_data
+                (title, description, crisis_type, severity, location, latitude, longitude,
+                 source, url, detected_at, confidence, api_source, detected_keywords)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP), ?, ?, ?)
+            ''', (
+                event.get('title') or '', event.get('description'),
+                event.get('crisis_type') or 'unknown', event.get('severity') or 'medium',
+                event.get('location'), event.get('latitude'), event.get('longitude'),
+                event.get('source'), event.get('url'), event.get('timestamp'),
+                event.get('confidence') or 0.0, event.get('source'),
+                event.get('detected_keywords')
+            ))
+
+        columns, rows = _read_legacy_table(dashboard_path, 'weather_alerts')
+        if 'alert_type' not in columns:
+            for row in rows:
+                alert = dict(zip(columns, row))
+                cursor.execute('''
+                    INSERT INTO weather_alerts
+                    (alert_type, city, latitude, longitude, temperature, description,
+                     wind_speed, severity, timestamp)
+                    VALUES ('weather_alert', ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+                ''', (
+                    alert.get('city') or '', alert.get('latitude'), alert.get('longitude'),
+                    alert.get('temperature'), alert.get('description'), alert.get('wind_speed'),
+                    alert.get('severity'), alert.get('timestamp')
+                ))
+
+        columns, rows = _read_legacy_table(dashboard_path, 'sms_users')
+        for row in rows:
+            user = dict(zip(columns, row))
+            if not user.get('phone'):
+                continue
+            latitude, longitude = get_coordinates(user.get('location'))
+            cursor.execute('''
+                INSERT OR IGNORE INTO sms_users
+                (phone_number, location, latitude, longitude, alert_radius, language, registered_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                user['phone'], user.get('location'), latitude, longitude,
+                user.get('radius') or 50, user.get('language') or 'English',
+                user.get('registered_at')
+            ))
+
+        logger.info(f"Imported legacy dashboard data from {dashboard_path}")
+
+    sms_path = os.path.abspath(LEGACY_SMS_DB)
+    if os.path.exists(sms_path) and sms_path != unified_path:
+        columns, rows = _read_legacy_table(sms_path, 'sms_users')
+        for row in rows:
+            user = dict(zip(columns, row))
+            cursor.execute('''
+                INSERT OR IGNORE INTO sms_users
+                (phone_number, latitude, longitude, alert_radius, language, crisis_types,
+                 registered_at, active)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                user['phone_number'], user.get('latitude'), user.get('longitude'),
+                user.get('alert_radius') or 50, user.get('language') or 'English',
+                user.get('crisis_types') or 'all', user.get('registered_at'),
+                user.get('active', True)
+            ))
+
+        columns, rows = _read_legacy_table(sms_path, 'sent_alerts')
+        for row in rows:
+            alert = dict(zip(columns, row))
+            cursor.execute('''
+                INSERT INTO sent_alerts
+                (phone_number, alert_type, crisis_type, location, sent_at, message_sid)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (
+                alert['phone_number'], alert['alert_type'], alert.get('crisis_type'),
+                alert.get('location'), alert.get('sent_at'), alert.get('message_sid')
+            ))
+
+        logger.info(f"Imported legacy SMS subscribers from {sms_path}")
+
+
+def _migration_keyset_indexes(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Index (timestamp, id) so keyset pagination is a single index range scan"""
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_date_id ON crisis_data(detected_at, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_date_id ON weather_alerts(timestamp, id)')
+
+
+def _migration_api_usage_telemetry(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Record response sizes and index usage by source and time"""
+    _add_column_if_missing(cursor, 'api_usage', 'bytes_received', 'INTEGER DEFAULT 0')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_api_usage_name_time ON api_usage(api_name, timestamp)')
+
+
+def _migration_table_counters(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Keep row counts and daily sent-alert counts in trigger-maintained counter tables"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS table_counters (
+            table_name TEXT PRIMARY KEY,
+            row_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sent_alert_daily_counts (
+            day DATE PRIMARY KEY,
+            alert_count INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    for table in COUNTED_TABLES:
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_count_insert AFTER INSERT ON {table}
+            BEGIN
+                UPDATE table_counters SET row_count = row_count + 1 WHERE table_name = '{table}';
+            END
+        ''')
+        cursor.execute(f'''
+            CREATE TRIGGER IF NOT EXISTS trg_{table}_count_delete AFTER DELETE ON {table}
+            BEGIN
+                UPDATE table_counters SET row_count = row_count - 1 WHERE table_name = '{table}';
+            END
+        ''')
+        cursor.execute(f'''
+            INSERT OR REPLACE INTO table_counters (table_name, row_count)
+            SELECT '{table}', COUNT(*) FROM {table}
+        ''')
+
+    # Active subscribers change on insert, delete and (de)activation
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_sms_users_active_insert AFTER INSERT ON sms_users
+        WHEN NEW.active
+        BEGIN
+            UPDATE table_counters SET row_count = row_count + 1 WHERE table_name = 'sms_users_active';
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_sms_users_active_delete AFTER DELETE ON sms_users
+        WHEN OLD.active
+        BEGIN
+            UPDATE table_counters SET row_count = row_count - 1 WHERE table_name = 'sms_users_active';
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_sms_users_active_update AFTER UPDATE OF active ON sms_users
+        WHEN (NEW.active IS TRUE) != (OLD.active IS TRUE)
+        BEGIN
+            UPDATE table_counters
+            SET row_count = row_count + (CASE WHEN NEW.active THEN 1 ELSE -1 END)
+            WHERE table_name = 'sms_users_active';
+        END
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO table_counters (table_name, row_count)
+        SELECT 'sms_users_active', COUNT(*) FROM sms_users WHERE active = TRUE
+    ''')
+
+    # Sent alerts per UTC day, matching DATE('now') on read
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_sent_alerts_daily_insert AFTER INSERT ON sent_alerts
+        BEGIN
+            INSERT INTO sent_alert_daily_counts (day, alert_count) VALUES (DATE(NEW.sent_at), 1)
+            ON CONFLICT(day) DO UPDATE SET alert_count = alert_count + 1;
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_sent_alerts_daily_delete AFTER DELETE ON sent_alerts
+        BEGIN
+            UPDATE sent_alert_daily_counts SET alert_count = alert_count - 1
+            WHERE day = DATE(OLD.sent_at);
+        END
+    ''')
+    cursor.execute('''
+        INSERT OR REPLACE INTO sent_alert_daily_counts (day, alert_count)
+        SELECT DATE(sent_at), COUNT(*) FROM sent_alerts
+        WHERE sent_at IS NOT NULL
+        GROUP BY DATE(sent_at)
+    ''')
+
+
+def _migration_corroborating_sources(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Record other sources that reported the same story"""
+    _add_column_if_missing(cursor, 'crisis_data', 'corroborating_sources', 'TEXT')
+
+
+def _migration_incidents(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Add incidents consolidating crisis reports and link each report to its incident"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS incidents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            crisis_type TEXT NOT NULL,
+            title TEXT NOT NULL,
+            description TEXT,
+            location TEXT,
+            latitude REAL,
+            longitude REAL,
+            severity TEXT NOT NULL,
+            confidence REAL DEFAULT 0.0,
+            event_count INTEGER DEFAULT 0,
+            sources TEXT,
+            detected_keywords TEXT,
+            url TEXT,
+            first_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_seen TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            status TEXT DEFAULT 'active'
+        )
+    ''')
+
+    _add_column_if_missing(cursor, 'crisis_data', 'incident_id', 'INTEGER REFERENCES incidents(id)')
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_incidents_seen_id ON incidents(last_seen, id)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_incidents_type_seen ON incidents(crisis_type, last_seen)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_incident ON crisis_data(incident_id)')
+
+
+def _migration_analysis_cache(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Persistent article analysis results addressed by content hash"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS analysis_cache (
+            content_hash TEXT PRIMARY KEY,
+            version TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_analysis_cache_version ON analysis_cache(version)')
+
+
+def _migration_backfill_jobs(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Progress of reclassification backfills, so an interrupted run resumes where it stopped"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS backfill_jobs (
+            job TEXT PRIMARY KEY,
+            version TEXT,
+            last_id INTEGER DEFAULT 0,
+            processed INTEGER DEFAULT 0,
+            changed INTEGER DEFAULT 0,
+            status TEXT DEFAULT 'running',
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def _migration_poll_schedule(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Adaptive polling state per upstream source, shared by every process using the database"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS poll_schedule (
+            source TEXT PRIMARY KEY,
+            next_due_at REAL DEFAULT 0,
+            interval_seconds REAL,
+            yield_ewma REAL DEFAULT 0,
+            cost_per_poll REAL DEFAULT 1,
+            polls INTEGER DEFAULT 0,
+            new_items INTEGER DEFAULT 0,
+            last_polled_at TIMESTAMP
+        )
+    ''')
+
+
+def _migration_seen_filter(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Bloom filter generations of item URLs already read from the sources"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS seen_filter (
+            generation INTEGER PRIMARY KEY,
+            created_at REAL NOT NULL,
+            items INTEGER DEFAULT 0,
+            params TEXT NOT NULL,
+            bits BLOB NOT NULL
+        )
+    ''')
+
+
+def _migration_original_text(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Source-language title and description of translated crises"""
+    _add_column_if_missing(cursor, 'crisis_data', 'original_title', 'TEXT')
+    _add_column_if_missing(cursor, 'crisis_data', 'original_description', 'TEXT')
+
+
+def _migration_crisis_change_tracking(cursor: sqlite3.Cursor, db: 'CrisisDatabase'):
+    """Number every in-place change of a crisis row, so exports can refresh changed rows"""
+    _add_column_if_missing(cursor, 'crisis_data', 'change_seq', 'INTEGER DEFAULT 0')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_change_seq ON crisis_data(change_seq)')
+    cursor.execute('''
+        INSERT OR IGNORE INTO table_counters (table_name, row_count) VALUES ('crisis_data_changes', 0)
+    ''')
+    # Updates that set change_seq themselves (the trigger's own) are not counted again
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_crisis_data_change AFTER UPDATE ON crisis_data
+        WHEN NEW.change_seq IS OLD.change_seq
+        BEGIN
+            UPDATE table_counters SET row_count = row_count + 1 WHERE table_name = 'crisis_data_changes';
+            UPDATE crisis_data
+            SET change_seq = (SELECT row_count FROM table_counters WHERE table_name = 'crisis_data_changes')
+            WHERE id = NEW.id;
+        END
+    ''')
+
+
+# Ordered schema migrations; each runs once in its own transaction
+MIGRATIONS = [
+    (1, 'base schema', _migration_base_schema),
+    (2, 'unified dashboard and sms schema', _migration_unified_schema),
+    (3, 'import legacy databases', _migration_import_legacy),
+    (4, 'keyset pagination indexes', _migration_keyset_indexes),
+    (5, 'api usage telemetry', _migration_api_usage_telemetry),
+    (6, 'trigger-maintained table counters', _migration_table_counters),
+    (7, 'corroborating sources', _migration_corroborating_sources),
+    (8, 'incidents', _migration_incidents),
+    (9, 'analysis cache', _migration_analysis_cache),
+    (10, 'backfill jobs', _migration_backfill_jobs),
+    (11, 'poll schedule', _migration_poll_schedule),
+    (12, 'seen filter', _migration_seen_filter),
+    (13, 'original text of translated crises', _migration_original_text),
+    (14, 'crisis change tracking', _migration_crisis_change_tracking),
+]
+
+
+def or_bytes(first: bytes, second: bytes) -> bytearray:
+    """Bitwise OR of two equally long buffers, as whole integers rather than byte by byte"""
+    return bytearray((int.from_bytes(first, 'little') | int.from_bytes(second, 'little'))
+                     .to_bytes(len(first), 'little'))
+
+
 class CrisisDatabase:
-    def __init__(self, db_path: str = 'crisis_data.db'):
+    def __init__(self, db_path: str = DEFAULT_DB_PATH):
         """Initialize crisis database"""
         self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+
+        # Dashboard reads are cached per process and invalidated when ingestion commits
+        self.query_cache = QueryCache()
+        self._data_version = 0
+
         self._initialize_database()
-    
+
     def _initialize_database(self):
-        """Create database tables if they don't exist"""
+        """Configure the connection and apply pending schema migrations"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Crisis data table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS crisis_data (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    title TEXT NOT NULL,
-                    description TEXT,
-                    crisis_type TEXT NOT NULL,
-                    severity TEXT NOT NULL,
-                    location TEXT,
-                    latitude REAL,
-                    longitude REAL,
-                    source TEXT,
-                    url TEXT,
-                    published_at TEXT,
-                    detected_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    confidence REAL DEFAULT 0.0,
-                    api_source TEXT,
-                    is_verified BOOLEAN DEFAULT FALSE,
-                    status TEXT DEFAULT 'active'
-                )
-            ''')
-            
-            # Weather alerts table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS weather_alerts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    alert_type TEXT NOT NULL,
-                    city TEXT NOT NULL,
-                    country TEXT DEFAULT 'India',
-                    latitude REAL,
-                    longitude REAL,
-                    temperature REAL,
-                    description TEXT,
-                    wind_speed REAL,
-                    severity TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_active BOOLEAN DEFAULT TRUE
-                )
-            ''')
-            
-            # User locations for targeted alerts
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_locations (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    user_id TEXT NOT NULL,
-                    location_name TEXT NOT NULL,
-                    latitude REAL NOT NULL,
-                    longitude REAL NOT NULL,
-                    alert_radius INTEGER DEFAULT 50,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    is_active BOOLEAN DEFAULT TRUE
-                )
-            ''')
-            
-            # Crisis statistics table
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS crisis_statistics (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    date DATE NOT NULL,
-                    crisis_type TEXT NOT NULL,
-                    location TEXT,
-                    count INTEGER DEFAULT 1,
-                    severity_high INTEGER DEFAULT 0,
-                    severity_medium INTEGER DEFAULT 0,
-                    severity_low INTEGER DEFAULT 0,
-                    UNIQUE(date, crisis_type, location)
-                )
-            ''')
-            
-            # RSS feed tracking
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS rss_tracking (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    feed_name TEXT NOT NULL,
-                    feed_url TEXT NOT NULL,
-                    last_checked TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    last_successful TIMESTAMP,
-                    items_processed INTEGER DEFAULT 0,
-                    error_count INTEGER DEFAULT 0,
-                    is_active BOOLEAN DEFAULT TRUE
-                )
-            ''')
-            
-            # API usage tracking
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS api_usage (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    api_name TEXT NOT NULL,
-                    endpoint TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    status_code INTEGER,
-                    response_time REAL,
-                    items_returned INTEGER DEFAULT 0,
-                    error_message TEXT
-                )
-            ''')
-            
-            # Historical trends
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS historical_trends (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    period_start DATE NOT NULL,
-                    period_end DATE NOT NULL,
-                    location TEXT NOT NULL,
-                    crisis_type TEXT NOT NULL,
-                    total_incidents INTEGER DEFAULT 0,
-                    avg_severity REAL DEFAULT 0.0,
-                    trend_direction TEXT,
-                    confidence_score REAL DEFAULT 0.0,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''')
-            
-            # Create indexes for better performance
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_type ON crisis_data(crisis_type)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_location ON crisis_data(location)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_severity ON crisis_data(severity)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_crisis_date ON crisis_data(detected_at)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_city ON weather_alerts(city)')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_weather_date ON weather_alerts(timestamp)')
-            
-            conn.commit()
-            conn.close()
-            
+            with self._lock:
+                self._conn.execute('PRAGMA journal_mode=WAL')
+                self._conn.execute('PRAGMA synchronous=NORMAL')
+                self._conn.execute('''
+                    CREATE TABLE IF NOT EXISTS schema_migrations (
+                        version INTEGER PRIMARY KEY,
+                        description TEXT,
+                        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                ''')
+                self._conn.commit()
+                self._apply_migrations()
+
             logger.info("Database initialized successfully")
-            
+
         except Exception as e:
             logger.error(f"Error initializing database: {str(e)}")
-    
-    def store_crisis_data(self, crisis_items: List[Dict[str, Any]]) -> int:
-        """Store crisis data in database"""
+            raise
+
+    def _apply_migrations(self):
+        """Run migrations newer than the recorded schema version"""
+        cursor = self._conn.cursor()
+        cursor.execute('SELECT COALESCE(MAX(version), 0) FROM schema_migrations')
+        current_version = cursor.fetchone()[0]
+
+        for version, description, migration in MIGRATIONS:
+            if version <= current_version:
+                continue
+            try:
+                cursor.execute('BEGIN')
+                migration(cursor, self)
+                cursor.execute('INSERT INTO schema_migrations (version, description) VALUES (?, ?)',
+                               (version, description))
+                self._conn.commit()
+                logger.info(f"Applied database migration {version}: {description}")
+            except Exception as e:
+                self._conn.rollback()
+                logger.error(f"Error applying migration {version} ({description}): {str(e)}")
+                # Later migrations and every query assume this one; do not run on a partial schema
+                raise
+
+    @contextmanager
+    def _transaction(self):
+        """Yield a cursor on the shared connection and commit on success"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+                self._conn.commit()
+            except Exception:
+                self._conn.rollback()
+                raise
+            finally:
+                cursor.close()
+
+    @contextmanager
+    def _read(self):
+        """Yield a cursor on the shared connection for read-only queries"""
+        with self._lock:
+            cursor = self._conn.cursor()
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    def data_version(self) -> Tuple[int, int]:
+        """Version of the stored data: local ingestion commits plus writes from other connections"""
+        with self._lock:
+            external_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            return self._data_version, external_version
+
+    def _bump_data_version(self):
+        """Invalidate cached query results after ingestion commits new rows"""
+        with self._lock:
+            self._data_version += 1
+
+    def _cached(self, name: str, params: tuple, compute):
+        """Serve a query from the shared cache while the data version is unchanged"""
+        return self.query_cache.get_or_compute((name, params), self.data_version(), compute)
+
+    def close(self):
+        """Close the shared connection"""
+        with self._lock:
+            self._conn.close()
+
+    def store_crisis_data(self, crisis_items: List[CrisisEvent], raise_errors: bool = False) -> int:
+        """Store crisis data in database; on failure nothing is stored and ids stay None"""
         try:
             if not crisis_items:
                 return 0
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+
             stored_count = 0
-            
-            for item in crisis_items:
-                # Check if similar item already exists (avoid duplicates)
-                cursor.execute('''
-                    SELECT id FROM crisis_data 
-                    WHERE title = ? AND location = ? AND crisis_type = ?
-                    AND DATE(detected_at) = DATE('now')
-                ''', (item.get('title', ''), item.get('location', ''), item.get('crisis_type', '')))
-                
-                if cursor.fetchone() is None:
-                    # Insert new crisis data
+
+            with self._transaction() as cursor:
+                for item in crisis_items:
+                    # Check if similar item already exists (avoid duplicates)
                     cursor.execute('''
-                        INSERT INTO crisis_data 
-                        (title, description, crisis_type, severity, location, latitude, longitude, 
-                         source, url, published_at, confidence, api_source)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        item.get('title', ''),
-                        item.get('description', ''),
-                        item.get('crisis_type', 'unknown'),
-                        item.get('severity', 'medium'),
-                        item.get('location', ''),
-                        item.get('latitude', 0.0),
-                        item.get('longitude', 0.0),
-                        item.get('source', ''),
-                        item.get('url', ''),
-                        item.get('published_at', ''),
-                        item.get('confidence', 0.0),
-                        item.get('api_source', '')
-                    ))
-                    stored_count += 1
-                    
-                    # Update statistics
-                    self._update_crisis_statistics(item)
-            
-            conn.commit()
-            conn.close()
-            
+                        SELECT id FROM crisis_data
+                        WHERE title = ? AND location = ? AND crisis_type = ?
+                        AND DATE(detected_at) = DATE('now')
+                    ''', (item.title, item.location, item.crisis_type))
+
+                    if cursor.fetchone() is None:
+                        # Insert new crisis data
+                        cursor.execute('''
+                            INSERT INTO crisis_data
+                            (title, description, crisis_type, severity, location, latitude, longitude,
+                             source, url, published_at, confidence, api_source, detected_keywords,
+                             original_language, corroborating_sources, original_title, original_description)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', (
+                            item.title,
+                            item.description,
+                            item.crisis_type,
+                            item.severity,
+                            item.location,
+                            item.latitude,
+                            item.longitude,
+                            item.source,
+                            item.url,
+                            item.published_at,
+                            item.confidence,
+                            item.api_source or item.source,
+                            item.detected_keywords,
+                            item.original_language,
+                            item.corroborating_sources,
+                            item.original_title,
+                            item.original_description
+                        ))
+                        item.id = cursor.lastrowid
+                        stored_count += 1
+
+                        # Update statistics
+                        self._update_crisis_statistics(cursor, item)
+
+            if stored_count:
+                self._bump_data_version()
+
             logger.info(f"Stored {stored_count} new crisis items in database")
             return stored_count
-            
+
         except Exception as e:
+            # The transaction was rolled back; ids assigned inside it do not exist
+            for item in crisis_items:
+                item.id = None
             logger.error(f"Error storing crisis data: {str(e)}")
+            if raise_errors:
+                raise
             return 0
-    
-    def store_weather_data(self, weather_items: List[Dict[str, Any]]) -> int:
+
+    def add_corroborating_sources(self, sources_by_event: Dict[int, List[str]]) -> int:
+        """Append sources that re-reported already stored crises, returns rows updated"""
+        try:
+            if not sources_by_event:
+                return 0
+
+            updated = 0
+
+            with self._transaction() as cursor:
+                for event_id, sources in sources_by_event.items():
+                    cursor.execute('SELECT source, corroborating_sources FROM crisis_data WHERE id = ?',
+                                   (event_id,))
+                    row = cursor.fetchone()
+                    if row is None:
+                        continue
+
+                    known = [row[0]] + [s.strip() for s in (row[1] or '').split(',') if s.strip()]
+                    added = [s for s in dict.fromkeys(sources) if s not in known]
+                    if not added:
+                        continue
+
+                    cursor.execute('UPDATE crisis_data SET corroborating_sources = ? WHERE id = ?',
+                                   (', '.join(known[1:] + added), event_id))
+                    updated += 1
+
+            if updated:
+                self._bump_data_version()
+
+            return updated
+
+        except Exception as e:
+            logger.error(f"Error adding corroborating sources: {str(e)}")
+            return 0
+
+    def store_weather_data(self, weather_items: List[WeatherAlert]) -> int:
         """Store weather alert data in database"""
         try:
             if not weather_items:
                 return 0
-            
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+
             stored_count = 0
-            
-            for item in weather_items:
-                # Check if similar weather alert already exists
-                cursor.execute('''
-                    SELECT id FROM weather_alerts 
-                    WHERE city = ? AND alert_type = ?
-                    AND DATE(timestamp) = DATE('now')
-                ''', (item.get('city', ''), item.get('type', '')))
-                
-                if cursor.fetchone() is None:
+
+            with self._transaction() as cursor:
+                for item in weather_items:
+                    # Check if similar weather alert already exists
                     cursor.execute('''
-                        INSERT INTO weather_alerts 
-                        (alert_type, city, country, latitude, longitude, temperature, 
-                         description, wind_speed, severity)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ''', (
-                        item.get('type', 'weather_alert'),
-                        item.get('city', ''),
-                        item.get('country', 'India'),
-                        item.get('latitude', 0.0),
-                        item.get('longitude', 0.0),
-                        item.get('temperature', 0.0),
-                        item.get('description', ''),
-                        item.get('wind_speed', 0.0),
-                        item.get('severity', 'medium')
-                    ))
-                    stored_count += 1
-            
-            conn.commit()
-            conn.close()
-            
+                        SELECT id FROM weather_alerts
+                        WHERE city = ? AND alert_type = ?
+                        AND DATE(timestamp) = DATE('now')
+                    ''', (item.city, item.alert_type))
+
+                    if cursor.fetchone() is None:
+                        cursor.execute('''
+                            INSERT INTO weather_alerts
+                            (alert_type, city, country, latitude, longitude, temperature,
+                             description, wind_speed, severity)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ''', (
+                            item.alert_type,
+                            item.city,
+                            item.country,
+                            item.latitude,
+                            item.longitude,
+                            item.temperature,
+                            item.description,
+                            item.wind_speed,
+                            item.severity
+                        ))
+                        item.id = cursor.lastrowid
+                        stored_count += 1
+
+            if stored_count:
+                self._bump_data_version()
+
             logger.info(f"Stored {stored_count} new weather alerts in database")
             return stored_count
-            
+
         except Exception as e:
             logger.error(f"Error storing weather data: {str(e)}")
             return 0
-    
-    def get_recent_crises(self, hours: int = 24, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get recent crisis data"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM crisis_data 
-                WHERE detected_at >= datetime('now', '-{} hours')
-                ORDER BY detected_at DESC 
+
+    def _keyset_page(self, table: str, columns: List[str], timestamp_column: str,
+                     hours: Optional[int], page_size: int,
+                     cursor_key: Optional[Tuple[str, int]]) -> Tuple[List[tuple], Optional[Tuple[str, int]]]:
+        """Fetch one page ordered by (timestamp, id) descending, starting after cursor_key"""
+        conditions = []
+        params: List[Any] = []
+
+        if hours is not None:
+            conditions.append(f"{timestamp_column} >= datetime('now', ?)")
+            params.append(f'-{int(hours)} hours')
+
+        if cursor_key is not None:
+            conditions.append(f'({timestamp_column}, id) < (?, ?)')
+            params.extend(cursor_key)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        params.append(page_size)
+
+        with self._read() as cursor:
+            cursor.execute(f'''
+                SELECT {', '.join(columns)} FROM {table}
+                {where}
+                ORDER BY {timestamp_column} DESC, id DESC
                 LIMIT ?
-            '''.format(hours), (limit,))
-            
+            ''', params)
             rows = cursor.fetchall()
-            conn.close()
-            
-            # Convert to list of dictionaries
-            columns = ['id', 'title', 'description', 'crisis_type', 'severity', 'location', 
-                      'latitude', 'longitude', 'source', 'url', 'published_at', 'detected_at',
-                      'confidence', 'api_source', 'is_verified', 'status']
-            
-            crises = []
-            for row in rows:
-                crisis = dict(zip(columns, row))
-                crises.append(crisis)
-            
-            return crises
-            
+
+        next_key = None
+        if len(rows) == page_size:
+            last = dict(zip(columns, rows[-1]))
+            next_key = (last[timestamp_column], last['id'])
+
+        return rows, next_key
+
+    def get_crises_page(self, hours: Optional[int] = 24, page_size: int = 50,
+                        cursor: Optional[Tuple[str, int]] = None) -> Tuple[List[CrisisEvent], Optional[Tuple[str, int]]]:
+        """Get a page of recent crises and the cursor for the next (older) page"""
+        def compute():
+            rows, next_cursor = self._keyset_page('crisis_data', CRISIS_COLUMNS, 'detected_at',
+                                                  hours, page_size, cursor)
+            return [CrisisEvent.from_row(CRISIS_COLUMNS, row) for row in rows], next_cursor
+
+        try:
+            crises, next_cursor = self._cached('crises_page', (hours, page_size, cursor), compute)
+            return list(crises), next_cursor
+
+        except Exception as e:
+            logger.error(f"Error getting crisis page: {str(e)}")
+            return [], None
+
+    def get_weather_page(self, hours: Optional[int] = 24, page_size: int = 20,
+                         cursor: Optional[Tuple[str, int]] = None) -> Tuple[List[WeatherAlert], Optional[Tuple[str, int]]]:
+        """Get a page of recent weather alerts and the cursor for the next (older) page"""
+        def compute():
+            rows, next_cursor = self._keyset_page('weather_alerts', WEATHER_COLUMNS, 'timestamp',
+                                                  hours, page_size, cursor)
+            return [WeatherAlert.from_row(WEATHER_COLUMNS, row) for row in rows], next_cursor
+
+        try:
+            alerts, next_cursor = self._cached('weather_page', (hours, page_size, cursor), compute)
+            return list(alerts), next_cursor
+
         except Exception as e:
-            logger.error(f"Error getting recent crises: {str(e)}")
+            logger.error(f"Error getting weather page: {str(e)}")
+            return [], None
+
+    def iter_crisis_chunks(self, hours: Optional[int] = None, chunk_size: int = 500):
+        """Stream crises newest first in fixed-size chunks; hours=None streams all history"""
+        cursor = None
+        while True:
+            rows, cursor = self._keyset_page('crisis_data', CRISIS_COLUMNS, 'detected_at',
+                                             hours, chunk_size, cursor)
+            if rows:
+                yield [CrisisEvent.from_row(CRISIS_COLUMNS, row) for row in rows]
+            if cursor is None:
+                break
+
+    def iter_weather_chunks(self, hours: Optional[int] = None, chunk_size: int = 500):
+        """Stream weather alerts newest first in fixed-size chunks"""
+        cursor = None
+        while True:
+            rows, cursor = self._keyset_page('weather_alerts', WEATHER_COLUMNS, 'timestamp',
+                                             hours, chunk_size, cursor)
+            if rows:
+                yield [WeatherAlert.from_row(WEATHER_COLUMNS, row) for row in rows]
+            if cursor is None:
+                break
+
+    def save_incidents(self, incidents: List[Incident], links: List[Tuple[int, Incident]] = None) -> int:
+        """Insert new and update changed incidents, then link reports (event id, incident) to them"""
+        try:
+            if not incidents:
+                return 0
+
+            with self._transaction() as cursor:
+                for incident in incidents:
+                    values = [getattr(incident, column) for column in INCIDENT_COLUMNS[1:]]
+                    if incident.id is None:
+                        cursor.execute('''
+                            INSERT INTO incidents ({})
+                            VALUES ({})
+                        '''.format(', '.join(INCIDENT_COLUMNS[1:]), ', '.join('?' * len(values))), values)
+                        incident.id = cursor.lastrowid
+                    else:
+                        cursor.execute('''
+                            UPDATE incidents SET {} WHERE id = ?
+                        '''.format(', '.join(f'{column} = ?' for column in INCIDENT_COLUMNS[1:])),
+                            values + [incident.id])
+
+                if links:
+                    cursor.executemany('UPDATE crisis_data SET incident_id = ? WHERE id = ?',
+                                       [(incident.id, event_id) for event_id, incident in links
+                                        if event_id is not None])
+
+            self._bump_data_version()
+            return len(incidents)
+
+        except Exception as e:
+            logger.error(f"Error saving incidents: {str(e)}")
+            return 0
+
+    def get_incidents_page(self, hours: Optional[int] = 24, page_size: int = 50,
+                           cursor: Optional[Tuple[str, int]] = None) -> Tuple[List[Incident], Optional[Tuple[str, int]]]:
+        """Get a page of incidents updated in the last hours, most recently active first"""
+        def compute():
+            rows, next_cursor = self._keyset_page('incidents', INCIDENT_COLUMNS, 'last_seen',
+                                                  hours, page_size, cursor)
+            return [Incident.from_row(INCIDENT_COLUMNS, row) for row in rows], next_cursor
+
+        try:
+            incidents, next_cursor = self._cached('incidents_page', (hours, page_size, cursor), compute)
+            return list(incidents), next_cursor
+
+        except Exception as e:
+            logger.error(f"Error getting incident page: {str(e)}")
+            return [], None
+
+    def get_open_incidents(self, hours: int) -> List[Incident]:
+        """Get active incidents still inside the merge window, uncached for the tracker"""
+        try:
+            with self._read() as cursor:
+                cursor.execute('''
+                    SELECT {} FROM incidents
+                    WHERE status = 'active' AND last_seen >= datetime('now', ?)
+                '''.format(', '.join(INCIDENT_COLUMNS)), (f'-{int(hours)} hours',))
+                rows = cursor.fetchall()
+
+            return [Incident.from_row(INCIDENT_COLUMNS, row) for row in rows]
+
+        except Exception as e:
+            logger.error(f"Error getting open incidents: {str(e)}")
             return []
-    
-    def get_crisis_by_location(self, location: str, radius_km: float = 50) -> List[Dict[str, Any]]:
+
+    def get_recent_crises(self, hours: int = 24, limit: int = 100) -> List[CrisisEvent]:
+        """Get recent crisis data"""
+        crises, _ = self.get_crises_page(hours, limit)
+        return crises
+
+    def get_recent_weather_alerts(self, hours: int = 24, limit: int = 20) -> List[WeatherAlert]:
+        """Get recent weather alerts"""
+        alerts, _ = self.get_weather_page(hours, limit)
+        return alerts
+
+    def get_crisis_by_location(self, location: str, radius_km: float = 50) -> List[CrisisEvent]:
         """Get crises near a specific location"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # For simplicity, using location string matching
-            # In production, would use geographic distance calculations
-            cursor.execute('''
-                SELECT * FROM crisis_data 
-                WHERE location LIKE ? 
-                AND detected_at >= datetime('now', '-7 days')
-                ORDER BY detected_at DESC
-            ''', (f'%{location}%',))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            columns = ['id', 'title', 'description', 'crisis_type', 'severity', 'location', 
-                      'latitude', 'longitude', 'source', 'url', 'published_at', 'detected_at',
-                      'confidence', 'api_source', 'is_verified', 'status']
-            
-            crises = []
-            for row in rows:
-                crisis = dict(zip(columns, row))
-                crises.append(crisis)
-            
-            return crises
-            
+            with self._read() as cursor:
+                # For simplicity, using location string matching
+                # In production, would use geographic distance calculations
+                cursor.execute('''
+                    SELECT {} FROM crisis_data
+                    WHERE location LIKE ?
+                    AND detected_at >= datetime('now', '-7 days')
+                    ORDER BY detected_at DESC
+                '''.format(', '.join(CRISIS_COLUMNS)), (f'%{location}%',))
+
+                rows = cursor.fetchall()
+
+            return [CrisisEvent.from_row(CRISIS_COLUMNS, row) for row in rows]
+
         except Exception as e:
             logger.error(f"Error getting crises by location: {str(e)}")
             return []
-    
+
     def get_crisis_statistics(self, days: int = 30) -> Dict[str, Any]:
         """Get crisis statistics for specified period"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
+            return self._cached('crisis_statistics', (days,), lambda: self._compute_crisis_statistics(days))
+
+        except Exception as e:
+            logger.error(f"Error getting crisis statistics: {str(e)}")
+            return {}
+
+    def _compute_crisis_statistics(self, days: int) -> Dict[str, Any]:
+        """Run the statistics queries for a period"""
+        with self._read() as cursor:
             # Total crises by type
             cursor.execute('''
-                SELECT crisis_type, COUNT(*) as count 
-                FROM crisis_data 
+                SELECT crisis_type, COUNT(*) as count
+                FROM crisis_data
                 WHERE detected_at >= datetime('now', '-{} days')
                 GROUP BY crisis_type
                 ORDER BY count DESC
             '''.format(days))
-            
+
             crisis_types = dict(cursor.fetchall())
-            
+
             # Total crises by severity
             cursor.execute('''
-                SELECT severity, COUNT(*) as count 
-                FROM crisis_data 
+                SELECT severity, COUNT(*) as count
+                FROM crisis_data
                 WHERE detected_at >= datetime('now', '-{} days')
                 GROUP BY severity
             '''.format(days))
-            
+
             severity_counts = dict(cursor.fetchall())
-            
+
             # Top affected locations
             cursor.execute('''
-                SELECT location, COUNT(*) as count 
-                FROM crisis_data 
+                SELECT location, COUNT(*) as count
+                FROM crisis_data
                 WHERE detected_at >= datetime('now', '-{} days')
                 AND location IS NOT NULL AND location != ''
                 GROUP BY location
                 ORDER BY count DESC
                 LIMIT 10
             '''.format(days))
-            
+
             top_locations = dict(cursor.fetchall())
-            
+
             # Daily trends
             cursor.execute('''
-                SELECT DATE(detected_at) as date, COUNT(*) as count 
-                FROM crisis_data 
+                SELECT DATE(detected_at) as date, COUNT(*) as count
+                FROM crisis_data
                 WHERE detected_at >= datetime('now', '-{} days')
                 GROUP BY DATE(detected_at)
                 ORDER BY date
             '''.format(days))
-            
+
             daily_trends = dict(cursor.fetchall())
-            
+
             # Total counts
             cursor.execute('''
-                SELECT COUNT(*) FROM crisis_data 
+                SELECT COUNT(*) FROM crisis_data
                 WHERE detected_at >= datetime('now', '-{} days')
             '''.format(days))
-            
+
             total_crises = cursor.fetchone()[0]
-            
-            conn.close()
-            
-            return {
-                'total_crises': total_crises,
-                'crisis_types': crisis_types,
-                'severity_counts': severity_counts,
-                'top_locations': top_locations,
-                'daily_trends': daily_trends,
-                'period_days': days
-            }
-            
-        except Exception as e:
-            logger.error(f"Error getting crisis statistics: {str(e)}")
-            return {}
-    
-    def _update_crisis_statistics(self, crisis_item: Dict[str, Any]):
-        """Update crisis statistics table"""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            today = datetime.now().date()
-            crisis_type = crisis_item.get('crisis_type', 'unknown')
-            location = crisis_item.get('location', 'unknown')
-            severity = crisis_item.get('severity', 'medium')
-            
-            # Check if record exists for today
-            cursor.execute('''
-                SELECT id FROM crisis_statistics 
+
+        return {
+            'total_crises': total_crises,
+            'crisis_types': crisis_types,
+            'severity_counts': severity_counts,
+            'top_locations': top_locations,
+            'daily_trends': daily_trends,
+            'period_days': days
+        }
+
+    def _update_crisis_statistics(self, cursor: sqlite3.Cursor, crisis_item: CrisisEvent):
+        """Update crisis statistics table within the caller's transaction"""
+        today = datetime.now().date()
+        crisis_type = crisis_item.crisis_type or 'unknown'
+        location = crisis_item.location or 'unknown'
+        severity = crisis_item.severity or 'medium'
+
+        # Check if record exists for today
+        cursor.execute('''
+            SELECT id FROM crisis_statistics
+            WHERE date = ? AND crisis_type = ? AND location = ?
+        ''', (today, crisis_type, location))
+
+        if cursor.fetchone():
+            # Update existing record
+            severity_col = f'severity_{severity}' if severity in ['high', 'medium', 'low'] else 'severity_medium'
+            cursor.execute(f'''
+                UPDATE crisis_statistics
+                SET count = count + 1, {severity_col} = {severity_col} + 1
                 WHERE date = ? AND crisis_type = ? AND location = ?
             ''', (today, crisis_type, location))
-            
-            if cursor.fetchone():
-                # Update existing record
-                severity_col = f'severity_{severity}' if severity in ['high', 'medium', 'low'] else 'severity_medium'
-                cursor.execute(f'''
-                    UPDATE crisis_statistics 
-                    SET count = count + 1, {severity_col} = {severity_col} + 1
-                    WHERE date = ? AND crisis_type = ? AND location = ?
-                ''', (today, crisis_type, location))
-            else:
-                # Insert new record
-                high_count = 1 if severity == 'high' else 0
-                medium_count = 1 if severity == 'medium' else 0
-                low_count = 1 if severity == 'low' else 0
-                
-                cursor.execute('''
-                    INSERT INTO crisis_statistics 
-                    (date, crisis_type, location, count, severity_high, severity_medium, severity_low)
-                    VALUES (?, ?, ?, 1, ?, ?, ?)
-                ''', (today, crisis_type, location, high_count, medium_count, low_count))
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            logger.error(f"Error updating crisis statistics: {str(e)}")
-    
-    def log_api_usage(self, api_name: str, endpoint: str = None, status_code: int = None, 
+        else:
+            # Insert new record
+            high_count = 1 if severity == 'high' else 0
+            medium_count = 1 if severity == 'medium' else 0
+            low_count = 1 if severity == 'low' else 0
+
+            cursor.execute('''
+                INSERT INTO crisis_statistics
+                (date, crisis_type, location, count, severity_high, severity_medium, severity_low)
+                VALUES (?, ?, ?, 1, ?, ?, ?)
+            ''', (today, crisis_type, location, high_count, medium_count, low_count))
+
+    def log_api_usage(self, api_name: str, endpoint: str = None, status_code: int = None,
                      response_time: float = None, items_returned: int = 0, error_message: str = None):
         """Log API usage for monitoring and rate limiting"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO api_usage 
-                (api_name, endpoint, status_code, response_time, items_returned, error_message)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (api_name, endpoint, status_code, response_time, items_returned, error_message))
-            
-            conn.commit()
-            conn.close()
-            
+            with self._transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO api_usage
+                    (api_name, endpoint, status_code, response_time, items_returned, error_message)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', (api_name, endpoint, status_code, response_time, items_returned, error_message))
+
         except Exception as e:
             logger.error(f"Error logging API usage: {str(e)}")
-    
+
+    def log_api_usage_batch(self, records: List[tuple]):
+        """Insert buffered API usage records in one transaction
+
+        Each record is (api_name, endpoint, timestamp, status_code, response_time,
+        bytes_received, items_returned, error_message).
+        """
+        if not records:
+            return
+
+        try:
+            with self._transaction() as cursor:
+                cursor.executemany('''
+                    INSERT INTO api_usage
+                    (api_name, endpoint, timestamp, status_code, response_time, bytes_received,
+                     items_returned, error_message)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ''', records)
+
+        except Exception as e:
+            logger.error(f"Error logging API usage batch: {str(e)}")
+
     def get_api_usage_stats(self, hours: int = 24) -> Dict[str, Any]:
         """Get API usage statistics"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT api_name, COUNT(*) as calls, 
-                       AVG(response_time) as avg_response_time,
-                       SUM(items_returned) as total_items,
-                       COUNT(CASE WHEN status_code >= 400 THEN 1 END) as errors
-                FROM api_usage 
-                WHERE timestamp >= datetime('now', '-{} hours')
-                GROUP BY api_name
-            '''.format(hours))
-            
+            with self._read() as cursor:
+                cursor.execute('''
+                    SELECT api_name, COUNT(*) as calls,
+                           AVG(response_time) as avg_response_time,
+                           MAX(response_time) as max_response_time,
+                           SUM(items_returned) as total_items,
+                           SUM(bytes_received) as total_bytes,
+                           COUNT(CASE WHEN status_code >= 400 THEN 1 END) as errors,
+                           COUNT(CASE WHEN status_code IS NULL AND error_message IS NOT NULL THEN 1 END) as failures,
+                           MAX(CASE WHEN error_message IS NOT NULL THEN timestamp END) as last_error_at
+                    FROM api_usage
+                    WHERE timestamp >= datetime('now', '-{} hours')
+                    GROUP BY api_name
+                '''.format(hours))
+
+                rows = cursor.fetchall()
+
             stats = {}
-            for row in cursor.fetchall():
-                api_name, calls, avg_response_time, total_items, errors = row
+            for row in rows:
+                (api_name, calls, avg_response_time, max_response_time, total_items,
+                 total_bytes, errors, failures, last_error_at) = row
+                unsuccessful = (errors or 0) + (failures or 0)
                 stats[api_name] = {
                     'calls': calls,
                     'avg_response_time': round(avg_response_time or 0, 2),
+                    'max_response_time': round(max_response_time or 0, 2),
                     'total_items': total_items or 0,
+                    'total_bytes': total_bytes or 0,
                     'errors': errors or 0,
-                    'success_rate': round(((calls - (errors or 0)) / calls * 100) if calls > 0 else 0, 2)
+                    'failures': failures or 0,
+                    'last_error_at': last_error_at,
+                    'success_rate': round(((calls - unsuccessful) / calls * 100) if calls > 0 else 0, 2)
                 }
-            
-            conn.close()
+
             return stats
-            
+
         except Exception as e:
             logger.error(f"Error getting API usage stats: {str(e)}")
             return {}
-    
-    def cleanup_old_data(self, days_to_keep: int = 30):
-        """Clean up old data to manage database size"""
+
+    def count_api_calls_since(self, since: str) -> Dict[str, int]:
+        """Calls per api_name recorded at or after a UTC timestamp"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Remove old crisis data
+            with self._read() as cursor:
+                cursor.execute('''
+                    SELECT api_name, COUNT(*) FROM api_usage
+                    WHERE timestamp >= ?
+                    GROUP BY api_name
+                ''', (since,))
+                return dict(cursor.fetchall())
+
+        except Exception as e:
+            logger.error(f"Error counting API calls: {str(e)}")
+            return {}
+
+    def get_poll_schedule(self) -> Dict[str, Dict[str, Any]]:
+        """Polling state per source"""
+        columns = ['source', 'next_due_at', 'interval_seconds', 'yield_ewma', 'cost_per_poll',
+                   'polls', 'new_items', 'last_polled_at']
+        with self._read() as cursor:
+            cursor.execute('SELECT {} FROM poll_schedule'.format(', '.join(columns)))
+            return {row[0]: dict(zip(columns, row)) for row in cursor.fetchall()}
+
+    def save_poll_schedule(self, source: str, next_due_at: float, interval_seconds: float,
+                           yield_ewma: float, cost_per_poll: float, new_items: int):
+        """Record one poll of a source and when it is due next"""
+        with self._transaction() as cursor:
             cursor.execute('''
-                DELETE FROM crisis_data 
-                WHERE detected_at < datetime('now', '-{} days')
-            '''.format(days_to_keep))
-            
-            crisis_deleted = cursor.rowcount
-            
-            # Remove old weather alerts
+                INSERT INTO poll_schedule
+                (source, next_due_at, interval_seconds, yield_ewma, cost_per_poll, polls, new_items, last_polled_at)
+                VALUES (?, ?, ?, ?, ?, 1, ?, CURRENT_TIMESTAMP)
+                ON CONFLICT(source) DO UPDATE SET
+                    next_due_at = excluded.next_due_at,
+                    interval_seconds = excluded.interval_seconds,
+                    yield_ewma = excluded.yield_ewma,
+                    cost_per_poll = excluded.cost_per_poll,
+                    polls = polls + 1,
+                    new_items = new_items + excluded.new_items,
+                    last_polled_at = CURRENT_TIMESTAMP
+            ''', (source, next_due_at, interval_seconds, yield_ewma, cost_per_poll, new_items))
+
+    def get_seen_filter(self) -> List[Dict[str, Any]]:
+        """Stored seen-filter generations, oldest first"""
+        columns = ['generation', 'created_at', 'items', 'params', 'bits']
+        with self._read() as cursor:
+            cursor.execute('SELECT {} FROM seen_filter ORDER BY generation'.format(', '.join(columns)))
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def save_seen_filter(self, generations: List[Tuple[int, float, int, str, bytes]],
+                         keep: int) -> List[Dict[str, Any]]:
+        """Merge (generation, created_at, items, params, bits) rows into the stored seen filter
+
+        Other processes flush the same table, so a generation already stored with the
+        same params and created_at is OR-ed with ours instead of replaced; generations
+        only one side has are kept, up to the newest keep. Returns the merged rows,
+        oldest first.
+        """
+        with self._transaction() as cursor:
+            # Hold the write lock from the read on, so a concurrent flush waits for ours
+            cursor.execute('BEGIN IMMEDIATE')
+            cursor.execute('SELECT created_at, items, params, bits FROM seen_filter')
+            merged = {(params, created_at): (items, bytearray(bits))
+                      for created_at, items, params, bits in cursor.fetchall()}
+            for _, created_at, items, params, bits in generations:
+                stored = merged.get((params, created_at))
+                if stored is None or len(stored[1]) != len(bits):
+                    merged[(params, created_at)] = (items, bytearray(bits))
+                    continue
+                # Each side counts only its own adds; the larger is the closer estimate
+                merged[(params, created_at)] = (max(items, stored[0]), or_bytes(stored[1], bits))
+
+            newest = sorted(merged.items(), key=lambda entry: entry[0][1])[-keep:]
+            rows = [(number, created_at, items, params, bytes(bits))
+                    for number, ((params, created_at), (items, bits)) in enumerate(newest)]
+            cursor.execute('DELETE FROM seen_filter')
+            cursor.executemany('''
+                INSERT INTO seen_filter (generation, created_at, items, params, bits)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+
+        columns = ['generation', 'created_at', 'items', 'params', 'bits']
+        return [dict(zip(columns, row)) for row in rows]
+
+    def get_analysis_results(self, content_hashes: List[str]) -> Dict[str, str]:
+        """Get cached analysis JSON by content hash"""
+        results = {}
+        try:
+            with self._read() as cursor:
+                # Stay well under SQLite's bound parameter limit
+                for start in range(0, len(content_hashes), 500):
+                    chunk = content_hashes[start:start + 500]
+                    cursor.execute('''
+                        SELECT content_hash, result FROM analysis_cache
+                        WHERE content_hash IN ({})
+                    '''.format(', '.join('?' * len(chunk))), chunk)
+                    results.update(cursor.fetchall())
+
+        except Exception as e:
+            logger.error(f"Error reading analysis cache: {str(e)}")
+
+        return results
+
+    def store_analysis_results(self, rows: List[Tuple[str, str, str]]):
+        """Store (content_hash, version, result JSON) rows in the analysis cache"""
+        if not rows:
+            return
+
+        try:
+            with self._transaction() as cursor:
+                cursor.executemany('''
+                    INSERT OR REPLACE INTO analysis_cache (content_hash, version, result)
+                    VALUES (?, ?, ?)
+                ''', rows)
+
+        except Exception as e:
+            logger.error(f"Error writing analysis cache: {str(e)}")
+
+    def purge_analysis_results(self, current_version: str) -> int:
+        """Delete cached analyses produced by other analyzer versions"""
+        try:
+            with self._transaction() as cursor:
+                cursor.execute('DELETE FROM analysis_cache WHERE version != ?', (current_version,))
+                return cursor.rowcount
+
+        except Exception as e:
+            logger.error(f"Error purging analysis cache: {str(e)}")
+            return 0
+
+    def get_crises_after_id(self, last_id: int, limit: int = 500) -> List[CrisisEvent]:
+        """Crises with id above last_id in id order, for full-history scans
+
+        Read errors propagate: an empty list means the scan reached the end.
+        """
+        with self._read() as cursor:
+            cursor.execute('''
+                SELECT {} FROM crisis_data
+                WHERE id > ?
+                ORDER BY id
+                LIMIT ?
+            '''.format(', '.join(CRISIS_COLUMNS)), (last_id, limit))
+            return [CrisisEvent.from_row(CRISIS_COLUMNS, row) for row in cursor.fetchall()]
+
+    def count_crises_after_id(self, last_id: int) -> int:
+        with self._read() as cursor:
+            cursor.execute('SELECT COUNT(*) FROM crisis_data WHERE id > ?', (last_id,))
+            return cursor.fetchone()[0]
+
+    def get_backfill_job(self, job: str) -> Optional[Dict[str, Any]]:
+        with self._read() as cursor:
+            cursor.execute('''
+                SELECT job, version, last_id, processed, changed, status, started_at, updated_at
+                FROM backfill_jobs WHERE job = ?
+            ''', (job,))
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        return dict(zip(['job', 'version', 'last_id', 'processed', 'changed', 'status',
+                         'started_at', 'updated_at'], row))
+
+    def start_backfill_job(self, job: str, version: str, restart: bool = False) -> Dict[str, Any]:
+        """Create a backfill job, or return the existing one unless restart is set"""
+        with self._transaction() as cursor:
+            if restart:
+                cursor.execute('DELETE FROM backfill_jobs WHERE job = ?', (job,))
+            cursor.execute('''
+                INSERT OR IGNORE INTO backfill_jobs (job, version) VALUES (?, ?)
+            ''', (job, version))
+            cursor.execute('''
+                UPDATE backfill_jobs SET status = 'running', updated_at = CURRENT_TIMESTAMP
+                WHERE job = ? AND status != 'completed'
+            ''', (job,))
+        return self.get_backfill_job(job)
+
+    def apply_backfill_chunk(self, job: str, updates: List[tuple], last_id: int,
+                             processed: int, changed: int):
+        """Write reclassified rows and advance the job in one transaction
+
+        Each update is (crisis_type, severity, confidence, detected_keywords, location,
+        latitude, longitude, original_language, id).
+        """
+        with self._transaction() as cursor:
+            if updates:
+                cursor.executemany('''
+                    UPDATE crisis_data
+                    SET crisis_type = ?, severity = ?, confidence = ?, detected_keywords = ?,
+                        location = ?, latitude = ?, longitude = ?, original_language = ?
+                    WHERE id = ?
+                ''', updates)
             cursor.execute('''
-                DELETE FROM weather_alerts 
-                WHERE timestamp < datetime('now', '-{} days')
-            '''.format(days_to_keep))
-            
-            weather_deleted = cursor.rowcount
-            
-            # Remove old API usage logs
+                UPDATE backfill_jobs
+                SET last_id = ?, processed = processed + ?, changed = changed + ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE job = ?
+            ''', (last_id, processed, changed, job))
+
+        if updates:
+            self._bump_data_version()
+
+    def finish_backfill_job(self, job: str):
+        with self._transaction() as cursor:
             cursor.execute('''
-                DELETE FROM api_usage 
-                WHERE timestamp < datetime('now', '-{} days')
-            '''.format(days_to_keep))
-            
-            api_deleted = cursor.rowcount
-            
-            conn.commit()
-            conn.close()
-            
+                UPDATE backfill_jobs SET status = 'completed', updated_at = CURRENT_TIMESTAMP
+                WHERE job = ?
+            ''', (job,))
+
+    def register_sms_user(self, phone_number: str, location: str = None, latitude: float = None,
+                          longitude: float = None, alert_radius: int = 50, language: str = 'English',
+                          crisis_types: str = 'all') -> bool:
+        """Register or update an SMS subscriber"""
+        try:
+            with self._transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO sms_users
+                    (phone_number, location, latitude, longitude, alert_radius, language, crisis_types)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(phone_number) DO UPDATE SET
+                        location = excluded.location,
+                        latitude = excluded.latitude,
+                        longitude = excluded.longitude,
+                        alert_radius = excluded.alert_radius,
+                        language = excluded.language,
+                        crisis_types = excluded.crisis_types,
+                        active = TRUE
+                ''', (phone_number, location, latitude, longitude, alert_radius, language, crisis_types))
+
+            return True
+
+        except Exception as e:
+            logger.error(f"Error registering SMS user: {str(e)}")
+            return False
+
+    def deactivate_sms_user(self, phone_number: str) -> bool:
+        """Stop sending alerts to an SMS subscriber"""
+        try:
+            with self._transaction() as cursor:
+                cursor.execute('UPDATE sms_users SET active = FALSE WHERE phone_number = ?', (phone_number,))
+            return True
+
+        except Exception as e:
+            logger.error(f"Error deactivating SMS user: {str(e)}")
+            return False
+
+    def get_active_sms_users(self) -> List[Dict[str, Any]]:
+        """Get all active SMS subscribers"""
+        try:
+            with self._read() as cursor:
+                cursor.execute('SELECT {} FROM sms_users WHERE active = TRUE'.format(', '.join(SMS_USER_COLUMNS)))
+                rows = cursor.fetchall()
+
+            return [dict(zip(SMS_USER_COLUMNS, row)) for row in rows]
+
+        except Exception as e:
+            logger.error(f"Error getting SMS users: {str(e)}")
+            return []
+
+    def log_sent_alert(self, phone_number: str, alert_type: str, crisis_type: str = None,
+                       location: str = None, message_sid: str = None):
+        """Record an SMS alert that was sent"""
+        try:
+            with self._transaction() as cursor:
+                cursor.execute('''
+                    INSERT INTO sent_alerts
+                    (phone_number, alert_type, crisis_type, location, message_sid)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (phone_number, alert_type, crisis_type, location, message_sid))
+
+        except Exception as e:
+            logger.error(f"Error logging sent alert: {str(e)}")
+
+    def count_recent_alerts(self, phone_number: str, crisis_type: str, location: str,
+                            hours: float = 2) -> int:
+        """Count alerts of a type and location sent to a subscriber in the last hours"""
+        with self._read() as cursor:
+            cursor.execute('''
+                SELECT COUNT(*) FROM sent_alerts
+                WHERE phone_number = ? AND crisis_type = ? AND location = ?
+                AND sent_at > datetime('now', ?)
+            ''', (phone_number, crisis_type, location, f'-{hours} hours'))
+
+            return cursor.fetchone()[0]
+
+    def get_sms_user_stats(self) -> Dict[str, int]:
+        """Get counts of active subscribers and alerts sent today"""
+        with self._read() as cursor:
+            cursor.execute('SELECT row_count FROM table_counters WHERE table_name = ?',
+                           (ACTIVE_SMS_USERS_COUNTER,))
+            row = cursor.fetchone()
+            active_users = row[0] if row else 0
+
+            cursor.execute("SELECT alert_count FROM sent_alert_daily_counts WHERE day = DATE('now')")
+            row = cursor.fetchone()
+            alerts_today = row[0] if row else 0
+
+        return {
+            'active_users': active_users,
+            'alerts_sent_today': alerts_today
+        }
+
+    def cleanup_old_data(self, days_to_keep: int = 30):
+        """Clean up old data to manage database size"""
+        try:
+            with self._transaction() as cursor:
+                # Remove old crisis data
+                cursor.execute('''
+                    DELETE FROM crisis_data
+                    WHERE detected_at < datetime('now', '-{} days')
+                '''.format(days_to_keep))
+
+                crisis_deleted = cursor.rowcount
+
+                # Remove old weather alerts
+                cursor.execute('''
+                    DELETE FROM weather_alerts
+                    WHERE timestamp < datetime('now', '-{} days')
+                '''.format(days_to_keep))
+
+                weather_deleted = cursor.rowcount
+
+                # Remove old API usage logs
+                cursor.execute('''
+                    DELETE FROM api_usage
+                    WHERE timestamp < datetime('now', '-{} days')
+                '''.format(days_to_keep))
+
+                api_deleted = cursor.rowcount
+
+                # Remove cached analyses of articles that are no longer fetched
+                cursor.execute('''
+                    DELETE FROM analysis_cache
+                    WHERE created_at < datetime('now', '-{} days')
+                '''.format(days_to_keep))
+
+            self._bump_data_version()
+
             logger.info(f"Cleanup completed: {crisis_deleted} crisis records, {weather_deleted} weather records, {api_deleted} API logs deleted")
-            
+
         except Exception as e:
             logger.error(f"Error during cleanup: {str(e)}")
-    
+
     def get_database_info(self) -> Dict[str, Any]:
         """Get database information and statistics"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # Get table counts
-            tables = ['crisis_data', 'weather_alerts', 'user_locations', 'crisis_statistics', 'api_usage']
-            table_counts = {}
-            
-            for table in tables:
-                cursor.execute(f'SELECT COUNT(*) FROM {table}')
-                table_counts[table] = cursor.fetchone()[0]
-            
-            # Get database size
-            cursor.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
-            db_size = cursor.fetchone()[0]
-            
-            conn.close()
-            
+            with self._read() as cursor:
+                # Row counts are maintained by triggers, so this is one small lookup
+                cursor.execute('SELECT table_name, row_count FROM table_counters')
+                counters = dict(cursor.fetchall())
+                table_counts = {table: counters.get(table, 0) for table in COUNTED_TABLES}
+
+                # Get database size
+                cursor.execute("SELECT page_count * page_size as size FROM pragma_page_count(), pragma_page_size()")
+                db_size = cursor.fetchone()[0]
+
             return {
                 'database_path': self.db_path,
                 'database_size_bytes': db_size,
@@ -552,40 +1538,40 @@ class CrisisDatabase:
                 'table_counts': table_counts,
                 'total_records': sum(table_counts.values())
             }
-            
+
         except Exception as e:
             logger.error(f"Error getting database info: {str(e)}")
             return {}
-    
-    def search_crises(self, query: str, limit: int = 50) -> List[Dict[str, Any]]:
+
+    def search_crises(self, query: str, limit: int = 50) -> List[CrisisEvent]:
         """Search crises by text query"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT * FROM crisis_data 
-                WHERE (title LIKE ? OR description LIKE ? OR location LIKE ?)
-                AND detected_at >= datetime('now', '-30 days')
-                ORDER BY detected_at DESC 
-                LIMIT ?
-            ''', (f'%{query}%', f'%{query}%', f'%{query}%', limit))
-            
-            rows = cursor.fetchall()
-            conn.close()
-            
-            columns = ['id', 'title', 'description', 'crisis_type', 'severity', 'location', 
-                      'latitude', 'longitude', 'source', 'url', 'published_at', 'detected_at',
-                      'confidence', 'api_source', 'is_verified', 'status']
-            
-            results = []
-            for row in rows:
-                crisis = dict(zip(columns, row))
-                results.append(crisis)
-            
-            return results
-            
+            with self._read() as cursor:
+                cursor.execute('''
+                    SELECT {} FROM crisis_data
+                    WHERE (title LIKE ? OR description LIKE ? OR location LIKE ?)
+                    AND detected_at >= datetime('now', '-30 days')
+                    ORDER BY detected_at DESC
+                    LIMIT ?
+                '''.format(', '.join(CRISIS_COLUMNS)), (f'%{query}%', f'%{query}%', f'%{query}%', limit))
+
+                rows = cursor.fetchall()
+
+            return [CrisisEvent.from_row(CRISIS_COLUMNS, row) for row in rows]
+
         except Exception as e:
             logger.error(f"Error searching crises: {str(e)}")
             return []
 
+
+_databases: Dict[str, CrisisDatabase] = {}
+_databases_lock = threading.Lock()
+
+
+def get_database(db_path: str = None) -> CrisisDatabase:
+    """Return the process-wide CrisisDatabase for a path, creating it on first use"""
+    path = os.path.abspath(db_path or DEFAULT_DB_PATH)
+    with _databases_lock:
+        if path not in _databases:
+            _databases[path] = CrisisDatabase(db_path or DEFAULT_DB_PATH)
+        return _databases[path]
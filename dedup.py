@@ -0,0 +1,244 @@
+import time
+import zlib
+import calendar
+import threading
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple, Iterable, Union
+import logging
+
+import numpy as np
+
+from models import Article, CrisisEvent
+from database import CrisisDatabase, get_database
+from normalization import NormalizedText
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Mersenne prime used for the universal hash family; token hashes are 32-bit
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def shingles(text: Union[str, NormalizedText], size: int = 3) -> set:
+    """Hashed word n-grams of lower-cased text with HTML and punctuation removed"""
+    tokens = NormalizedText.of(text).tokens
+    if len(tokens) < size:
+        return {zlib.crc32(' '.join(tokens).encode('utf-8'))} if tokens else set()
+    return {
+        zlib.crc32(' '.join(tokens[i:i + size]).encode('utf-8'))
+        for i in range(len(tokens) - size + 1)
+    }
+
+
+class StoryCluster:
+    """A group of near-identical stories; the first member is the representative"""
+    __slots__ = ('representative', 'sources', 'urls', 'signature', 'seen_at', 'event_id')
+
+    def __init__(self, representative: Optional[Article], signature: np.ndarray,
+                 seen_at: float, event_id: int = None):
+        self.representative = representative
+        self.sources: List[str] = [representative.source] if representative else []
+        self.urls: List[str] = [representative.url] if representative and representative.url else []
+        self.signature = signature
+        self.seen_at = seen_at
+        self.event_id = event_id
+
+    def add(self, article: Article):
+        """Attach another copy of the story"""
+        if article.source not in self.sources:
+            self.sources.append(article.source)
+        if article.url and article.url not in self.urls:
+            self.urls.append(article.url)
+
+    @property
+    def corroborating_sources(self) -> List[str]:
+        """Sources other than the representative's"""
+        return self.sources[1:]
+
+
+class NearDuplicateDetector:
+    def __init__(self, window_hours: float = 24, num_perm: int = 64, bands: int = 16,
+                 threshold: float = 0.5, shingle_size: int = 3, seed: int = 7):
+        """MinHash signatures with a banded LSH index over stories seen in the last window_hours
+
+        With 16 bands of 4 rows, pairs above ~0.5 Jaccard similarity almost always
+        share a bucket; candidates are then confirmed against the threshold.
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.window_seconds = window_hours * 3600
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MAX_HASH, size=num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MAX_HASH, size=num_perm, dtype=np.uint64)
+
+        self._clusters: List[StoryCluster] = []
+        self._buckets: Dict[Tuple[int, bytes], List[StoryCluster]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def signature(self, text: Union[str, NormalizedText]) -> Optional[np.ndarray]:
+        """MinHash signature of a text, None if it has no tokens"""
+        hashed = shingles(text, self.shingle_size)
+        if not hashed:
+            return None
+
+        values = np.fromiter(hashed, dtype=np.uint64, count=len(hashed))
+        # (a * x + b) mod p for every permutation and shingle at once; a, x < 2^32
+        # keeps the product inside uint64
+        permuted = (np.outer(values, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def similarity(self, first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures"""
+        return float(np.count_nonzero(first == second)) / self.num_perm
+
+    def _band_keys(self, signature: np.ndarray):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def _find(self, signature: np.ndarray) -> Optional[StoryCluster]:
+        """Most similar indexed cluster above the threshold"""
+        best, best_score = None, self.threshold
+        checked = set()
+        for key in self._band_keys(signature):
+            for cluster in self._buckets.get(key, ()):
+                if id(cluster) in checked:
+                    continue
+                checked.add(id(cluster))
+                score = self.similarity(signature, cluster.signature)
+                if score >= best_score:
+                    best, best_score = cluster, score
+        return best
+
+    def _index(self, cluster: StoryCluster):
+        self._clusters.append(cluster)
+        for key in self._band_keys(cluster.signature):
+            self._buckets[key].append(cluster)
+
+    def prune(self, now: float = None):
+        """Forget clusters older than the window"""
+        cutoff = (now or time.time()) - self.window_seconds
+        with self._lock:
+            if all(c.seen_at >= cutoff for c in self._clusters):
+                return
+            self._clusters = [c for c in self._clusters if c.seen_at >= cutoff]
+            self._buckets = defaultdict(list)
+            for cluster in self._clusters:
+                for key in self._band_keys(cluster.signature):
+                    self._buckets[key].append(cluster)
+
+    def seed(self, events: Iterable[CrisisEvent]):
+        """Index already stored events so stories seen before a restart are recognised"""
+        now = time.time()
+        with self._lock:
+            for event in events:
+                # Match on the source-language text, which is what new articles carry
+                text = f"{event.display_title} {event.original_description or event.description or ''}"
+                signature = self.signature(text)
+                if signature is None:
+                    continue
+                seen_at = now
+                if event.detected_at:
+                    try:
+                        seen_at = calendar.timegm(time.strptime(event.detected_at[:19], '%Y-%m-%d %H:%M:%S'))
+                    except ValueError:
+                        pass
+                cluster = StoryCluster(None, signature, seen_at, event.id)
+                cluster.sources = [event.source] + [
+                    s.strip() for s in (event.corroborating_sources or '').split(',') if s.strip()
+                ]
+                self._index(cluster)
+
+    def deduplicate(self, articles: List[Article]) -> Tuple[List[StoryCluster], Dict[int, List[str]]]:
+        """Group articles into clusters of near-duplicates
+
+        Returns the clusters first seen in this batch (one representative each) and,
+        for stories matching an already stored event, the new sources per event id.
+        New clusters stay indexed until mark_stored or discard is called for them.
+        """
+        self.prune()
+        new_clusters: List[StoryCluster] = []
+        stored_matches: Dict[int, List[str]] = {}
+        now = time.time()
+
+        with self._lock:
+            for article in articles:
+                signature = self.signature(article.normalized)
+                if signature is None:
+                    continue
+
+                cluster = self._find(signature)
+                if cluster is None:
+                    cluster = StoryCluster(article, signature, now)
+                    self._index(cluster)
+                    new_clusters.append(cluster)
+                    continue
+
+                is_new_source = article.source not in cluster.sources
+                cluster.add(article)
+                if cluster.event_id is not None and is_new_source:
+                    stored_matches.setdefault(cluster.event_id, []).append(article.source)
+
+        duplicates = len(articles) - len(new_clusters)
+        if duplicates:
+            logger.info(f"Collapsed {duplicates} near-duplicate stories into {len(new_clusters)} clusters")
+
+        return new_clusters, stored_matches
+
+    def mark_stored(self, cluster: StoryCluster, event_id: Optional[int]):
+        """Link a cluster to its stored event; later copies then corroborate that row"""
+        with self._lock:
+            cluster.event_id = event_id
+            cluster.representative = None
+
+    def discard(self, clusters: Iterable[StoryCluster]):
+        """Un-index clusters whose representative was not stored
+
+        Otherwise they would absorb later copies of the story, which then could never
+        be stored. Clusters already linked to an event are kept.
+        """
+        with self._lock:
+            dropped = {id(cluster) for cluster in clusters if cluster.event_id is None}
+            if not dropped:
+                return
+            self._clusters = [c for c in self._clusters if id(c) not in dropped]
+            for key, bucket in list(self._buckets.items()):
+                kept = [c for c in bucket if id(c) not in dropped]
+                if kept:
+                    self._buckets[key] = kept
+                else:
+                    del self._buckets[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'clusters': len(self._clusters),
+                'buckets': len(self._buckets)
+            }
+
+
+_detectors: Dict[int, NearDuplicateDetector] = {}
+_detectors_lock = threading.Lock()
+
+
+def get_deduplicator(db: CrisisDatabase = None, window_hours: float = 24) -> NearDuplicateDetector:
+    """Return the process-wide detector for a database, seeded with its stored events
+
+    Shared by all dashboard sessions and the push endpoint, so a story is stored
+    once however many of them ingest a copy.
+    """
+    db = db or get_database()
+    with _detectors_lock:
+        if id(db) not in _detectors:
+            detector = NearDuplicateDetector(window_hours=window_hours)
+            for chunk in db.iter_crisis_chunks(hours=window_hours):
+                detector.seed(chunk)
+            _detectors[id(db)] = detector
+        return _detectors[id(db)]
@@ -0,0 +1,104 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+import logging
+
+from circuit_breaker import CircuitOpenError
+from http_client import HttpClient, get_http_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Telemetry name of article page fetches; breakers are per host
+API_NAME = 'Article fetch'
+
+
+def _extract(html: str, url: str) -> Optional[str]:
+    # Imported on first use: trafilatura pulls in lxml and justext
+    import trafilatura
+
+    return trafilatura.extract(html, url=url, include_comments=False, include_tables=False,
+                               favor_precision=True)
+
+
+class ArticleEnricher:
+    def __init__(self, http: HttpClient = None, max_bytes: int = 1_000_000, max_chars: int = 20_000,
+                 cache_entries: int = 1024, timeout: float = 10.0):
+        """Fetch article pages and extract the body text with trafilatura
+
+        Pages are read up to max_bytes and bodies kept up to max_chars. Bodies,
+        including failed fetches as None, are cached per URL (LRU of cache_entries),
+        so an article seen again on the next poll is not fetched twice. Each host has
+        its own circuit breaker. Thread-safe; callers provide the workers.
+        """
+        self.http = http or get_http_client()
+        self.max_bytes = max_bytes
+        self.max_chars = max_chars
+        self.cache_entries = cache_entries
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._cache: 'OrderedDict[str, Optional[str]]' = OrderedDict()
+        self._fetched = 0
+        self._cache_hits = 0
+        self._failures = 0
+        self._bytes = 0
+
+    def _cached(self, url: str):
+        """(hit, body) for a URL"""
+        with self._lock:
+            if url in self._cache:
+                self._cache.move_to_end(url)
+                self._cache_hits += 1
+                return True, self._cache[url]
+        return False, None
+
+    def _remember(self, url: str, body: Optional[str]):
+        with self._lock:
+            self._cache[url] = body
+            self._cache.move_to_end(url)
+            while len(self._cache) > self.cache_entries:
+                self._cache.popitem(last=False)
+
+    def fetch_body(self, url: str) -> Optional[str]:
+        """Main text of the page at url, None if it cannot be fetched or has none"""
+        if not url or not url.startswith(('http://', 'https://')):
+            return None
+        hit, body = self._cached(url)
+        if hit:
+            return body
+
+        host = urlsplit(url).netloc
+        body = None
+        try:
+            with self.http.get(API_NAME, url, timeout=self.timeout, source=f"Web - {host}",
+                               max_bytes=self.max_bytes) as (response, call):
+                content_type = response.headers.get('Content-Type', '')
+                if response.status_code == 200 and 'html' in content_type.lower():
+                    body = _extract(response.text, url)
+                    call.items_returned = 1 if body else 0
+            with self._lock:
+                self._fetched += 1
+                self._bytes += len(response.content or b'')
+        except CircuitOpenError:
+            # Not cached, so the page is tried again once the host recovers
+            return None
+        except Exception as e:
+            logger.warning(f"Could not enrich {url}: {e}")
+            with self._lock:
+                self._failures += 1
+
+        body = body[:self.max_chars] if body else None
+        self._remember(url, body)
+        return body
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'fetched': self._fetched,
+                'cache_hits': self._cache_hits,
+                'failures': self._failures,
+                'bytes': self._bytes,
+                'cached_urls': len(self._cache)
+            }
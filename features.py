@@ -0,0 +1,193 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Dict, Optional, Iterable, Union
+
+import numpy as np
+
+from normalization import NormalizedText
+
+# Severity classification with enhanced keywords
+SEVERITY_INDICATORS = {
+    'high': ['severe', 'massive', 'devastating', 'major', 'critical', 'catastrophic', 'extreme', 'deadly', 'killed', 'died', 'death', 'hundreds', 'thousands'],
+    'medium': ['moderate', 'significant', 'considerable', 'notable', 'substantial', 'injured', 'damaged', 'affected'],
+    'low': ['minor', 'small', 'light', 'slight', 'minimal', 'reported', 'alert', 'warning']
+}
+
+# Keyword groups of the 0..1 severity score
+HIGH_SEVERITY_TERMS = ['catastrophic', 'devastating', 'massive', 'severe', 'extreme', 'major', 'critical', 'emergency', 'disaster']
+MEDIUM_SEVERITY_TERMS = ['moderate', 'significant', 'considerable', 'notable', 'substantial', 'serious']
+ACTION_TERMS = ['evacuate', 'rescue', 'emergency', 'alert', 'warning', 'declare']
+
+
+def _number(name: str) -> str:
+    return rf'(?P<{name}>\d+(?:\.\d+)?)'
+
+
+# One named number group per quantity; each pattern is tried where a number or word starts
+QUANTITY_PATTERNS = {
+    'deaths': r'(?P<deaths>\d+)\s*(?:dead|killed|died|deaths?|casualties)',
+    'injured': r'(?P<injured>\d+)\s*(?:injured|hurt|wounded)',
+    'displaced': r'(?P<displaced>\d+)\s*(?:missing|displaced|evacuated)',
+    'structures': r'(?P<structures>\d+)\s*(?:houses?|buildings?|homes?)\s*(?:destroyed|damaged|collapsed)',
+    'magnitude': r'magnitude\s*(?:of\s*)?' + _number('magnitude'),
+    'magnitude_before': _number('magnitude_before') + r'\s*-?\s*magnitude',
+    'wind_kmh': _number('wind_kmh') + r'\s*(?:kmph|km/h|kmh|km per hour)',
+    'wind_mph': _number('wind_mph') + r'\s*mph',
+    'rain_mm': _number('rain_mm') + r'\s*mm\s*(?:of\s*)?(?:rain|rainfall|precipitation)',
+    'rain_cm': _number('rain_cm') + r'\s*cm\s*(?:of\s*)?(?:rain|rainfall|precipitation)',
+}
+
+# Columns of feature_matrix
+FEATURE_COLUMNS = ['deaths', 'injured', 'displaced', 'structures', 'magnitude',
+                   'wind_speed_kmh', 'rainfall_mm', 'max_number',
+                   'high_terms', 'medium_terms', 'action_terms']
+
+# Thresholds for severity from measured quantities alone; wind and rain follow
+# IMD categories (severe cyclonic storm, very heavy and extremely heavy rainfall)
+QUANTITY_THRESHOLDS = {
+    'casualties': (50, 10, 0),
+    'magnitude': (6.0, 4.5, 0),
+    'wind_speed_kmh': (118, 62, 0),
+    'rainfall_mm': (204.5, 115.6, 0)
+}
+_LEVELS = ('high', 'medium', 'low')
+
+
+@dataclass(slots=True)
+class SeverityFeatures:
+    deaths: float = 0.0
+    injured: float = 0.0
+    displaced: float = 0.0
+    structures: float = 0.0
+    magnitude: float = 0.0
+    wind_speed_kmh: float = 0.0
+    rainfall_mm: float = 0.0
+    numbers: List[float] = field(default_factory=list)
+    terms: frozenset = frozenset()
+
+    def hits(self, words: Iterable[str]) -> List[str]:
+        """Words of a list found in the text, in list order"""
+        return [word for word in words if word in self.terms]
+
+    def severity_level(self, indicators: Dict[str, List[str]] = None):
+        """First severity level (in table order) with keyword hits, and those hits"""
+        for level, words in (indicators or SEVERITY_INDICATORS).items():
+            matched = self.hits(words)
+            if matched:
+                return level, matched
+        return None, []
+
+    def quantity_severity(self) -> Optional[str]:
+        """Severity implied by casualty counts, magnitude, wind speed or rainfall; None without numbers"""
+        values = {
+            'casualties': max(self.deaths, self.injured),
+            'magnitude': self.magnitude,
+            'wind_speed_kmh': self.wind_speed_kmh,
+            'rainfall_mm': self.rainfall_mm
+        }
+        best = None
+        for name, value in values.items():
+            if value <= 0:
+                continue
+            for rank, threshold in enumerate(QUANTITY_THRESHOLDS[name]):
+                if value > threshold:
+                    best = rank if best is None else min(best, rank)
+                    break
+        return _LEVELS[best] if best is not None else None
+
+
+class FeatureExtractor:
+    def __init__(self, terms: Iterable[str] = ()):
+        """Find quantities and vocabulary terms in a single regex scan of the lower-cased text
+
+        The vocabulary is the severity tables of this module plus terms. Terms are
+        matched where a word starts, so inflections ('severely', 'deaths') count; a
+        term inside a longer matched term ('light' in 'slight') counts too.
+        """
+        vocabulary = set(terms) | set(HIGH_SEVERITY_TERMS) | set(MEDIUM_SEVERITY_TERMS) | set(ACTION_TERMS)
+        for words in SEVERITY_INDICATORS.values():
+            vocabulary.update(words)
+        vocabulary = sorted({term.lower() for term in vocabulary if term}, key=len, reverse=True)
+
+        # Terms contained in each term, so the longest match at a position implies the rest
+        self._contained = {
+            term: [other for other in vocabulary if other != term and other in term]
+            for term in vocabulary
+        }
+
+        alternatives = list(QUANTITY_PATTERNS.values())
+        alternatives.append('(?P<term>' + '|'.join(re.escape(term) for term in vocabulary) + ')')
+        self._scanner = re.compile(r'(?<![\w.])(?=' + '|'.join(alternatives) + ')')
+
+    def extract(self, text: Union[str, NormalizedText]) -> SeverityFeatures:
+        features = SeverityFeatures()
+        terms = set()
+
+        for match in self._scanner.finditer(NormalizedText.of(text).lower):
+            kind = match.lastgroup
+            if kind == 'term':
+                term = match.group('term')
+                terms.add(term)
+                terms.update(self._contained[term])
+                continue
+
+            value = float(match.group(kind))
+            features.numbers.append(value)
+            if kind in ('deaths', 'injured', 'displaced', 'structures'):
+                setattr(features, kind, max(getattr(features, kind), value))
+            elif kind in ('magnitude', 'magnitude_before'):
+                features.magnitude = max(features.magnitude, value)
+            elif kind == 'wind_kmh':
+                features.wind_speed_kmh = max(features.wind_speed_kmh, value)
+            elif kind == 'wind_mph':
+                features.wind_speed_kmh = max(features.wind_speed_kmh, value * 1.609)
+            elif kind == 'rain_mm':
+                features.rainfall_mm = max(features.rainfall_mm, value)
+            elif kind == 'rain_cm':
+                features.rainfall_mm = max(features.rainfall_mm, value * 10)
+
+        features.terms = frozenset(terms)
+        return features
+
+    def extract_batch(self, texts: List[Union[str, NormalizedText]]) -> List[SeverityFeatures]:
+        return [self.extract(text) for text in texts]
+
+
+def feature_matrix(batch: List[SeverityFeatures]) -> np.ndarray:
+    """One row per text with FEATURE_COLUMNS"""
+    matrix = np.zeros((len(batch), len(FEATURE_COLUMNS)), dtype=np.float64)
+    for row, features in enumerate(batch):
+        matrix[row] = (
+            features.deaths, features.injured, features.displaced, features.structures,
+            features.magnitude, features.wind_speed_kmh, features.rainfall_mm,
+            max(features.numbers) if features.numbers else 0.0,
+            len(features.hits(HIGH_SEVERITY_TERMS)),
+            len(features.hits(MEDIUM_SEVERITY_TERMS)),
+            len(features.hits(ACTION_TERMS))
+        )
+    return matrix
+
+
+def severity_scores(batch: List[SeverityFeatures]) -> np.ndarray:
+    """0..1 severity score per text from keyword groups and the largest reported number"""
+    if not batch:
+        return np.zeros(0)
+    matrix = feature_matrix(batch)
+    column = {name: matrix[:, index] for index, name in enumerate(FEATURE_COLUMNS)}
+
+    score = column['high_terms'] * 0.3 + column['medium_terms'] * 0.2 + column['action_terms'] * 0.1
+    max_number = column['max_number']
+    score += np.select([max_number > 100, max_number > 50, max_number > 10, max_number > 0],
+                       [0.4, 0.3, 0.2, 0.1], default=0.0)
+    return np.minimum(score, 1.0)
+
+
+_default_extractor: Optional[FeatureExtractor] = None
+
+
+def get_feature_extractor() -> FeatureExtractor:
+    """Shared extractor over the default vocabulary"""
+    global _default_extractor
+    if _default_extractor is None:
+        _default_extractor = FeatureExtractor()
+    return _default_extractor
@@ -0,0 +1,87 @@
+from typing import Optional, Tuple
+
+from models import INDIA_CENTER
+
+# Indian coordinates database
+INDIAN_COORDINATES = {
+    'mumbai': (19.0760, 72.8777), 'delhi': (28.6139, 77.2090), 
+    'bangalore': (12.9716, 77.5946), 'hyderabad': (17.3850, 78.4867),
+    'ahmedabad': (23.0225, 72.5714), 'chennai': (13.0827, 80.2707),
+    'kolkata': (22.5726, 88.3639), 'pune': (18.5204, 73.8567),
+    'jaipur': (26.9124, 75.7873), 'lucknow': (26.8467, 80.9462),
+    'kanpur': (26.4499, 80.3319), 'nagpur': (21.1458, 79.0882),
+    'indore': (22.7196, 75.8577), 'bhopal': (23.2599, 77.4126),
+    'visakhapatnam': (17.6868, 83.2185), 'patna': (25.5941, 85.1376),
+    'vadodara': (22.3072, 73.1812), 'ludhiana': (30.9010, 75.8573),
+    'agra': (27.1767, 78.0081), 'nashik': (19.9975, 73.7898),
+    'srinagar': (34.0837, 74.7973), 'guwahati': (26.1445, 91.7362),
+    'chandigarh': (30.7333, 76.7794), 'thiruvananthapuram': (8.5241, 76.9366),
+    'bhubaneswar': (20.2961, 85.8245), 'mysore': (12.2958, 76.6394),
+    'goa': (15.2993, 74.1240), 'coimbatore': (11.0168, 76.9558),
+    'madurai': (9.9252, 78.1198), 'varanasi': (25.3176, 82.9739),
+    'allahabad': (25.4358, 81.8463), 'jodhpur': (26.2389, 73.0243),
+    'kochi': (9.9312, 76.2673), 'vijayawada': (16.5062, 80.6480)
+}
+
+# Indian states data
+INDIAN_STATES = {
+    'Andhra Pradesh': (15.9129, 79.7400), 'Arunachal Pradesh': (28.2180, 94.7278),
+    'Assam': (26.2006, 92.9376), 'Bihar': (25.0961, 85.3131),
+    'Chhattisgarh': (21.2787, 81.8661), 'Goa': (15.2993, 74.1240),
+    'Gujarat': (22.2587, 71.1924), 'Haryana': (29.0588, 76.0856),
+    'Himachal Pradesh': (31.1048, 77.1734), 'Jharkhand': (23.6102, 85.2799),
+    'Karnataka': (15.3173, 75.7139), 'Kerala': (10.8505, 76.2711),
+    'Madhya Pradesh': (22.9734, 78.6569), 'Maharashtra': (19.7515, 75.7139),
+    'Manipur': (24.6637, 93.9063), 'Meghalaya': (25.4670, 91.3662),
+    'Mizoram': (23.1645, 92.9376), 'Nagaland': (26.1584, 94.5624),
+    'Odisha': (20.9517, 85.0985), 'Punjab': (31.1471, 75.3412),
+    'Rajasthan': (27.0238, 74.2179), 'Sikkim': (27.5330, 88.5122),
+    'Tamil Nadu': (11.1271, 78.6569), 'Telangana': (18.1124, 79.0193),
+    'Tripura': (23.9408, 91.9882), 'Uttarakhand': (30.0668, 79.0193),
+    'Uttar Pradesh': (26.8467, 80.9462), 'West Bengal': (22.9868, 87.8550),
+    'Delhi': (28.6139, 77.2090)
+}
+
+# Common alternative city names
+CITY_VARIATIONS = {
+    'bombay': 'Mumbai', 'calcutta': 'Kolkata', 'madras': 'Chennai',
+    'new delhi': 'Delhi', 'bengaluru': 'Bangalore'
+}
+
+
+def extract_location(text_lower: str) -> Optional[str]:
+    """Most specific known place named in lower-cased text: city, then alternative name, then state"""
+    # Check cities first (more specific)
+    for city in INDIAN_COORDINATES.keys():
+        if city in text_lower:
+            return city.title()
+    
+    # Check for city variations
+    for variation, proper_name in CITY_VARIATIONS.items():
+        if variation in text_lower:
+            return proper_name
+    
+    # Check states
+    for state in INDIAN_STATES.keys():
+        if state.lower() in text_lower:
+            return state
+    
+    return None
+
+
+def location_coordinates(location: Optional[str]) -> Tuple[float, float]:
+    """Coordinates of a place returned by extract_location, the centre of India if unknown"""
+    if not location:
+        return INDIA_CENTER
+    
+    location_lower = location.lower()
+    
+    # Check cities
+    if location_lower in INDIAN_COORDINATES:
+        return INDIAN_COORDINATES[location_lower]
+    
+    # Check states
+    if location in INDIAN_STATES:
+        return INDIAN_STATES[location]
+    
+    return INDIA_CENTER
@@ -0,0 +1,136 @@
+import os
+import time
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Optional
+from urllib.parse import urlsplit
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from circuit_breaker import CircuitBreaker, get_circuit_breaker
+from telemetry import ApiTelemetry, get_telemetry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _read_limited(response, max_bytes: int) -> bytes:
+    """Body of a streamed response, cut off after max_bytes"""
+    chunks, size = [], 0
+    try:
+        for chunk in response.iter_content(chunk_size=16384):
+            chunks.append(chunk)
+            size += len(chunk)
+            if size >= max_bytes:
+                break
+    finally:
+        response.close()
+    return b''.join(chunks)[:max_bytes]
+
+
+def _retry_after(response) -> float:
+    """Seconds from a Retry-After header, 0 if absent or a date"""
+    try:
+        return float(response.headers.get('Retry-After', 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class HttpClient:
+    def __init__(self, telemetry: ApiTelemetry = None, timeout: float = 10.0, pool_size: int = 16,
+                 base_url: str = None, recorder=None):
+        """Outbound GETs through a pooled session, recorded by telemetry and guarded by circuit breakers
+
+        Every call is checked against its source's breaker first, so a source whose
+        circuit is open costs no network time; the outcome of each call feeds the
+        breaker's health statistics.
+
+        With base_url every upstream URL is sent to base_url/<host>/<path> instead,
+        such as the mock upstream of replay.py. A recorder (replay.ResponseRecorder)
+        is given every response received from the real upstreams.
+        """
+        self.telemetry = telemetry or get_telemetry()
+        self.timeout = timeout
+        self.base_url = base_url
+        self.recorder = recorder
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    @staticmethod
+    def breaker(source: str) -> CircuitBreaker:
+        return get_circuit_breaker(source)
+
+    def _route(self, url: str) -> str:
+        if not self.base_url:
+            return url
+        parts = urlsplit(url)
+        routed = f"{self.base_url.rstrip('/')}/{parts.netloc}{parts.path}"
+        return f"{routed}?{parts.query}" if parts.query else routed
+
+    @contextmanager
+    def get(self, api_name: str, url: str, params: Dict[str, Any] = None, timeout: float = None,
+            source: str = None, max_bytes: int = None):
+        """GET url and yield (response, call); set call.items_returned inside the block
+
+        source names the breaker (default api_name). Raises CircuitOpenError without
+        a request while the source's circuit is open; 429 and 5xx responses and
+        network errors count as failures. With max_bytes the body is streamed and
+        response.content holds at most that many bytes.
+        """
+        breaker = self.breaker(source or api_name)
+        breaker.before_call()
+
+        with self.telemetry.track(api_name, url) as call:
+            started = time.perf_counter()
+            try:
+                response = self.session.get(self._route(url), params=params, timeout=timeout or self.timeout,
+                                            stream=max_bytes is not None)
+                if max_bytes is not None:
+                    response._content = _read_limited(response, max_bytes)
+            except requests.RequestException as e:
+                breaker.record_failure(f"{type(e).__name__}: {e}", time.perf_counter() - started)
+                raise
+            latency = time.perf_counter() - started
+            call.set_response(response)
+            if self.recorder is not None and not self.base_url:
+                self._record(api_name, url, params, response)
+
+            if response.status_code == 429:
+                breaker.record_failure("HTTP 429", latency, retry_after=_retry_after(response))
+            elif response.status_code >= 500:
+                breaker.record_failure(f"HTTP {response.status_code}", latency)
+            else:
+                breaker.record_success(latency)
+
+            yield response, call
+
+    def _record(self, api_name: str, url: str, params: Optional[Dict[str, Any]], response):
+        try:
+            self.recorder.record(api_name, requests.Request('GET', url, params=params).prepare().url, response)
+        except Exception as e:
+            logger.warning(f"Could not record {api_name} response: {e}")
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client(telemetry: ApiTelemetry = None) -> HttpClient:
+    """Return the process-wide client
+
+    CRISIS_UPSTREAM_URL routes all calls to a mock upstream; CRISIS_RECORD_DIR
+    records every upstream response to that directory.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            recorder = None
+            if os.getenv('CRISIS_RECORD_DIR'):
+                from replay import ResponseRecorder
+                recorder = ResponseRecorder(os.getenv('CRISIS_RECORD_DIR'))
+            _client = HttpClient(telemetry, base_url=os.getenv('CRISIS_UPSTREAM_URL') or None, recorder=recorder)
+        return _client
@@ -0,0 +1,172 @@
+import time
+import threading
+from collections import defaultdict
+from typing import List, Dict, Optional, Tuple
+import logging
+
+from database import CrisisDatabase, get_database
+from models import CrisisEvent, Incident, SEVERITY_RANK
+from utils import calculate_distance
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Location given to reports that could not be placed more precisely than the country
+UNLOCATED = 'India'
+
+# Keep the merged keyword list short enough for map tooltips
+MAX_INCIDENT_KEYWORDS = 10
+
+
+def _now() -> str:
+    """Current UTC time in SQLite's CURRENT_TIMESTAMP format"""
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+
+
+def _split(value: str) -> List[str]:
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+class IncidentTracker:
+    def __init__(self, db: CrisisDatabase = None, radius_km: float = 100.0, window_hours: int = 48):
+        """Incrementally merge classified reports into incidents by crisis type, distance and time
+
+        A report joins the nearest active incident of the same type within radius_km
+        that was last reported less than window_hours ago; otherwise it opens a new one.
+        """
+        self.db = db or get_database()
+        self.radius_km = radius_km
+        self.window_hours = window_hours
+        self._lock = threading.Lock()
+
+        # Open incidents per crisis type, so a report is only compared with its own type
+        self._open: Dict[str, List[Incident]] = defaultdict(list)
+        for incident in self.db.get_open_incidents(window_hours):
+            self._open[incident.crisis_type].append(incident)
+
+    def _expire(self):
+        """Close incidents that have not been reported on within the window"""
+        cutoff = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(time.time() - self.window_hours * 3600))
+        for crisis_type in list(self._open):
+            self._open[crisis_type] = [i for i in self._open[crisis_type] if (i.last_seen or '') >= cutoff]
+
+    def _match(self, event: CrisisEvent) -> Optional[Incident]:
+        """Nearest open incident the report belongs to"""
+        unlocated = (event.location or UNLOCATED) == UNLOCATED
+        best, best_distance = None, self.radius_km
+
+        for incident in self._open.get(event.crisis_type, ()):
+            # Country-level reports only merge with each other, never with a placed incident
+            if ((incident.location or UNLOCATED) == UNLOCATED) != unlocated:
+                continue
+            distance = calculate_distance(incident.latitude, incident.longitude,
+                                          event.latitude, event.longitude)
+            if distance <= best_distance:
+                best, best_distance = incident, distance
+
+        return best
+
+    def _open_incident(self, event: CrisisEvent, seen_at: str) -> Incident:
+        incident = Incident(
+            crisis_type=event.crisis_type,
+            title=event.title,
+            description=event.description,
+            location=event.location or UNLOCATED,
+            latitude=event.latitude,
+            longitude=event.longitude,
+            first_seen=seen_at
+        )
+        self._merge(incident, event, seen_at)
+        self._open[event.crisis_type].append(incident)
+        return incident
+
+    def _merge(self, incident: Incident, event: CrisisEvent, seen_at: str) -> bool:
+        """Fold a report into the running aggregates, returns True if severity went up"""
+        incident.event_count += 1
+        count = incident.event_count
+
+        # Running mean of report coordinates
+        incident.latitude += (event.latitude - incident.latitude) / count
+        incident.longitude += (event.longitude - incident.longitude) / count
+
+        escalated = SEVERITY_RANK.get(event.severity, 0) > SEVERITY_RANK.get(incident.severity, 0)
+        if escalated or count == 1:
+            # The most severe report becomes the headline
+            incident.severity = event.severity
+            incident.title = event.title
+            incident.description = event.description
+            incident.url = event.url
+
+        incident.confidence = max(incident.confidence or 0.0, event.confidence or 0.0)
+
+        sources = _split(incident.sources)
+        for source in [event.source] + _split(event.corroborating_sources):
+            if source and source not in sources:
+                sources.append(source)
+        incident.sources = ', '.join(sources)
+
+        keywords = _split(incident.detected_keywords)
+        for keyword in _split(event.detected_keywords):
+            if keyword not in keywords and len(keywords) < MAX_INCIDENT_KEYWORDS:
+                keywords.append(keyword)
+        incident.detected_keywords = ', '.join(keywords)
+
+        incident.last_seen = seen_at
+        return escalated and count > 1
+
+    def ingest(self, events: List[CrisisEvent]) -> List[Tuple[Incident, str]]:
+        """Merge reports into incidents and persist them
+
+        Returns each touched incident with what happened to it: 'new', 'escalated'
+        or 'updated'.
+        """
+        if not events:
+            return []
+
+        seen_at = _now()
+        changes: Dict[int, Tuple[Incident, str]] = {}
+        links: List[Tuple[int, Incident]] = []
+
+        with self._lock:
+            self._expire()
+            for event in events:
+                incident = self._match(event)
+                if incident is None:
+                    incident = self._open_incident(event, seen_at)
+                    change = 'new'
+                else:
+                    change = 'escalated' if self._merge(incident, event, seen_at) else 'updated'
+
+                previous = changes.get(id(incident), (incident, 'updated'))[1]
+                if previous in ('new', 'escalated'):
+                    change = previous
+                changes[id(incident)] = (incident, change)
+                links.append((event.id, incident))
+
+            self.db.save_incidents([incident for incident, _ in changes.values()], links)
+
+        counts = defaultdict(int)
+        for _, change in changes.values():
+            counts[change] += 1
+        logger.info(f"Merged {len(events)} reports into incidents: {dict(counts)}")
+
+        return list(changes.values())
+
+    def get_open_incidents(self) -> List[Incident]:
+        """Incidents currently accepting new reports"""
+        with self._lock:
+            self._expire()
+            return [incident for incidents in self._open.values() for incident in incidents]
+
+
+_trackers: Dict[int, IncidentTracker] = {}
+_trackers_lock = threading.Lock()
+
+
+def get_incident_tracker(db: CrisisDatabase = None) -> IncidentTracker:
+    """Return the process-wide incident tracker for a database, shared by all dashboard sessions"""
+    db = db or get_database()
+    with _trackers_lock:
+        if id(db) not in _trackers:
+            _trackers[id(db)] = IncidentTracker(db)
+        return _trackers[id(db)]
@@ -0,0 +1,433 @@
+import os
+import re
+import hmac
+import json
+import time
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit, parse_qs
+from xml.etree import ElementTree
+import logging
+
+from models import Article
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# api_source of pushed articles; the source is "Push - <partner>"
+API_SOURCE = 'Push'
+
+MAX_BODY_BYTES = 2_000_000
+MAX_BATCH_ITEMS = 500
+MAX_TITLE_CHARS = 500
+MAX_DESCRIPTION_CHARS = 10_000
+
+# CAP messages that carry no new alert
+_CAP_SKIPPED_TYPES = {'Cancel', 'Ack', 'Error'}
+
+
+def _local(tag: str) -> str:
+    """Element name without its XML namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+
+def _child(element, name: str):
+    return next((child for child in element if _local(child.tag) == name), None)
+
+
+def _text(element, name: str) -> str:
+    child = _child(element, name) if element is not None else None
+    return (child.text or '').strip() if child is not None else ''
+
+
+def parse_json_batch(body: bytes) -> List[Any]:
+    """Items of a JSON batch: a list, {"items": [...]} or a single object"""
+    data = json.loads(body.decode('utf-8'))
+    if isinstance(data, dict):
+        data = data.get('items', [data])
+    if not isinstance(data, list):
+        raise ValueError("expected a JSON object or a list of objects")
+    return data
+
+
+def parse_cap(body: bytes) -> List[Any]:
+    """Items from CAP 1.1/1.2 alerts: a single <alert> or any document containing alerts
+
+    Each alert becomes one item from its English <info> block (else the first).
+    Cancel, Ack and Error messages are returned as errors.
+    """
+    if b'<!DOCTYPE' in body.upper():
+        raise ValueError("DOCTYPE declarations are not accepted")
+    root = ElementTree.fromstring(body)
+    alerts = [root] if _local(root.tag) == 'alert' else [e for e in root.iter() if _local(e.tag) == 'alert']
+    if not alerts:
+        raise ValueError("no CAP <alert> element found")
+
+    items = []
+    for alert in alerts:
+        msg_type = _text(alert, 'msgType')
+        if msg_type in _CAP_SKIPPED_TYPES:
+            items.append(ValueError(f"CAP {msg_type} messages are not ingested"))
+            continue
+        infos = [child for child in alert if _local(child.tag) == 'info']
+        info = next((i for i in infos if _text(i, 'language').lower().startswith('en')), infos[0] if infos else None)
+        if info is None:
+            items.append(ValueError("CAP alert without <info>"))
+            continue
+
+        areas = [_text(area, 'areaDesc') for area in info if _local(area.tag) == 'area']
+        description = ' '.join(part for part in (_text(info, 'description'), _text(info, 'instruction')) if part)
+        items.append({
+            'id': f"{_text(alert, 'sender')}/{_text(alert, 'identifier')}",
+            'title': _text(info, 'headline') or _text(info, 'event'),
+            'description': description,
+            'url': _text(info, 'web'),
+            'published_at': _text(alert, 'sent'),
+            'location': ', '.join(area for area in areas if area)
+        })
+    return items
+
+
+def to_article(item: Any, partner: str) -> Article:
+    """Validate one pushed item; raises ValueError with the reason it is rejected"""
+    if isinstance(item, Exception):
+        raise item
+    if not isinstance(item, dict):
+        raise ValueError("item must be an object")
+
+    fields = {}
+    for name in ('title', 'description', 'text', 'url', 'published_at', 'location', 'id'):
+        value = item.get(name)
+        if value is not None and not isinstance(value, str):
+            raise ValueError(f"{name} must be a string")
+        fields[name] = (value or '').strip()
+
+    if not fields['title']:
+        raise ValueError("title is required")
+    if len(fields['title']) > MAX_TITLE_CHARS:
+        raise ValueError(f"title longer than {MAX_TITLE_CHARS} characters")
+    if len(fields['description']) + len(fields['text']) > MAX_DESCRIPTION_CHARS:
+        raise ValueError(f"description and text longer than {MAX_DESCRIPTION_CHARS} characters")
+    if fields['url'] and urlsplit(fields['url']).scheme not in ('http', 'https'):
+        raise ValueError("url must be http or https")
+
+    description = fields['description'] or fields['title']
+    if fields['location']:
+        # In the text, so the pipeline's geocoding and analysis cache see it
+        description = f"{description} Location: {fields['location']}"
+
+    article = Article(
+        title=fields['title'],
+        description=description,
+        source=f"Push - {partner}",
+        url=fields['url'],
+        published_at=fields['published_at'],
+        api_source=API_SOURCE,
+        text=fields['text']
+    )
+    # The URL is the partner's to choose and may name a host inside our network;
+    # it is stored and shown, never fetched. Partners send the body as text instead.
+    article.fetchable = False
+    return article
+
+
+def item_key(item: Any) -> Optional[str]:
+    """Identity a partner's retransmission of the item shares: its id, URL or title"""
+    if isinstance(item, dict):
+        return item.get('id') or item.get('url') or item.get('title')
+    return None
+
+
+class PushBatch:
+    __slots__ = ('id', 'partner', 'received_at', 'articles', 'keys', 'accepted', 'duplicates', 'rejected',
+                 'status', 'events', 'error', 'finished_at', 'done')
+
+    def __init__(self, partner: str):
+        self.id = uuid.uuid4().hex[:16]
+        self.partner = partner
+        self.received_at = time.time()
+        self.articles: List[Article] = []
+        self.keys: List[str] = []
+        self.accepted = 0
+        self.duplicates = 0
+        self.rejected: List[Dict[str, Any]] = []
+        self.status = 'queued'
+        self.events: List[Dict[str, Any]] = []
+        self.error: Optional[str] = None
+        self.finished_at: Optional[float] = None
+        self.done = threading.Event()
+
+    def ack(self) -> Dict[str, Any]:
+        ack = {
+            'batch_id': self.id,
+            'status': self.status,
+            'accepted': self.accepted,
+            'duplicates': self.duplicates,
+            'rejected': self.rejected
+        }
+        if self.done.is_set():
+            ack['events'] = self.events
+            ack['seconds'] = round(self.finished_at - self.received_at, 3)
+            if self.error:
+                ack['error'] = self.error
+        return ack
+
+
+class IngestService:
+    def __init__(self, system, max_pending: int = 100, keep_batches: int = 1000):
+        """Validates pushed batches and feeds them to the system's ingestion pipeline
+
+        Accepted items are checked against the seen filter, so retransmitted alerts
+        are acknowledged as duplicates without being processed again; items are
+        added to it once their batch has been processed, so a failed batch can be
+        sent again. Batches are
+        processed in arrival order by one dispatcher thread, each as one run of
+        CrisisIngestion.ingest; at most max_pending batches wait, beyond that
+        submit raises queue.Full. The last keep_batches acknowledgements can be
+        looked up by batch id.
+        """
+        self.system = system
+        self._pending: 'queue.Queue[PushBatch]' = queue.Queue(maxsize=max_pending)
+        self._batches: 'OrderedDict[str, PushBatch]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.keep_batches = keep_batches
+        self._dispatcher = threading.Thread(target=self._dispatch, daemon=True, name='ingest-dispatcher')
+        self._dispatcher.start()
+
+    def submit(self, partner: str, items: List[Any]) -> PushBatch:
+        """Validate and enqueue a batch; returns its acknowledgement state"""
+        batch = PushBatch(partner)
+        source = f"Push - {partner}"
+        seen = self.system.seen_items
+        keys = set()
+        for index, item in enumerate(items):
+            try:
+                article = to_article(item, partner)
+            except ValueError as e:
+                batch.rejected.append({'index': index, 'error': str(e)})
+                continue
+            key = item_key(item)
+            if seen.is_seen(source, key) or key in keys:
+                batch.duplicates += 1
+                continue
+            keys.add(key)
+            batch.keys.append(key)
+            batch.articles.append(article)
+        batch.accepted = len(batch.articles)
+
+        if batch.articles:
+            self._pending.put_nowait(batch)
+        else:
+            batch.status = 'done'
+            batch.finished_at = time.time()
+            batch.done.set()
+
+        with self._lock:
+            self._batches[batch.id] = batch
+            while len(self._batches) > self.keep_batches:
+                self._batches.popitem(last=False)
+        return batch
+
+    def get(self, batch_id: str) -> Optional[PushBatch]:
+        with self._lock:
+            return self._batches.get(batch_id)
+
+    @property
+    def pending(self) -> int:
+        return self._pending.qsize()
+
+    def _dispatch(self):
+        while True:
+            batch = self._pending.get()
+            batch.status = 'processing'
+            try:
+                events = self.system.ingestion.ingest(batch.articles)
+                batch.events = [{
+                    'id': event.id,
+                    'title': event.title,
+                    'crisis_type': event.crisis_type,
+                    'severity': event.severity,
+                    'location': event.location
+                } for event in events]
+                batch.status = 'done'
+                self.system.seen_items.add(f"Push - {batch.partner}", batch.keys)
+                self.system.seen_items.flush()
+                logger.info(f"Push batch {batch.id} from {batch.partner}: "
+                            f"{batch.accepted} accepted, {len(events)} crisis events")
+            except Exception as e:
+                logger.error(f"Push batch {batch.id} from {batch.partner} failed: {e}")
+                batch.status = 'failed'
+                batch.error = str(e)
+            batch.articles = []
+            batch.finished_at = time.time()
+            batch.done.set()
+
+
+def parse_tokens(value: str) -> Dict[str, str]:
+    """Partner per bearer token from "partner=token,partner=token" (CRISIS_INGEST_TOKENS)"""
+    tokens = {}
+    for entry in (value or '').split(','):
+        partner, _, token = entry.partition('=')
+        partner, token = partner.strip(), token.strip()
+        if not partner or not token:
+            continue
+        if not re.fullmatch(r'[\w .@-]{1,64}', partner):
+            raise ValueError(f"invalid partner name {partner!r}")
+        tokens[token] = partner
+    return tokens
+
+
+def make_handler(service: IngestService, tokens: Dict[str, str]):
+    """Request handler class for an IngestService
+
+    POST /ingest takes a JSON batch (application/json) or CAP alerts
+    (application/cap+xml, application/xml, text/xml) and answers 202 with the
+    batch acknowledgement; with ?wait=<seconds> it answers once the batch has
+    been processed (200), or with 202 after the wait. GET /batches/<id> returns
+    a batch's acknowledgement, GET /health the queue depth. Every request needs
+    "Authorization: Bearer <token>"; tokens maps each token to the partner it was
+    issued to, which names the source of its items.
+    """
+    if not tokens:
+        raise ValueError("at least one partner token is required")
+    issued = [(token.encode('utf-8'), partner) for token, partner in tokens.items()]
+
+    class Handler(BaseHTTPRequestHandler):
+        server_version = 'CrisisRadarIngest/1.0'
+
+        def _reply(self, status: int, payload: Dict[str, Any]):
+            data = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _partner(self) -> Optional[str]:
+            """Partner of the request's bearer token; replies 401 and returns None without one"""
+            scheme, _, presented = self.headers.get('Authorization', '').partition(' ')
+            presented = presented.strip().encode('utf-8')
+            partner = None
+            if scheme.lower() == 'bearer' and presented:
+                # Compare with every token in constant time, so timing reveals neither a token nor which matched
+                for token, name in issued:
+                    if hmac.compare_digest(presented, token):
+                        partner = name
+            if partner is None:
+                self._reply(401, {'error': 'missing or invalid bearer token'})
+            return partner
+
+        def do_GET(self):
+            if self._partner() is None:
+                return
+            path = urlsplit(self.path).path.rstrip('/')
+            if path == '/health':
+                self._reply(200, {'status': 'ok', 'pending_batches': service.pending})
+            elif path.startswith('/batches/'):
+                batch = service.get(path.rsplit('/', 1)[-1])
+                if batch is None:
+                    self._reply(404, {'error': 'unknown batch'})
+                else:
+                    self._reply(200, batch.ack())
+            else:
+                self._reply(404, {'error': 'not found'})
+
+        def do_POST(self):
+            partner = self._partner()
+            if partner is None:
+                return
+            url = urlsplit(self.path)
+            if url.path.rstrip('/') != '/ingest':
+                self._reply(404, {'error': 'not found'})
+                return
+
+            length = int(self.headers.get('Content-Length') or 0)
+            if length <= 0:
+                self._reply(411, {'error': 'Content-Length required'})
+                return
+            if length > MAX_BODY_BYTES:
+                self._reply(413, {'error': f"batch larger than {MAX_BODY_BYTES} bytes"})
+                return
+            body = self.rfile.read(length)
+
+            content_type = self.headers.get('Content-Type', '').split(';')[0].strip().lower()
+            try:
+                if content_type == 'application/json':
+                    items = parse_json_batch(body)
+                elif content_type in ('application/cap+xml', 'application/xml', 'text/xml'):
+                    items = parse_cap(body)
+                else:
+                    self._reply(415, {'error': 'send application/json or CAP XML'})
+                    return
+            except (ValueError, ElementTree.ParseError) as e:
+                self._reply(400, {'error': f"unreadable batch: {e}"})
+                return
+            if len(items) > MAX_BATCH_ITEMS:
+                self._reply(413, {'error': f"more than {MAX_BATCH_ITEMS} items in one batch"})
+                return
+
+            try:
+                batch = service.submit(partner, items)
+            except queue.Full:
+                self._reply(503, {'error': 'ingestion queue full, retry later'})
+                return
+            if not batch.accepted and batch.rejected:
+                self._reply(400, batch.ack())
+                return
+
+            wait = parse_qs(url.query).get('wait', ['0'])[0]
+            try:
+                wait = min(max(float(wait), 0.0), 60.0)
+            except ValueError:
+                wait = 0.0
+            if wait:
+                batch.done.wait(wait)
+            self._reply(200 if batch.done.is_set() else 202, batch.ack())
+
+        def log_message(self, format, *args):
+            logger.debug(f"{self.address_string()} {format % args}")
+
+    return Handler
+
+
+def serve(system, tokens: Dict[str, str], host: str = '127.0.0.1', port: int = 8780) -> ThreadingHTTPServer:
+    """Start the ingestion endpoint in a background thread and return the server"""
+    handler = make_handler(IngestService(system), tokens)
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True, name='ingest-server').start()
+    logger.info(f"Push ingestion listening on http://{host}:{httpd.server_address[1]}/ingest")
+    return httpd
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_ingest_server(system) -> Optional[ThreadingHTTPServer]:
+    """Start the endpoint once per process if CRISIS_INGEST_PORT is set; returns the running server
+
+    Partners authenticate with the tokens in CRISIS_INGEST_TOKENS; without any the
+    endpoint does not start.
+
+    It runs inside the dashboard process on the first system's pipeline, whose
+    deduplicator, incident tracker and seen filter every session shares, so a story
+    pushed by a partner and polled by a session is stored, folded into an incident
+    and alerted once.
+    """
+    global _server
+    port = os.getenv('CRISIS_INGEST_PORT')
+    if not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = serve(system, parse_tokens(os.getenv('CRISIS_INGEST_TOKENS')),
+                                os.getenv('CRISIS_INGEST_HOST', '127.0.0.1'), int(port))
+            except (OSError, ValueError) as e:
+                logger.error(f"Could not start push ingestion on port {port}: {e}")
+        return _server
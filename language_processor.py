@@ -1,10 +1,11 @@
 import os
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 import logging
 from deep_translator import GoogleTranslator
 import re
 import json
 from langdetect import detect, LangDetectException
+from normalization import NormalizedText
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -84,13 +85,19 @@ class LanguageProcessor:
         # Initialize translation cache to avoid repeated API calls
         self.translation_cache = {}
     
-    def detect_language(self, text: str) -> str:
+    def detect_language(self, text: Union[str, NormalizedText]) -> str:
         """Detect the language of given text"""
         try:
-            if not text or not text.strip():
+            view = NormalizedText.of(text)
+            if not view:
+                return 'English'
+            
+            # Every supported language other than English uses a non-Latin script,
+            # so plain ASCII text would map to English anyway
+            if view.is_ascii:
                 return 'English'
             
-            detected_lang_code = detect(text)
+            detected_lang_code = detect(view.clean)
             
             # Map detected language code to supported languages
             for lang_name, lang_code in self.supported_languages.items():
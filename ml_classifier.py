@@ -1,4 +1,4 @@
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.feature_extraction.text import HashingVectorizer
 from sklearn.naive_bayes import MultinomialNB
 from sklearn.pipeline import Pipeline
 from sklearn.model_selection import train_test_split
@@ -7,17 +7,76 @@ import numpy as np
 import pickle
 import os
 import re
-from typing import Dict, Any, Tuple
+import threading
+from concurrent.futures import Future
+from typing import List, Dict, Any, Tuple
 import logging
 
+from model_registry import ModelRegistry, get_model_registry
+from features import FeatureExtractor
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Models pickled to the working directory before the registry existed
+LEGACY_MODEL_FILES = ('crisis_model.pkl', 'severity_model.pkl')
+
+# Hashed features need no fitted vocabulary, so labeled examples can be added
+# to the models at any time without refitting on the whole corpus
+N_FEATURES = 2 ** 18
+
+
+def _incremental_pipeline(ngram_range: Tuple[int, int]) -> Pipeline:
+    """Stateless hashing vectorizer and a naive Bayes model that supports partial_fit"""
+    return Pipeline([
+        ('vectorizer', HashingVectorizer(n_features=N_FEATURES, ngram_range=ngram_range,
+                                         stop_words='english', alternate_sign=False, norm=None)),
+        ('classifier', MultinomialNB(alpha=0.1))
+    ])
+
+
+_followed: Dict[str, 'CrisisClassifier'] = {}
+_followed_lock = threading.Lock()
+
+
+def get_crisis_classifier(registry: ModelRegistry = None) -> 'CrisisClassifier':
+    """Return the process-wide classifier following a registry, shared by all dashboard sessions
+
+    Every new version is then unpickled once per process rather than once per session.
+    """
+    registry = registry or get_model_registry()
+    with _followed_lock:
+        if registry.root not in _followed:
+            _followed[registry.root] = CrisisClassifier(registry)
+        return _followed[registry.root]
+
+
+def model_version(registry: ModelRegistry = None) -> str:
+    """Current published model version, 'untrained' if nothing has been published"""
+    version = (registry or get_model_registry()).current_version()
+    return str(version) if version is not None else 'untrained'
+
 class CrisisClassifier:
-    def __init__(self):
-        """Initialize crisis classifier"""
-        self.crisis_model = None
-        self.severity_model = None
+    def __init__(self, registry: ModelRegistry = None, follow: bool = True,
+                 batch_size: int = 32, checkpoint_every: int = 256):
+        """Initialize crisis classifier
+
+        Models come from the registry's current version. With follow, newly published
+        versions replace them in one reference swap while predictions continue.
+        Labeled examples passed to learn() are absorbed in mini-batches of batch_size
+        and published after every checkpoint_every absorbed examples.
+        """
+        self.registry = registry or get_model_registry()
+        self.follow = follow
+        self.version = None
+        # Both models are swapped together as one tuple
+        self._bundle = (None, None)
+        self.batch_size = batch_size
+        self.checkpoint_every = checkpoint_every
+        self.examples_seen = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._since_checkpoint = 0
+        self._learn_lock = threading.Lock()
         self.crisis_types = ['flood', 'earthquake', 'cyclone', 'fire', 'drought', 'landslide', 'storm', 'accident']
         self.severity_levels = ['low', 'medium', 'high']
         
@@ -40,19 +99,44 @@ class CrisisClassifier:
             'low': ['minor', 'small', 'light', 'slight', 'minimal']
         }
         
+        # Severity words and quantities are found in one scan of the text
+        self.severity_extractor = FeatureExtractor(
+            term for terms in self.severity_keywords.values() for term in terms
+        )
+        
         # Initialize models
         self._initialize_models()
     
+    @property
+    def crisis_model(self):
+        return self._bundle[0]
+    
+    @property
+    def severity_model(self):
+        return self._bundle[1]
+    
     def _initialize_models(self):
-        """Initialize or train ML models"""
+        """Load the current models from the registry, or train and publish new ones"""
         try:
-            # Try to load pre-trained models
-            if os.path.exists('crisis_model.pkl') and os.path.exists('severity_model.pkl'):
-                with open('crisis_model.pkl', 'rb') as f:
-                    self.crisis_model = pickle.load(f)
-                with open('severity_model.pkl', 'rb') as f:
-                    self.severity_model = pickle.load(f)
-                logger.info("Loaded pre-trained models")
+            loaded = self.registry.load()
+            if loaded:
+                self.version, self._bundle, metadata = loaded
+                self.examples_seen = metadata.get('examples_seen', 0)
+                logger.info(f"Loaded model version {self.version}")
+            elif all(os.path.exists(path) for path in LEGACY_MODEL_FILES):
+                with open(LEGACY_MODEL_FILES[0], 'rb') as f:
+                    crisis_model = pickle.load(f)
+                with open(LEGACY_MODEL_FILES[1], 'rb') as f:
+                    severity_model = pickle.load(f)
+                self._bundle = (crisis_model, severity_model)
+                
+                # Models saved before incremental learning cannot absorb new examples
+                if self._is_incremental():
+                    self.checkpoint()
+                    logger.info("Imported pre-trained models into the registry")
+                else:
+                    logger.info("Saved models are not incremental, training new ones")
+                    self._train_models()
             else:
                 # Train new models with synthetic data
                 self._train_models()
@@ -60,47 +144,93 @@ class CrisisClassifier:
         except Exception as e:
             logger.error(f"Error initializing models: {str(e)}")
             self._train_models()
+        
+        if self.follow:
+            self.registry.subscribe(self._swap)
+    
+    def _swap(self, version: int, bundle):
+        """Switch to a newly published version; readers see either the old or the new pair"""
+        self._bundle = bundle
+        self.version = version
+        logger.info(f"Switched to model version {version}")
+    
+    def _is_incremental(self) -> bool:
+        return all(
+            isinstance(model, Pipeline) and hasattr(model.steps[-1][1], 'partial_fit')
+            and isinstance(model.steps[0][1], HashingVectorizer)
+            for model in (self.crisis_model, self.severity_model)
+        )
     
     def _train_models(self):
         """Train crisis classification models with enhanced synthetic data"""
-        # Generate training data
-        training_data = self._generate_training_data()
-        
-        # Prepare crisis type classification data
-        crisis_texts = []
-        crisis_labels = []
-        severity_texts = []
-        severity_labels = []
-        
-        for item in training_data:
-            crisis_texts.append(item['text'])
-            crisis_labels.append(item['crisis_type'])
-            severity_texts.append(item['text'])
-            severity_labels.append(item['severity'])
+        self._bundle = (_incremental_pipeline((1, 3)), _incremental_pipeline((1, 2)))
+        self.examples_seen = 0
         
-        # Train crisis type classifier
-        self.crisis_model = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=5000, ngram_range=(1, 3), stop_words='english')),
-            ('classifier', MultinomialNB(alpha=0.1))
-        ])
-        
-        self.crisis_model.fit(crisis_texts, crisis_labels)
-        
-        # Train severity classifier
-        self.severity_model = Pipeline([
-            ('tfidf', TfidfVectorizer(max_features=3000, ngram_range=(1, 2), stop_words='english')),
-            ('classifier', MultinomialNB(alpha=0.1))
-        ])
+        self._partial_fit(self._generate_training_data())
+        self.checkpoint()
+    
+    def _partial_fit(self, items: List[Dict[str, Any]]):
+        """Update both models with one mini-batch; each text is vectorized once per model"""
+        crisis_items = [item for item in items if item.get('crisis_type') in self.crisis_types]
+        if crisis_items:
+            vectorizer, classifier = self.crisis_model.steps[0][1], self.crisis_model.steps[-1][1]
+            classifier.partial_fit(
+                vectorizer.transform([item['text'] for item in crisis_items]),
+                [item['crisis_type'] for item in crisis_items],
+                classes=self.crisis_types
+            )
         
-        self.severity_model.fit(severity_texts, severity_labels)
+        severity_items = [item for item in items if item.get('severity') in self.severity_levels]
+        if severity_items:
+            vectorizer, classifier = self.severity_model.steps[0][1], self.severity_model.steps[-1][1]
+            classifier.partial_fit(
+                vectorizer.transform([item['text'] for item in severity_items]),
+                [item['severity'] for item in severity_items],
+                classes=self.severity_levels
+            )
         
-        # Save models
+        self.examples_seen += len(items)
+    
+    def learn(self, items: List[Dict[str, Any]]) -> int:
+        """Queue labeled examples ({'text', 'crisis_type', 'severity'}) and absorb full mini-batches
+
+        Either label may be missing or unknown; the example then only updates the
+        other model. Returns the number of examples absorbed by this call. Updates
+        modify this instance's models in place, so serving classifiers should use
+        retrain_model instead.
+        """
+        absorbed = 0
+        with self._learn_lock:
+            self._pending.extend(item for item in items if item.get('text'))
+            while len(self._pending) >= self.batch_size:
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                self._partial_fit(batch)
+                absorbed += len(batch)
+            
+            self._since_checkpoint += absorbed
+            if self._since_checkpoint >= self.checkpoint_every:
+                self.checkpoint()
+        return absorbed
+    
+    def flush(self) -> int:
+        """Absorb any queued examples now and save the models"""
+        with self._learn_lock:
+            absorbed = len(self._pending)
+            if self._pending:
+                self._partial_fit(self._pending)
+                self._pending = []
+            self.checkpoint()
+        return absorbed
+    
+    def checkpoint(self):
+        """Publish both models as a new registry version"""
         try:
-            with open('crisis_model.pkl', 'wb') as f:
-                pickle.dump(self.crisis_model, f)
-            with open('severity_model.pkl', 'wb') as f:
-                pickle.dump(self.severity_model, f)
-            logger.info("Models trained and saved successfully")
+            crisis_model, severity_model = self._bundle
+            self.version = self.registry.publish(crisis_model, severity_model,
+                                                 {'examples_seen': self.examples_seen})
+            self._since_checkpoint = 0
+            logger.info(f"Models saved after {self.examples_seen} examples")
         except Exception as e:
             logger.error(f"Error saving models: {str(e)}")
     
@@ -209,19 +339,21 @@ class CrisisClassifier:
                     'confidence': 0.0
                 }
             
+            crisis_model, severity_model = self._bundle
+            
             # Predict crisis type
-            if self.crisis_model:
-                crisis_proba = self.crisis_model.predict_proba([text])[0]
-                crisis_type = self.crisis_model.predict([text])[0]
+            if crisis_model:
+                crisis_proba = crisis_model.predict_proba([text])[0]
+                crisis_type = crisis_model.predict([text])[0]
                 crisis_confidence = max(crisis_proba)
             else:
                 crisis_type = self._rule_based_crisis_classification(text)
                 crisis_confidence = 0.7
             
             # Predict severity
-            if self.severity_model:
-                severity_proba = self.severity_model.predict_proba([text])[0]
-                severity = self.severity_model.predict([text])[0]
+            if severity_model:
+                severity_proba = severity_model.predict_proba([text])[0]
+                severity = severity_model.predict([text])[0]
                 severity_confidence = max(severity_proba)
             else:
                 severity = self._rule_based_severity_classification(text)
@@ -247,6 +379,28 @@ class CrisisClassifier:
                 'confidence': 0.0
             }
     
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """Predict crisis type and severity for many texts with one pass per model"""
+        if not texts:
+            return []
+        
+        crisis_model, severity_model = self._bundle
+        crisis_proba = crisis_model.predict_proba(texts)
+        severity_proba = severity_model.predict_proba(texts)
+        
+        crisis_best = np.argmax(crisis_proba, axis=1)
+        severity_best = np.argmax(severity_proba, axis=1)
+        
+        return [
+            {
+                'crisis_type': str(crisis_model.classes_[c]),
+                'crisis_confidence': float(crisis_proba[i, c]),
+                'severity': str(severity_model.classes_[s]),
+                'severity_confidence': float(severity_proba[i, s])
+            }
+            for i, (c, s) in enumerate(zip(crisis_best, severity_best))
+        ]
+    
     def _is_crisis_text(self, text: str) -> bool:
         """Determine if text represents a crisis using keyword matching"""
         text_lower = text.lower()
@@ -282,52 +436,21 @@ class CrisisClassifier:
     
     def _rule_based_severity_classification(self, text: str) -> str:
         """Classify severity using rule-based approach"""
-        text_lower = text.lower()
+        features = self.severity_extractor.extract(text)
         
         # Check for severity indicators
-        for severity, keywords in self.severity_keywords.items():
-            if any(keyword in text_lower for keyword in keywords):
-                return severity
-        
-        # Check for numbers that might indicate severity
-        if re.search(r'\d+\s*(dead|killed|casualties|injured)', text_lower):
-            numbers = re.findall(r'\d+', text)
-            if numbers:
-                max_num = max(int(num) for num in numbers)
-                if max_num > 50:
-                    return 'high'
-                elif max_num > 10:
-                    return 'medium'
-                else:
-                    return 'low'
+        severity, _ = features.severity_level(self.severity_keywords)
+        if severity:
+            return severity
         
-        # Default to medium if no clear indicators
-        return 'medium'
+        # Otherwise casualty counts, magnitude, wind speed or rainfall,
+        # defaulting to medium if there are no clear indicators
+        return features.quantity_severity() or 'medium'
     
-    def retrain_model(self, new_data: list):
-        """Retrain models with new labeled data"""
-        try:
-            # Combine with existing training data
-            existing_data = self._generate_training_data()
-            all_data = existing_data + new_data
-            
-            # Prepare data
-            crisis_texts = [item['text'] for item in all_data]
-            crisis_labels = [item['crisis_type'] for item in all_data]
-            severity_texts = [item['text'] for item in all_data]
-            severity_labels = [item['severity'] for item in all_data]
-            
-            # Retrain models
-            self.crisis_model.fit(crisis_texts, crisis_labels)
-            self.severity_model.fit(severity_texts, severity_labels)
-            
-            # Save updated models
-            with open('crisis_model.pkl', 'wb') as f:
-                pickle.dump(self.crisis_model, f)
-            with open('severity_model.pkl', 'wb') as f:
-                pickle.dump(self.severity_model, f)
-            
-            logger.info("Models retrained successfully")
-            
-        except Exception as e:
-            logger.error(f"Error retraining models: {str(e)}")
+    def retrain_model(self, new_data: list) -> Future:
+        """Absorb newly labeled data on the registry's background worker
+
+        Returns immediately; the retrained models are published as a new version and
+        swapped in by every following classifier, including this one.
+        """
+        return self.registry.retrain_async(new_data)
@@ -0,0 +1,226 @@
+import os
+import re
+import time
+import pickle
+import weakref
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import List, Dict, Any, Optional, Callable, Tuple
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_DIR = os.getenv('CRISIS_MODEL_DIR', 'models')
+
+_ARTIFACT_RE = re.compile(r'^crisis-models-v(\d+)\.pkl$')
+_POINTER = 'CURRENT'
+
+# (crisis_model, severity_model)
+ModelBundle = Tuple[Any, Any]
+
+
+def _atomic_write(path: str, data: bytes):
+    """Write to a temporary file in the same directory, then rename over the target"""
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class ModelRegistry:
+    def __init__(self, root: str = DEFAULT_MODEL_DIR, keep: int = 5, poll_seconds: float = 30.0):
+        """Versioned model artifacts with an atomically updated pointer to the current version
+
+        Each publish writes a new numbered artifact and then moves the CURRENT pointer,
+        both by temp file plus rename, so readers never see a partial file. Subscribed
+        classifiers receive a freshly loaded copy of every new version, from the
+        publishing thread in this process or from a watcher thread that polls the
+        pointer for versions published by other processes.
+        """
+        self.root = root
+        self.keep = keep
+        self.poll_seconds = poll_seconds
+        os.makedirs(root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Weak references, so a subscribed classifier is freed once nothing else uses it
+        self._subscribers: List[weakref.ref] = []
+        self._notified_version = self.current_version()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+        # One worker, so retraining jobs apply in submission order
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._trainer = None
+
+    def _artifact_path(self, version: int) -> str:
+        return os.path.join(self.root, f"crisis-models-v{version:05d}.pkl")
+
+    def versions(self) -> List[int]:
+        """Published versions, oldest first"""
+        found = []
+        for name in os.listdir(self.root):
+            match = _ARTIFACT_RE.match(name)
+            if match:
+                found.append(int(match.group(1)))
+        return sorted(found)
+
+    def current_version(self) -> Optional[int]:
+        try:
+            with open(os.path.join(self.root, _POINTER), 'r') as f:
+                return int(f.read().strip())
+        except (OSError, ValueError):
+            return None
+
+    def load(self, version: int = None) -> Optional[Tuple[int, ModelBundle, Dict[str, Any]]]:
+        """Load a version (the current one by default) as (version, bundle, metadata)"""
+        version = version if version is not None else self.current_version()
+        if version is None:
+            return None
+        with open(self._artifact_path(version), 'rb') as f:
+            artifact = pickle.load(f)
+        return version, (artifact['crisis_model'], artifact['severity_model']), artifact['metadata']
+
+    def _claim_version(self) -> int:
+        """Reserve the next version number by creating its artifact file exclusively
+
+        Processes sharing the directory never get the same number; a loser of the
+        race sees the file and tries the next number.
+        """
+        versions = self.versions()
+        version = versions[-1] + 1 if versions else 1
+        while True:
+            try:
+                os.close(os.open(self._artifact_path(version), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return version
+            except FileExistsError:
+                version += 1
+
+    def publish(self, crisis_model, severity_model, metadata: Dict[str, Any] = None) -> int:
+        """Write a new version, make it current and hand it to subscribers"""
+        with self._lock:
+            version = self._claim_version()
+            payload = pickle.dumps({
+                'version': version,
+                'created_at': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime()),
+                'metadata': metadata or {},
+                'crisis_model': crisis_model,
+                'severity_model': severity_model
+            }, protocol=pickle.HIGHEST_PROTOCOL)
+            try:
+                # Replaces the empty claimed file; CURRENT never points at it before this
+                _atomic_write(self._artifact_path(version), payload)
+            except BaseException:
+                os.remove(self._artifact_path(version))
+                raise
+            # A newer version published meanwhile by another process stays current
+            current = self.current_version()
+            if current is None or current < version:
+                _atomic_write(os.path.join(self.root, _POINTER), str(version).encode('ascii'))
+            self._prune(version)
+
+        logger.info(f"Published model version {version}")
+        self._notify(version, payload)
+        return version
+
+    def _prune(self, current: int):
+        """Delete old artifacts, always keeping the current one"""
+        for version in self.versions()[:-self.keep]:
+            if version != current:
+                try:
+                    os.remove(self._artifact_path(version))
+                except OSError:
+                    pass
+
+    def subscribe(self, callback: Callable[[int, ModelBundle], None]):
+        """Call callback(version, bundle) with a private copy of each new version
+
+        The registry keeps only a weak reference: a bound method's object stays
+        subscribed while it is alive, and is dropped once it is collected.
+        """
+        ref = weakref.WeakMethod(callback) if hasattr(callback, '__self__') else weakref.ref(callback)
+        with self._lock:
+            self._subscribers.append(ref)
+            if self._watcher is None:
+                self._watcher = threading.Thread(target=self._watch, daemon=True, name='model-registry-watch')
+                self._watcher.start()
+
+    def unsubscribe(self, callback: Callable[[int, ModelBundle], None]):
+        with self._lock:
+            self._subscribers = [ref for ref in self._subscribers if ref() not in (None, callback)]
+
+    def _notify(self, version: int, payload: bytes = None):
+        with self._lock:
+            if self._notified_version is not None and version <= self._notified_version:
+                return
+            self._notified_version = version
+            self._subscribers = [ref for ref in self._subscribers if ref() is not None]
+            subscribers = [callback for callback in (ref() for ref in self._subscribers) if callback is not None]
+
+        if payload is None and subscribers:
+            with open(self._artifact_path(version), 'rb') as f:
+                payload = f.read()
+
+        for callback in subscribers:
+            try:
+                # Each subscriber gets its own objects, so later training never
+                # mutates a model that is serving predictions
+                artifact = pickle.loads(payload)
+                callback(version, (artifact['crisis_model'], artifact['severity_model']))
+            except Exception as e:
+                logger.error(f"Error swapping in model version {version}: {e}")
+
+    def _watch(self):
+        """Pick up versions published by other processes"""
+        while not self._stop.wait(self.poll_seconds):
+            version = self.current_version()
+            if version is not None:
+                self._notify(version)
+
+    def retrain_async(self, new_data: List[Dict[str, Any]]) -> Future:
+        """Absorb labeled examples on a background worker and publish the result
+
+        The worker trains its own copy of the current models; serving classifiers
+        switch to the new version when it is published.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='model-retrain')
+        return self._executor.submit(self._retrain, new_data)
+
+    def _retrain(self, new_data: List[Dict[str, Any]]) -> Optional[int]:
+        from ml_classifier import CrisisClassifier
+
+        if self._trainer is None:
+            self._trainer = CrisisClassifier(registry=self, follow=False)
+        self._trainer.learn(new_data)
+        self._trainer.flush()
+        return self._trainer.version
+
+    def close(self):
+        self._stop.set()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+_registries: Dict[str, ModelRegistry] = {}
+_registries_lock = threading.Lock()
+
+
+def get_model_registry(root: str = None) -> ModelRegistry:
+    """Return the process-wide registry for a model directory"""
+    path = os.path.abspath(root or DEFAULT_MODEL_DIR)
+    with _registries_lock:
+        if path not in _registries:
+            _registries[path] = ModelRegistry(path)
+        return _registries[path]
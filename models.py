@@ -0,0 +1,207 @@
+from dataclasses import dataclass, field, fields
+from typing import List, Dict, Any, Optional, Sequence, Iterable, Tuple
+
+import pandas as pd
+
+from normalization import NormalizedText
+
+# Default coordinates (geographic centre of India) for items without a location
+INDIA_CENTER = (20.5937, 78.9629)
+
+
+@dataclass(slots=True)
+class Article:
+    """Raw item fetched from a news API or RSS feed, before crisis classification"""
+    title: str
+    description: str
+    source: str
+    url: str = ''
+    published_at: str = ''
+    api_source: str = ''
+    text: str = ''
+    location: Optional[str] = None
+    latitude: float = INDIA_CENTER[0]
+    longitude: float = INDIA_CENTER[1]
+    # Normalized views of full_text, built on first use
+    _normalized: Optional[NormalizedText] = field(default=None, init=False, repr=False, compare=False)
+    # (source, key) to add to the seen filter once the article has been handled
+    seen_key: Optional[Tuple[str, str]] = field(default=None, init=False, repr=False, compare=False)
+    # False for URLs from untrusted senders, which enrichment must not fetch
+    fetchable: bool = field(default=True, init=False, repr=False, compare=False)
+
+    @property
+    def full_text(self) -> str:
+        """Title and description joined for keyword matching"""
+        return f"{self.title} {self.description}"
+
+    @property
+    def normalized(self) -> NormalizedText:
+        """Normalized views of full_text, rebuilt only when the title or description change"""
+        text = self.full_text
+        if self._normalized is None or self._normalized.raw != text:
+            self._normalized = NormalizedText(text)
+        return self._normalized
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self)
+
+
+@dataclass(slots=True)
+class CrisisEvent:
+    """Classified crisis event as stored in crisis_data and shown on the dashboard"""
+    title: str
+    description: str
+    crisis_type: str
+    severity: str
+    confidence: float = 0.0
+    location: str = 'India'
+    latitude: float = INDIA_CENTER[0]
+    longitude: float = INDIA_CENTER[1]
+    source: str = ''
+    url: str = ''
+    published_at: str = ''
+    api_source: str = ''
+    detected_keywords: str = ''
+    original_language: str = 'English'
+    # Other sources that published the same story, comma separated
+    corroborating_sources: str = ''
+    # Source-language text, only kept when the title/description were translated
+    original_title: Optional[str] = None
+    original_description: Optional[str] = None
+    # Filled in for rows read back from the database
+    id: Optional[int] = None
+    detected_at: Optional[str] = None
+    is_verified: bool = False
+    status: str = 'active'
+
+    @classmethod
+    def from_article(cls, article: Article, crisis_type: str, severity: str, confidence: float,
+                     **kwargs) -> 'CrisisEvent':
+        """Build an event from a fetched article and its classification"""
+        return cls(
+            title=kwargs.pop('title', article.title),
+            description=kwargs.pop('description', article.description),
+            crisis_type=crisis_type,
+            severity=severity,
+            confidence=confidence,
+            source=article.source,
+            url=article.url,
+            published_at=article.published_at,
+            api_source=article.api_source or article.source,
+            **kwargs
+        )
+
+    @classmethod
+    def from_row(cls, columns: Sequence[str], row: Sequence[Any]) -> 'CrisisEvent':
+        return cls(**dict(zip(columns, row)))
+
+    @property
+    def full_text(self) -> str:
+        return f"{self.title} {self.description}"
+
+    @property
+    def display_title(self) -> str:
+        """Title in the language it was published in"""
+        return self.original_title or self.title
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self)
+
+
+@dataclass(slots=True)
+class WeatherAlert:
+    """Extreme weather reading for a city"""
+    city: str
+    temperature: float
+    description: str
+    wind_speed: float
+    severity: str
+    latitude: float = INDIA_CENTER[0]
+    longitude: float = INDIA_CENTER[1]
+    alert_type: str = 'weather_alert'
+    country: str = 'India'
+    id: Optional[int] = None
+    timestamp: Optional[str] = None
+    is_active: bool = True
+
+    @classmethod
+    def from_row(cls, columns: Sequence[str], row: Sequence[Any]) -> 'WeatherAlert':
+        return cls(**dict(zip(columns, row)))
+
+    @property
+    def label(self) -> str:
+        """Human readable alert type, e.g. 'Weather Alert'"""
+        return self.alert_type.replace('_', ' ').title()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self)
+
+
+# Severity ordering used when incidents take the maximum of their reports
+SEVERITY_RANK = {'low': 1, 'medium': 2, 'high': 3}
+
+
+@dataclass(slots=True)
+class Incident:
+    """Real-world crisis consolidated from all reports of the same type, place and time"""
+    crisis_type: str
+    title: str
+    description: str = ''
+    location: str = 'India'
+    latitude: float = INDIA_CENTER[0]
+    longitude: float = INDIA_CENTER[1]
+    severity: str = 'low'
+    confidence: float = 0.0
+    event_count: int = 0
+    # Comma separated; the first entry is the lead source
+    sources: str = ''
+    detected_keywords: str = ''
+    url: str = ''
+    first_seen: Optional[str] = None
+    last_seen: Optional[str] = None
+    id: Optional[int] = None
+    status: str = 'active'
+
+    @classmethod
+    def from_row(cls, columns: Sequence[str], row: Sequence[Any]) -> 'Incident':
+        return cls(**dict(zip(columns, row)))
+
+    @property
+    def source_list(self) -> List[str]:
+        return [s.strip() for s in self.sources.split(',') if s.strip()]
+
+    @property
+    def source(self) -> str:
+        """Lead source, so incidents render like single events"""
+        sources = self.source_list
+        return sources[0] if sources else ''
+
+    @property
+    def corroborating_sources(self) -> str:
+        return ', '.join(self.source_list[1:])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return _to_dict(self)
+
+
+_FIELD_NAMES: Dict[type, List[str]] = {
+    cls: [f.name for f in fields(cls) if f.init] for cls in (Article, CrisisEvent, WeatherAlert, Incident)
+}
+
+
+def _to_dict(record) -> Dict[str, Any]:
+    """Shallow dict of a record (dataclasses.asdict deep-copies every value)"""
+    return {name: getattr(record, name) for name in _FIELD_NAMES[type(record)]}
+
+
+def records_to_dataframe(records: Iterable, record_type: type = None) -> pd.DataFrame:
+    """Build a DataFrame from records column by column without intermediate dicts"""
+    records = list(records)
+    if record_type is None:
+        if not records:
+            return pd.DataFrame()
+        record_type = type(records[0])
+
+    columns = _FIELD_NAMES[record_type]
+    return pd.DataFrame({name: [getattr(r, name) for r in records] for name in columns},
+                        columns=columns)
@@ -0,0 +1,64 @@
+import re
+import html
+import unicodedata
+from typing import Tuple, Union
+
+_TAG_RE = re.compile(r'<[^>]+>')
+_SPACE_RE = re.compile(r'\s+')
+# Word characters plus the Indic blocks (Devanagari to Sinhala) except the dandas,
+# so vowel signs do not split words in Hindi, Bengali, Tamil or Telugu text
+_TOKEN_RE = re.compile(r'[\w\u0900-\u0963\u0966-\u0dff]+')
+
+
+class NormalizedText:
+    """Article text normalized once, with the views later analysis works on
+
+    clean has markup removed, entities unescaped, NFKC applied and whitespace
+    collapsed; lower is clean in lower case. Tokens are computed on first use.
+    Punctuation is kept, unlike utils.clean_text, because removing non-word
+    characters would also drop the vowel signs of Indic scripts.
+    """
+    __slots__ = ('raw', 'clean', 'lower', '_tokens', '_token_set')
+
+    def __init__(self, raw: str):
+        self.raw = raw or ''
+        text = html.unescape(_TAG_RE.sub(' ', self.raw))
+        self.clean = _SPACE_RE.sub(' ', unicodedata.normalize('NFKC', text)).strip()
+        self.lower = self.clean.lower()
+        self._tokens = None
+        self._token_set = None
+
+    @classmethod
+    def of(cls, text: Union[str, 'NormalizedText', None]) -> 'NormalizedText':
+        """Views of text, reusing them if text is already normalized"""
+        return text if isinstance(text, NormalizedText) else cls(text)
+
+    @property
+    def tokens(self) -> Tuple[str, ...]:
+        """Lower-case word tokens in text order"""
+        if self._tokens is None:
+            self._tokens = tuple(_TOKEN_RE.findall(self.lower))
+        return self._tokens
+
+    @property
+    def token_set(self) -> frozenset:
+        if self._token_set is None:
+            self._token_set = frozenset(self.tokens)
+        return self._token_set
+
+    @property
+    def is_ascii(self) -> bool:
+        return self.clean.isascii()
+
+    def mentions(self, terms) -> bool:
+        """Whether any lower-case term occurs in the text"""
+        return any(term in self.lower for term in terms)
+
+    def __bool__(self) -> bool:
+        return bool(self.clean)
+
+    def __str__(self) -> str:
+        return self.clean
+
+    def __repr__(self) -> str:
+        return f"NormalizedText({self.clean[:60]!r})"
@@ -0,0 +1,76 @@
+from typing import List, Any, Optional, Callable, Iterator, Tuple
+import logging
+
+from circuit_breaker import CircuitOpenError
+from seen_filter import SeenFilter
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Pages a source may fetch per collection cycle; every page is one metered call,
+# which the polling scheduler counts into the source's cost per poll
+DEFAULT_PAGE_BUDGETS = {
+    'MediaStack': 3,
+    'NewsData.io': 5,
+    # 100 results per page reach NEWSAPI_MAX_RESULTS on the first page
+    'NewsAPI': 1
+}
+
+# RSS feeds are a single document; entries read per feed per cycle
+RSS_ENTRY_BUDGET = 50
+
+# NewsAPI's developer plan serves only the first 100 results of a query and answers
+# later pages with 426
+NEWSAPI_MAX_RESULTS = 100
+
+# (raw items of one page, cursor of the next page or None on the last page)
+Page = Tuple[List[Any], Optional[Any]]
+
+
+def paginate(fetch_page: Callable[[Any], Page], max_pages: int,
+             is_seen: Callable[[Any], bool], cursor: Any = None) -> Iterator[List[Any]]:
+    """Yield the unseen raw items of each page, following next-page cursors
+
+    Sources list newest items first, so paging stops after a page that contains an
+    already seen item, as well as on the last or an empty page and after max_pages.
+    """
+    for _ in range(max_pages):
+        items, next_cursor = fetch_page(cursor)
+        unseen = [item for item in items if not is_seen(item)]
+        if unseen:
+            yield unseen
+        if not items or len(unseen) < len(items) or next_cursor is None:
+            return
+        cursor = next_cursor
+
+
+def collect_pages(source: str, fetch_page: Callable[[Any], Page], key: Callable[[Any], Optional[str]],
+                  convert: Callable[[Any], Any], seen: SeenFilter, max_pages: int = 1) -> Iterator[Any]:
+    """Stream converted items of a paginated source as each page arrives
+
+    Items whose key (URL or GUID) is in the seen filter are dropped here, before
+    any text processing. convert turns a raw item into an Article or None to
+    skip it. Skipped items are added to the seen filter at once; yielded articles
+    carry their key in seen_key and are added by the consumer once it has
+    handled them, so an article lost to a failure is fetched again next cycle.
+    Errors end the source's pages for this cycle; items already yielded are kept.
+    """
+    count = pages = 0
+    try:
+        for page in paginate(fetch_page, max_pages, lambda item: seen.is_seen(source, key(item))):
+            pages += 1
+            skipped = []
+            for item in page:
+                record = convert(item)
+                if record is None:
+                    skipped.append(key(item))
+                    continue
+                record.seen_key = (source, key(item)) if key(item) else None
+                count += 1
+                yield record
+            seen.add(source, skipped)
+    except CircuitOpenError as e:
+        logger.info(f"{source} skipped: {e}")
+    except Exception as e:
+        logger.error(f"{source} collection error: {e}")
+    logger.info(f"Collected {count} new items from {source} in {pages} pages")
@@ -0,0 +1,316 @@
+import os
+import json
+import time
+import sqlite3
+import argparse
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import unquote
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from database import DEFAULT_DB_PATH
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Columns exported for each table, the timestamp column used to derive the
+# month partition, any extra partition columns and, for tables whose rows are
+# changed in place, the column numbering those changes
+EXPORT_TABLES = {
+    'crisis_data': {
+        'columns': ['id', 'title', 'description', 'crisis_type', 'severity', 'location',
+                    'latitude', 'longitude', 'source', 'url', 'published_at', 'detected_at',
+                    'confidence', 'api_source', 'is_verified', 'status', 'detected_keywords',
+                    'original_language', 'corroborating_sources'],
+        'timestamp_column': 'detected_at',
+        'partition_cols': ['month', 'crisis_type'],
+        'change_column': 'change_seq'
+    },
+    'weather_alerts': {
+        'columns': ['id', 'alert_type', 'city', 'country', 'latitude', 'longitude',
+                    'temperature', 'description', 'wind_speed', 'severity', 'timestamp',
+                    'is_active'],
+        'timestamp_column': 'timestamp',
+        'partition_cols': ['month']
+    },
+    'api_usage': {
+        'columns': ['id', 'api_name', 'endpoint', 'timestamp', 'status_code',
+                    'response_time', 'items_returned', 'error_message'],
+        'timestamp_column': 'timestamp',
+        'partition_cols': ['month']
+    }
+}
+
+# Explicit Arrow schemas keep column types stable across incremental batches
+EXPORT_SCHEMAS = {
+    'crisis_data': pa.schema([
+        ('id', pa.int64()), ('title', pa.string()), ('description', pa.string()),
+        ('crisis_type', pa.string()), ('severity', pa.string()), ('location', pa.string()),
+        ('latitude', pa.float64()), ('longitude', pa.float64()), ('source', pa.string()),
+        ('url', pa.string()), ('published_at', pa.string()), ('detected_at', pa.string()),
+        ('confidence', pa.float64()), ('api_source', pa.string()), ('is_verified', pa.bool_()),
+        ('status', pa.string()), ('detected_keywords', pa.string()),
+        ('original_language', pa.string()), ('corroborating_sources', pa.string()),
+        ('month', pa.string())
+    ]),
+    'weather_alerts': pa.schema([
+        ('id', pa.int64()), ('alert_type', pa.string()), ('city', pa.string()),
+        ('country', pa.string()), ('latitude', pa.float64()), ('longitude', pa.float64()),
+        ('temperature', pa.float64()), ('description', pa.string()), ('wind_speed', pa.float64()),
+        ('severity', pa.string()), ('timestamp', pa.string()), ('is_active', pa.bool_()),
+        ('month', pa.string())
+    ]),
+    'api_usage': pa.schema([
+        ('id', pa.int64()), ('api_name', pa.string()), ('endpoint', pa.string()),
+        ('timestamp', pa.string()), ('status_code', pa.int64()), ('response_time', pa.float64()),
+        ('items_returned', pa.int64()), ('error_message', pa.string()), ('month', pa.string())
+    ])
+}
+
+STATE_FILE = '_export_state.json'
+
+
+class ParquetExporter:
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, output_dir: str = 'exports',
+                 batch_size: int = 5000):
+        """Initialize exporter for incremental Parquet snapshots of the crisis database"""
+        self.db_path = db_path
+        self.output_dir = output_dir
+        self.batch_size = batch_size
+        self.state_path = os.path.join(output_dir, STATE_FILE)
+        os.makedirs(output_dir, exist_ok=True)
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict[str, int]:
+        """Load last exported id per table, and the last refreshed change number under '<table>:changes'"""
+        try:
+            if os.path.exists(self.state_path):
+                with open(self.state_path, 'r') as f:
+                    return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading export state: {str(e)}")
+        return {}
+
+    def _save_state(self):
+        """Persist export state atomically so an interrupted run can resume"""
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a read-only connection so exports never take write locks"""
+        return sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+
+    def _fetch_batches(self, table: str, last_id: int):
+        """Yield batches of rows with id greater than last_id, in id order"""
+        config = EXPORT_TABLES[table]
+        columns = ', '.join(config['columns'])
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            while True:
+                cursor.execute(
+                    f'SELECT {columns} FROM {table} WHERE id > ? ORDER BY id LIMIT ?',
+                    (last_id, self.batch_size)
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                yield rows
+                last_id = rows[-1][0]
+        finally:
+            conn.close()
+
+    def _max_change(self, table: str) -> int:
+        """Latest change number of a table, 0 if its rows are never changed in place"""
+        column = EXPORT_TABLES[table].get('change_column')
+        if not column:
+            return 0
+        conn = self._connect()
+        try:
+            return conn.execute(f'SELECT COALESCE(MAX({column}), 0) FROM {table}').fetchone()[0]
+        finally:
+            conn.close()
+
+    def _fetch_where(self, table: str, condition: str, params: Tuple) -> List[Tuple]:
+        """Exported columns of the rows matching condition, in id order"""
+        columns = ', '.join(EXPORT_TABLES[table]['columns'])
+        conn = self._connect()
+        try:
+            return conn.execute(f'SELECT {columns} FROM {table} WHERE {condition} ORDER BY id', params).fetchall()
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _partition_keys(arrow_table: pa.Table, partition_cols: List[str]) -> List[Tuple[str, ...]]:
+        """Partition key of every row"""
+        return list(zip(*(arrow_table.column(column).to_pylist() for column in partition_cols)))
+
+    @staticmethod
+    def _file_key(root_path: str, path: str, partition_cols: List[str]) -> Tuple[str, ...]:
+        """Partition key of an exported file from its column=value directories"""
+        parts = dict(unquote(part).split('=', 1) for part in
+                     os.path.relpath(os.path.dirname(path), root_path).split(os.sep) if '=' in part)
+        return tuple(parts.get(column, '') for column in partition_cols)
+
+    def _refresh_changed(self, table: str, root_path: str, last_id: int, since: int) -> int:
+        """Rewrite the partitions holding exported rows changed after change number since
+
+        The partitions the exported copies are in and those the rows belong to now
+        are rewritten from the database, so a reclassified row moves to its new
+        crisis_type partition. New files are written before the old ones are
+        deleted; an interrupted refresh leaves duplicates that the next run removes.
+        Returns the number of changed rows.
+        """
+        config = EXPORT_TABLES[table]
+        partition_cols = config['partition_cols']
+        changed = self._fetch_where(table, f"{config['change_column']} > ? AND id <= ?", (since, last_id))
+        if not changed or not os.path.isdir(root_path):
+            return len(changed)
+
+        keys = set(self._partition_keys(self._rows_to_table(table, changed), partition_cols))
+        changed_ids = pa.array([row[0] for row in changed], pa.int64())
+        files = {fragment.path: self._file_key(root_path, fragment.path, partition_cols)
+                 for fragment in ds.dataset(root_path, format='parquet').get_fragments()}
+        for path, key in files.items():
+            if key not in keys and pc.any(pc.is_in(pq.read_table(path, columns=['id']).column('id'),
+                                                   value_set=changed_ids)).as_py():
+                keys.add(key)
+        old_files = [path for path, key in files.items() if key in keys]
+
+        # Narrow the scan by crisis type; rows are then matched on every partition column
+        condition, params = 'id <= ?', (last_id,)
+        if 'crisis_type' in partition_cols:
+            types = sorted({key[partition_cols.index('crisis_type')] for key in keys})
+            condition += " AND COALESCE(NULLIF(crisis_type, ''), 'unknown') IN ({})".format(', '.join('?' * len(types)))
+            params += tuple(types)
+        rows = self._fetch_where(table, condition, params)
+        if rows:
+            arrow_table = self._rows_to_table(table, rows)
+            mask = pa.array([key in keys for key in self._partition_keys(arrow_table, partition_cols)])
+            pq.write_to_dataset(
+                arrow_table.filter(mask),
+                root_path=root_path,
+                partition_cols=partition_cols,
+                # Unique per run, so no file listed above is overwritten
+                basename_template=f'refresh-{time.time_ns()}-{{i}}.parquet',
+                existing_data_behavior='overwrite_or_ignore'
+            )
+
+        for path in old_files:
+            os.remove(path)
+            directory = os.path.dirname(path)
+            while directory != root_path and os.path.isdir(directory) and not os.listdir(directory):
+                os.rmdir(directory)
+                directory = os.path.dirname(directory)
+        return len(changed)
+
+    def _rows_to_table(self, table: str, rows: List[Tuple]) -> pa.Table:
+        """Convert SQLite rows to an Arrow table with partition columns"""
+        config = EXPORT_TABLES[table]
+        df = pd.DataFrame.from_records(rows, columns=config['columns'])
+
+        ts = df[config['timestamp_column']].fillna('').astype(str)
+        df['month'] = ts.str.slice(0, 7).where(ts.str.len() >= 7, 'unknown')
+
+        if 'crisis_type' in config['partition_cols']:
+            df['crisis_type'] = df['crisis_type'].fillna('unknown').replace('', 'unknown')
+        for bool_col in ('is_verified', 'is_active'):
+            if bool_col in df.columns:
+                df[bool_col] = df[bool_col].astype('boolean')
+
+        return pa.Table.from_pandas(df, schema=EXPORT_SCHEMAS[table], preserve_index=False)
+
+    def export_table(self, table: str) -> int:
+        """Export new rows of a table since the last run, returns rows written
+
+        Rows already exported that were changed in place since the last run are
+        refreshed first; they are not counted as written.
+        """
+        if table not in EXPORT_TABLES:
+            raise ValueError(f"Unsupported export table: {table}")
+
+        last_id = int(self.state.get(table, 0))
+        root_path = os.path.join(self.output_dir, table)
+        exported = 0
+
+        try:
+            if EXPORT_TABLES[table].get('change_column'):
+                # Read before refreshing, so changes made meanwhile are refreshed next run
+                max_change = self._max_change(table)
+                refreshed = self._refresh_changed(table, root_path, last_id,
+                                                  int(self.state.get(f"{table}:changes", 0)))
+                if refreshed:
+                    logger.info(f"Refreshed {refreshed} changed rows of {table}")
+                self.state[f"{table}:changes"] = max_change
+                self._save_state()
+
+            for rows in self._fetch_batches(table, last_id):
+                arrow_table = self._rows_to_table(table, rows)
+                first_id, batch_last_id = rows[0][0], rows[-1][0]
+
+                # Unique basename per batch so incremental runs only add files
+                pq.write_to_dataset(
+                    arrow_table,
+                    root_path=root_path,
+                    partition_cols=EXPORT_TABLES[table]['partition_cols'],
+                    basename_template=f'part-{first_id}-{batch_last_id}-{{i}}.parquet',
+                    existing_data_behavior='overwrite_or_ignore'
+                )
+
+                exported += len(rows)
+                self.state[table] = batch_last_id
+                self._save_state()
+
+            logger.info(f"Exported {exported} rows from {table} to {root_path}")
+
+        except Exception as e:
+            logger.error(f"Error exporting {table}: {str(e)}")
+
+        return exported
+
+    def export_all(self, tables: Optional[List[str]] = None) -> Dict[str, int]:
+        """Export all configured tables incrementally"""
+        results = {}
+        for table in tables or list(EXPORT_TABLES.keys()):
+            results[table] = self.export_table(table)
+        return results
+
+
+def read_crisis_history(output_dir: str = 'exports', crisis_type: str = None,
+                        start_month: str = None, end_month: str = None,
+                        columns: List[str] = None) -> pd.DataFrame:
+    """Read exported crisis events, pruning partitions by crisis type and month range"""
+    filters = []
+    if crisis_type:
+        filters.append(('crisis_type', '=', crisis_type))
+    if start_month:
+        filters.append(('month', '>=', start_month))
+    if end_month:
+        filters.append(('month', '<=', end_month))
+
+    return pd.read_parquet(
+        os.path.join(output_dir, 'crisis_data'),
+        engine='pyarrow',
+        columns=columns,
+        filters=filters or None
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export CrisisRadar history to partitioned Parquet")
+    parser.add_argument('--db', default=DEFAULT_DB_PATH, help="SQLite database to export from")
+    parser.add_argument('--output', default='exports', help="Output directory for the Parquet dataset")
+    parser.add_argument('--tables', nargs='*', choices=list(EXPORT_TABLES.keys()),
+                        help="Tables to export (default: all)")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    exporter = ParquetExporter(args.db, args.output, args.batch_size)
+    print(json.dumps(exporter.export_all(args.tables), indent=2))
@@ -0,0 +1,469 @@
+import time
+import queue
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Iterable, Iterator
+import logging
+
+from models import Article, CrisisEvent
+from dedup import StoryCluster
+from enrichment import ArticleEnricher
+from normalization import NormalizedText
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Marks the end of the stream in a stage's input queue
+_END = object()
+
+
+class Stage:
+    def __init__(self, name: str, fn: Callable[[List[Any]], List[Any]], workers: int = 1,
+                 batch_size: int = 1, linger: float = 0.05):
+        """A pipeline step: fn maps a batch of items to the items passed downstream
+
+        Each of the workers takes up to batch_size items, waiting at most linger
+        seconds for a batch to fill, so items never sit waiting for a full batch.
+        """
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.batch_size = batch_size
+        self.linger = linger
+
+
+class StagedPipeline:
+    def __init__(self, stages: List[Stage], queue_size: int = 256):
+        """Threads per stage connected by bounded queues
+
+        A full queue blocks the stage feeding it, so a slow stage holds back its
+        upstream instead of letting work pile up in memory.
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self._stats_lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _record(self, stage: str, **values):
+        with self._stats_lock:
+            stats = self._stats.setdefault(stage, defaultdict(float))
+            for key, value in values.items():
+                stats[key] += value
+
+    @staticmethod
+    def _take(source: queue.Queue, batch_size: int, linger: float):
+        """Up to batch_size items; returns (items, ended)"""
+        item = source.get()
+        if item is _END:
+            return [], True
+
+        items = [item]
+        deadline = time.monotonic() + linger
+        while len(items) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = source.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _END:
+                return items, True
+            items.append(item)
+        return items, False
+
+    def run(self, sources: List[Callable[[], Iterable[Any]]],
+            on_error: Callable[[str, List[Any]], None] = None) -> List[Any]:
+        """Fetch from all sources concurrently and push items through the stages
+
+        Sources return lists or generators; items enter the first stage as soon as
+        their source produces them. A batch whose stage raises is dropped and passed
+        to on_error with the stage name. Returns what the last stage emits.
+        """
+        self._stats = {}
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        results: List[Any] = []
+        results_lock = threading.Lock()
+        live_workers = [stage.workers for stage in self.stages]
+        live_lock = threading.Lock()
+
+        def worker(index: int):
+            stage = self.stages[index]
+            downstream = queues[index + 1] if index + 1 < len(self.stages) else None
+            ended = False
+            while not ended:
+                items, ended = self._take(queues[index], stage.batch_size, stage.linger)
+                if not items:
+                    continue
+
+                started = time.perf_counter()
+                try:
+                    output = stage.fn(items) or []
+                    errors = 0
+                except Exception as e:
+                    logger.error(f"Pipeline stage {stage.name} failed on {len(items)} items: {e}")
+                    output, errors = [], 1
+                    if on_error is not None:
+                        # A failing hook must not end the worker, or the stream never ends
+                        try:
+                            on_error(stage.name, items)
+                        except Exception as hook_error:
+                            logger.error(f"Pipeline error hook failed for stage {stage.name}: {hook_error}")
+                self._record(stage.name, items_in=len(items), items_out=len(output), batches=1,
+                             errors=errors, seconds=time.perf_counter() - started)
+
+                if downstream is None:
+                    with results_lock:
+                        results.extend(output)
+                else:
+                    for item in output:
+                        downstream.put(item)
+
+            # The last worker of a stage ends the stream for the next stage
+            with live_lock:
+                live_workers[index] -= 1
+                last = live_workers[index] == 0
+            if last and downstream is not None:
+                for _ in range(self.stages[index + 1].workers):
+                    downstream.put(_END)
+
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for number in range(stage.workers):
+                thread = threading.Thread(target=worker, args=(index,), daemon=True,
+                                          name=f'pipeline-{stage.name}-{number}')
+                thread.start()
+                threads.append(thread)
+
+        def feed(source: Callable[[], Iterable[Any]]) -> int:
+            # Iterated, so paginated sources hand on each page as it arrives
+            started = time.perf_counter()
+            count = 0
+            try:
+                for item in source() or []:
+                    queues[0].put(item)
+                    count += 1
+            except Exception as e:
+                logger.error(f"Pipeline source {getattr(source, '__name__', 'source')} failed: {e}")
+            self._record('fetch', items_out=count, batches=1, seconds=time.perf_counter() - started)
+            return count
+
+        with ThreadPoolExecutor(max_workers=max(1, len(sources)), thread_name_prefix='pipeline-fetch') as pool:
+            list(pool.map(feed, sources))
+
+        for _ in range(self.stages[0].workers):
+            queues[0].put(_END)
+        for thread in threads:
+            thread.join()
+
+        return results
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Items in and out, batches, errors and busy seconds per stage of the last run"""
+        with self._stats_lock:
+            return {
+                name: {key: round(value, 4) for key, value in stats.items()}
+                for name, stats in self._stats.items()
+            }
+
+
+class PipelineItem:
+    """One story on its way from dedupe to alert"""
+    __slots__ = ('cluster', 'text', 'analysis', 'computed', 'version', 'enriched', 'event')
+
+    def __init__(self, cluster: StoryCluster, text: str):
+        self.cluster = cluster
+        self.text = text
+        self.analysis: Optional[Dict[str, Any]] = None
+        self.computed = False
+        # Analysis cache version read before classifying, under which a computed result is stored
+        self.version: Optional[str] = None
+        # Title, description and fetched article body, for enriched items
+        self.enriched: Optional[NormalizedText] = None
+        self.event: Optional[CrisisEvent] = None
+
+    @property
+    def article(self) -> Article:
+        return self.cluster.representative
+
+
+class CrisisIngestion:
+    def __init__(self, system, queue_size: int = 256, translate_workers: int = 4,
+                 classify_batch_size: int = 32, store_batch_size: int = 50,
+                 enrich_workers: int = 4, enrich_below: float = 0.7):
+        """Streaming news ingestion for a CrisisRadarSystem
+
+        fetch -> normalize -> filter -> dedupe -> classify -> enrich -> geocode ->
+        translate -> store -> alert. The cheap crisis filter runs before dedupe so
+        only candidate stories are signed and indexed. Enrichment fetches the full
+        article only for low-confidence stories: those the keyword rules and
+        lexicons could not decide, or classified below enrich_below.
+        Enrichment and translation are network bound and get several workers;
+        classification and storage work in batches.
+        """
+        self.system = system
+        self.enricher = ArticleEnricher(system.http)
+        self.enrich_below = enrich_below
+        self.pipeline = StagedPipeline([
+            Stage('normalize', self.normalize, batch_size=64),
+            Stage('filter', self.filter, batch_size=64),
+            Stage('dedupe', self.dedupe, batch_size=64),
+            Stage('classify', self.classify, batch_size=classify_batch_size),
+            Stage('enrich', self.enrich, workers=enrich_workers),
+            Stage('geocode', self.geocode, batch_size=classify_batch_size),
+            Stage('translate', self.translate, workers=translate_workers),
+            Stage('store', self.store, batch_size=store_batch_size, linger=0.25),
+            Stage('alert', self.alert, batch_size=store_batch_size, linger=0.25),
+        ], queue_size)
+
+    def sources(self) -> Dict[str, Callable[[], Iterable[Article]]]:
+        """News collectors by the api_name their calls are metered under"""
+        system = self.system
+        return {
+            'MediaStack': system._collect_mediastack_data,
+            'NewsData.io': system._collect_newsdata_data,
+            'RSS': system._collect_rss_data,
+            'NewsAPI': system._collect_newsapi_data
+        }
+
+    @staticmethod
+    def _tagged(name: str, collect: Callable[[], Iterable[Article]]) -> Callable[[], Iterator[Article]]:
+        """Collector that marks its articles with the source name, so yield can be attributed"""
+        def fetch():
+            for article in collect() or []:
+                article.api_source = article.api_source or name
+                yield article
+        fetch.__name__ = name
+        return fetch
+
+    def run(self, force: bool = False) -> List[CrisisEvent]:
+        """Poll the sources that are due (all of them with force) and ingest their articles"""
+        sources = self.sources()
+        scheduler = self.system.scheduler
+        names = list(sources) if force else scheduler.due(list(sources))
+        if not names:
+            logger.info("No news source is due for polling")
+            return []
+
+        usage = scheduler.usage()
+        events = self._run([self._tagged(name, sources[name]) for name in names])
+        logger.info(f"Ingestion pipeline stages: {self.pipeline.get_stats()}")
+        logger.info(f"Article enrichment: {self.enricher.get_stats()}")
+        logger.info(f"Seen filter: {self.system.seen_items.get_stats()}")
+
+        after = scheduler.usage()
+        new_items = {name: 0 for name in names}
+        for event in events:
+            if event.api_source in new_items:
+                new_items[event.api_source] += 1
+        scheduler.record_polls(new_items, {name: after.get(name, 0) - usage.get(name, 0) for name in names})
+        return events
+
+    def ingest(self, articles: List[Article]) -> List[CrisisEvent]:
+        """Run articles pushed by partners through the same stages, outside the polling schedule"""
+        return self._run([lambda: articles])
+
+    def _run(self, sources: List[Callable[[], Iterable[Article]]]) -> List[CrisisEvent]:
+        """Run the stages, then add the articles that were handled to the seen filter
+
+        Articles are handled once a stage decided to drop them or they were stored.
+        Articles in a batch whose stage failed before storing, and the copies of
+        their stories, are left out, so the next cycle fetches them again.
+        """
+        fetched: List[Article] = []
+        failed_ids, failed_urls = set(), set()
+        lock = threading.Lock()
+
+        def tracked(source):
+            def fetch():
+                for article in source() or []:
+                    with lock:
+                        fetched.append(article)
+                    yield article
+            fetch.__name__ = getattr(source, '__name__', 'source')
+            return fetch
+
+        def on_error(stage: str, items: List[Any]):
+            lost = []
+            with lock:
+                for item in items:
+                    if isinstance(item, PipelineItem):
+                        if item.cluster.event_id is not None:
+                            continue
+                        lost.append(item.cluster)
+                        failed_urls.update(item.cluster.urls)
+                        item = item.cluster.representative
+                    if item is not None:
+                        failed_ids.add(id(item))
+            self.system.deduplicator.discard(lost)
+
+        events = self.pipeline.run([tracked(source) for source in sources], on_error)
+
+        handled = defaultdict(list)
+        for article in fetched:
+            if article.seen_key and id(article) not in failed_ids and article.url not in failed_urls:
+                source, key = article.seen_key
+                handled[source].append(key)
+        seen = self.system.seen_items
+        for source, keys in handled.items():
+            seen.add(source, keys)
+        seen.flush()
+        return events
+
+    def normalize(self, articles: List[Article]) -> List[Article]:
+        """Trim text, build the normalized views every later stage reads and drop
+        articles without a title"""
+        kept = []
+        for article in articles:
+            article.title = (article.title or '').strip()
+            article.description = (article.description or '').strip()
+            if article.title and article.normalized:
+                kept.append(article)
+        return kept
+
+    def filter(self, articles: List[Article]) -> List[Article]:
+        return [article for article in articles if self.system._is_crisis_related(article.normalized)]
+
+    def dedupe(self, articles: List[Article]) -> List[PipelineItem]:
+        """One item per new story; later copies corroborate stored rows"""
+        system = self.system
+        clusters, corroborated = system.deduplicator.deduplicate(articles)
+        system.db.add_corroborating_sources(corroborated)
+        return [PipelineItem(cluster, system._analysis_text(cluster.representative)) for cluster in clusters]
+
+    def classify(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        """Reuse cached analyses; classify the rest through the cascade as one batch"""
+        system = self.system
+        version = system.analysis_cache.version
+        cached = system.analysis_cache.get_many([item.text for item in items], version)
+        misses = [item for item in items if item.text not in cached]
+        results = system.classifier.classify_batch([item.article.normalized for item in misses])
+
+        for item, crisis_info in zip(misses, results):
+            if crisis_info is not None:
+                item.analysis = {
+                    'crisis_type': crisis_info['type'],
+                    'severity': crisis_info['severity'],
+                    'confidence': crisis_info['confidence'],
+                    'keywords': crisis_info['keywords'],
+                    'stage': crisis_info['stage']
+                }
+                item.computed = True
+                item.version = version
+
+        for item in items:
+            if item.text in cached:
+                item.analysis = cached[item.text]
+        system.deduplicator.discard(item.cluster for item in items if item.analysis is None)
+        return [item for item in items if item.analysis is not None]
+
+    def enrich(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        """Classify low-confidence stories again with the full article body
+
+        The snippet from the API is often too short for a confident type or a
+        severity; the result with the body replaces it unless it is less confident.
+        """
+        for item in items:
+            article = item.article
+            if (not item.computed or not article.url or not article.fetchable
+                    or not self._low_confidence(item.analysis)):
+                continue
+            body = self.enricher.fetch_body(article.url)
+            if not body:
+                continue
+
+            article.text = body
+            item.enriched = NormalizedText(f"{article.full_text} {body}")
+            result = self.system.classifier.classify(item.enriched)
+            if result is not None and result['confidence'] >= item.analysis['confidence']:
+                item.analysis.update(crisis_type=result['type'], severity=result['severity'],
+                                     confidence=result['confidence'], keywords=result['keywords'],
+                                     stage=result['stage'])
+        return items
+
+    def _low_confidence(self, analysis: Dict[str, Any]) -> bool:
+        return analysis.get('stage') in ('model', 'fallback') or analysis['confidence'] < self.enrich_below
+
+    def geocode(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        """Locate from the title and description, falling back to the article body"""
+        for item in items:
+            if item.computed:
+                location = self.system._extract_location(item.article.normalized)
+                if location is None and item.enriched is not None:
+                    location = self.system._extract_location(item.enriched)
+                latitude, longitude = self.system._get_coordinates(location)
+                item.analysis.update(location=location or 'India', latitude=latitude, longitude=longitude)
+        return items
+
+    def translate(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        """Detect the language and translate title and description to English
+
+        Untranslated articles store None, so cached results do not overwrite the
+        article's own text.
+        """
+        processor = self.system.language_processor
+        for item in items:
+            if item.computed:
+                article = item.article
+                language = processor.detect_language(article.normalized)
+                title = description = None
+                if language != 'English':
+                    title = processor.translate_text(article.title, 'English')
+                    description = processor.translate_text(article.description, 'English')
+                item.analysis.update(language=language, title=title, description=description)
+        return items
+
+    def store(self, items: List[PipelineItem]) -> List[PipelineItem]:
+        """Persist a batch; later copies of these stories then corroborate the stored rows"""
+        system = self.system
+        for item in items:
+            item.event = self._build_event(item)
+
+        # Raises if the write fails, so the batch is reported to on_error and fetched again
+        system.db.store_crisis_data([item.event for item in items], raise_errors=True)
+        for item in items:
+            if item.event.id is not None:
+                system.deduplicator.mark_stored(item.cluster, item.event.id)
+        # Not stored (already stored today under the same title); later copies start a new cluster
+        system.deduplicator.discard(item.cluster for item in items if item.event.id is None)
+        computed = defaultdict(list)
+        for item in items:
+            if item.computed:
+                computed[item.version].append((item.text, item.analysis))
+        for version, results in computed.items():
+            system.analysis_cache.put_many(results, version)
+        return [item for item in items if item.event.id is not None]
+
+    def alert(self, items: List[PipelineItem]) -> List[CrisisEvent]:
+        """Fold stored reports into incidents and alert on new or escalated ones"""
+        system = self.system
+        events = [item.event for item in items]
+        changes = system.incident_tracker.ingest(events)
+        system.sms_alerter.send_incident_alerts(changes)
+        return events
+
+    @staticmethod
+    def _build_event(item: PipelineItem) -> CrisisEvent:
+        article, analysis = item.article, item.analysis
+        event = CrisisEvent.from_article(
+            article,
+            title=analysis['title'] or article.title,
+            description=analysis['description'] or article.description,
+            crisis_type=analysis['crisis_type'],
+            severity=analysis['severity'],
+            confidence=analysis['confidence'],
+            location=analysis['location'],
+            latitude=analysis['latitude'],
+            longitude=analysis['longitude'],
+            detected_keywords=', '.join(analysis['keywords']),
+            original_language=analysis['language'],
+            corroborating_sources=', '.join(item.cluster.corroborating_sources)
+        )
+
+        # The source-language text is only kept when translation changed it
+        if event.title != article.title:
+            event.original_title = article.title
+        if event.description != article.description:
+            event.original_description = article.description
+        return event
@@ -0,0 +1,420 @@
+import os
+import re
+import sys
+import json
+import time
+import copy
+import shutil
+import argparse
+import tempfile
+import threading
+from html import escape
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Dict, Any, Optional, Tuple
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import logging
+
+logging.basicConfig(level=logging.WARNING)
+logger = logging.getLogger(__name__)
+
+# Query parameters holding credentials; never written to disk
+SECRET_PARAMS = {'access_key', 'apikey', 'apiKey', 'api_key'}
+
+# Query parameter distinguishing the copies of an item replayed at volume
+REPLICA_PARAM = 'replay'
+
+# JSON news APIs: (list of items in the response, field identifying an item)
+NEWS_FORMATS = {
+    'MediaStack': ('data', 'url'),
+    'NewsData.io': ('results', 'link'),
+    'NewsAPI': ('articles', 'url')
+}
+
+# Environment variables the collectors need set before they call a source
+KEY_ENV = ('MEDIASTACK_KEY', 'NEWSDATA_KEY', 'NEWSAPI_KEY', 'WEATHERSTACK_KEY')
+
+
+def redact_url(url: str) -> str:
+    """URL with credential query parameters blanked and the replica marker removed"""
+    parts = urlsplit(url)
+    query = [(key, 'REDACTED' if key in SECRET_PARAMS else value)
+             for key, value in parse_qsl(parts.query, keep_blank_values=True) if key != REPLICA_PARAM]
+    return parts._replace(query=urlencode(query), fragment='').geturl()
+
+
+def _replica_url(url: str, number: int) -> str:
+    parts = urlsplit(url)
+    query = f"{parts.query}&" if parts.query else ''
+    return parts._replace(query=f"{query}{REPLICA_PARAM}={number}").geturl()
+
+
+def _slug(name: str) -> str:
+    return re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_').lower() or 'source'
+
+
+class ResponseRecorder:
+    def __init__(self, directory: str):
+        """Append raw upstream responses to one JSONL file per API under directory
+
+        Each line holds recorded_at, api, the redacted URL, status, content type and
+        the body text. The HTTP client calls record() for every response when a
+        recorder is attached (CRISIS_RECORD_DIR).
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.recorded = 0
+
+    def record(self, api_name: str, url: str, response):
+        line = json.dumps({
+            'recorded_at': time.time(),
+            'api': api_name,
+            'url': redact_url(url),
+            'status': response.status_code,
+            'content_type': response.headers.get('Content-Type', ''),
+            'body': response.text
+        }, ensure_ascii=False)
+        with self._lock:
+            with open(os.path.join(self.directory, f"{_slug(api_name)}.jsonl"), 'a', encoding='utf-8') as f:
+                f.write(line + '\n')
+            self.recorded += 1
+
+
+def load_recordings(directory: str) -> List[Dict[str, Any]]:
+    """Every recorded response in directory, oldest first"""
+    recordings = []
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.jsonl'):
+            with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                recordings.extend(json.loads(line) for line in f if line.strip())
+    recordings.sort(key=lambda recording: recording['recorded_at'])
+    return recordings
+
+
+def _route_key(url: str) -> str:
+    """host/path a response was recorded under and a replayed request arrives at"""
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}".rstrip('/')
+
+
+def _response_key(url: str) -> str:
+    """Route key and redacted, sorted query of a request served as recorded
+
+    The scheme is left out: the HTTP client routes https and http upstreams alike
+    as /<host>/<path>, so the mock cannot tell which one a request was meant for.
+    """
+    query = urlencode(sorted(parse_qsl(urlsplit(redact_url(url)).query, keep_blank_values=True)))
+    return f"{_route_key(url)}?{query}" if query else _route_key(url)
+
+
+def _feed_items(body: str) -> List[Dict[str, Any]]:
+    import feedparser
+
+    return [{
+        'title': entry.get('title', ''),
+        'link': entry.get('link', ''),
+        'summary': entry.get('summary', entry.get('description', '')),
+        'published': entry.get('published', '')
+    } for entry in feedparser.parse(body).entries]
+
+
+def _render_feed(title: str, items: List[Dict[str, Any]]) -> str:
+    entries = ''.join(
+        f"<item><title>{escape(item['title'])}</title><link>{escape(item['link'])}</link>"
+        f"<guid>{escape(item['link'])}</guid><description>{escape(item['summary'])}</description>"
+        f"<pubDate>{escape(item['published'])}</pubDate></item>"
+        for item in items
+    )
+    return (f'<?xml version="1.0" encoding="utf-8"?><rss version="2.0"><channel>'
+            f'<title>{escape(title)}</title>{entries}</channel></rss>')
+
+
+class ReplayCorpus:
+    def __init__(self, recordings: List[Dict[str, Any]], volume: int = 1, speed: float = None):
+        """Recorded responses re-served as a live, paginated upstream
+
+        News items (API results and RSS entries) from all recordings of a source are
+        merged into one newest-first stream, each item dated by the first recording
+        it appeared in, and repeated volume times under distinct URLs. With speed
+        the stream is released on an accelerated clock, speed recorded seconds per
+        real second from the first recording; without it everything is visible at
+        once. Other responses, such as weather and article pages, are served as
+        recorded.
+        """
+        self.volume = max(1, volume)
+        self.speed = speed
+        self.routes: Dict[str, str] = {}
+        self.pools: Dict[str, List[Tuple[float, Dict[str, Any]]]] = defaultdict(list)
+        self.responses: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.first_recorded = recordings[0]['recorded_at'] if recordings else time.time()
+        self.started = time.monotonic()
+
+        seen = set()
+        for recording in recordings:
+            if recording.get('status') != 200:
+                continue
+            api = recording['api']
+            self.routes[_route_key(recording['url'])] = api
+            self.responses[_response_key(recording['url'])].append(recording)
+
+            items, key = self._items(api, recording['body'])
+            for item in items:
+                if not item.get(key) or (api, item[key]) in seen:
+                    continue
+                seen.add((api, item[key]))
+                for copy_number in range(self.volume):
+                    replica = copy.deepcopy(item) if copy_number else item
+                    if copy_number:
+                        replica[key] = _replica_url(item[key], copy_number)
+                    self.pools[api].append((recording['recorded_at'], replica))
+
+        # Newest recording first; items keep the order the source listed them in
+        for pool in self.pools.values():
+            pool.sort(key=lambda entry: entry[0], reverse=True)
+
+    @staticmethod
+    def _items(api: str, body: str) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        try:
+            if api in NEWS_FORMATS:
+                items_key, key = NEWS_FORMATS[api]
+                return json.loads(body).get(items_key) or [], key
+            if api.startswith('RSS'):
+                return _feed_items(body), 'link'
+        except Exception as e:
+            logger.warning(f"Unreadable {api} recording: {e}")
+        return [], None
+
+    def clock(self) -> float:
+        """Recorded time the replay has reached"""
+        if not self.speed:
+            return float('inf')
+        return self.first_recorded + (time.monotonic() - self.started) * self.speed
+
+    def visible(self, api: str) -> List[Dict[str, Any]]:
+        now = self.clock()
+        return [item for recorded_at, item in self.pools.get(api, ()) if recorded_at <= now]
+
+    def respond(self, url: str) -> Tuple[int, str, str]:
+        """(status, content type, body) for a request addressed to the upstream url"""
+        api = self.routes.get(_route_key(url))
+        query = dict(parse_qsl(urlsplit(url).query))
+
+        if api == 'MediaStack':
+            items = self.visible(api)
+            offset, limit = int(query.get('offset', 0)), int(query.get('limit', 25))
+            page = items[offset:offset + limit]
+            return 200, 'application/json', json.dumps({
+                'pagination': {'limit': limit, 'offset': offset, 'count': len(page), 'total': len(items)},
+                'data': page
+            })
+        if api == 'NewsData.io':
+            items = self.visible(api)
+            offset, size = int(query.get('page') or 0), int(query.get('size', 10))
+            page = items[offset:offset + size]
+            more = offset + size < len(items)
+            return 200, 'application/json', json.dumps({
+                'status': 'success', 'totalResults': len(items), 'results': page,
+                'nextPage': str(offset + size) if more else None
+            })
+        if api == 'NewsAPI':
+            items = self.visible(api)
+            size = int(query.get('pageSize', 100))
+            offset = (int(query.get('page', 1)) - 1) * size
+            return 200, 'application/json', json.dumps({
+                'status': 'ok', 'totalResults': len(items), 'articles': items[offset:offset + size]
+            })
+        if api and api.startswith('RSS'):
+            return 200, 'application/rss+xml; charset=utf-8', _render_feed(api, self.visible(api))
+
+        # Served as recorded: the latest recording of this exact request released so far
+        now = self.clock()
+        recorded = [recording for recording in self.responses.get(_response_key(url), ())
+                    if recording['recorded_at'] <= now]
+        if not recorded:
+            return 404, 'text/plain', 'not recorded'
+        content_type = recorded[-1].get('content_type', '').split(';')[0] or 'text/plain'
+        return 200, f"{content_type}; charset=utf-8", recorded[-1]['body']
+
+
+class MockUpstream:
+    def __init__(self, corpus: ReplayCorpus, host: str = '127.0.0.1', port: int = 0, latency: float = 0.0):
+        """Local HTTP server answering for every upstream recorded in corpus
+
+        Requests arrive as /<upstream host>/<path>?<query>, which is how the HTTP
+        client rewrites upstream URLs when its base_url (CRISIS_UPSTREAM_URL) is
+        set. latency adds a fixed delay per response.
+        """
+        self.corpus = corpus
+        self.latency = latency
+        self.requests = 0
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                status, content_type, body = server.corpus.respond(f"http:/{self.path}")
+                data = body.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True, name='mock-upstream')
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _system(base_url: str = None, recorder: ResponseRecorder = None):
+    """A CrisisRadarSystem whose HTTP client talks to base_url and/or records"""
+    from http_client import get_http_client
+
+    client = get_http_client()
+    client.base_url = base_url
+    client.recorder = recorder
+    if base_url:
+        for name in KEY_ENV:
+            os.environ.setdefault(name, 'replay')
+
+    from crisis_radar_production import CrisisRadarSystem
+
+    system = CrisisRadarSystem()
+    if base_url:
+        # Never text subscribers about replayed stories
+        system.sms_alerter.client = None
+    return system
+
+
+def record(directory: str, cycles: int = 1, interval: float = 900.0) -> int:
+    """Poll every source live for cycles collection cycles, recording the responses"""
+    recorder = ResponseRecorder(directory)
+    system = _system(recorder=recorder)
+    for cycle in range(cycles):
+        if cycle:
+            time.sleep(interval)
+        system.collect_crisis_data(force=True)
+        system.collect_weather_data(force=True)
+    system.telemetry.flush()
+    return recorder.recorded
+
+
+def benchmark(directory: str, cycles: int = 3, volume: int = 10, speed: float = None,
+              interval: float = 0.0, latency: float = 0.0) -> Dict[str, Any]:
+    """Run collection cycles against the recordings served by a local mock upstream
+
+    Returns the items fetched, events produced, wall time and per-stage pipeline
+    statistics of each cycle.
+    """
+    recordings = load_recordings(directory)
+    corpus = ReplayCorpus(recordings, volume, speed)
+    upstream = MockUpstream(corpus, latency=latency)
+    system = _system(base_url=upstream.start())
+
+    report = {
+        'recordings': len(recordings),
+        'items_per_source': {api: len(pool) for api, pool in sorted(corpus.pools.items())},
+        'volume': corpus.volume,
+        'speed': speed,
+        'latency': latency,
+        'cycles': []
+    }
+    try:
+        for cycle in range(cycles):
+            if cycle and interval:
+                time.sleep(interval)
+            requests_before = upstream.requests
+            started = time.perf_counter()
+            events = system.collect_crisis_data(force=True)
+            seconds = time.perf_counter() - started
+            stats = system.ingestion.pipeline.get_stats()
+            fetched = stats.get('fetch', {}).get('items_out', 0)
+            report['cycles'].append({
+                'requests': upstream.requests - requests_before,
+                'fetched': int(fetched),
+                'events': len(events),
+                'seconds': round(seconds, 3),
+                'items_per_sec': round(fetched / seconds, 1) if seconds else None,
+                'stages': stats
+            })
+    finally:
+        upstream.stop()
+        system.telemetry.flush()
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record upstream responses and replay them from a local mock server")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    recorder_args = commands.add_parser('record', help="Poll all sources live and record their responses")
+    recorder_args.add_argument('--dir', default='recordings', help="Directory of JSONL recordings")
+    recorder_args.add_argument('--cycles', type=int, default=1, help="Collection cycles to record")
+    recorder_args.add_argument('--interval', type=float, default=900.0, help="Seconds between cycles")
+
+    serve_args = commands.add_parser('serve', help="Serve recordings as a mock upstream until interrupted")
+    bench_args = commands.add_parser('bench', help="Benchmark collection end to end against the recordings")
+    for sub in (serve_args, bench_args):
+        sub.add_argument('--dir', default='recordings', help="Directory of JSONL recordings")
+        sub.add_argument('--volume', type=int, default=1, help="Copies of every recorded news item")
+        sub.add_argument('--speed', type=float, help="Recorded seconds replayed per second (default: all at once)")
+        sub.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    serve_args.add_argument('--port', type=int, default=8765)
+    bench_args.add_argument('--cycles', type=int, default=3)
+    bench_args.add_argument('--interval', type=float, default=0.0, help="Seconds between cycles")
+    bench_args.add_argument('--db', help="Scratch database the benchmark writes to, deleted first "
+                                         "(default: a temporary file)")
+    bench_args.add_argument('--output', help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        print(f"Recorded {record(args.dir, args.cycles, args.interval)} responses to {args.dir}")
+    elif args.command == 'serve':
+        upstream = MockUpstream(ReplayCorpus(load_recordings(args.dir), args.volume, args.speed),
+                                port=args.port, latency=args.latency)
+        print(f"Replaying {args.dir} at {upstream.url}; run the app with CRISIS_UPSTREAM_URL={upstream.url}")
+        try:
+            upstream.httpd.serve_forever()
+        except KeyboardInterrupt:
+            upstream.stop()
+    else:
+        # Every run starts from an empty database and model registry: a seen filter or
+        # dedup index left by an earlier run would make the sources return nothing new.
+        # Set before the database and registry modules are imported, so replayed
+        # stories stay out of the real database and the real models are not replaced
+        scratch = tempfile.mkdtemp(prefix='crisis-replay-')
+        db_path = args.db or os.path.join(scratch, 'replay_bench.db')
+        for path in (db_path, f"{db_path}-wal", f"{db_path}-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+        os.environ['CRISIS_DB_PATH'] = db_path
+        os.environ['CRISIS_MODEL_DIR'] = os.path.join(scratch, 'models')
+        try:
+            report = json.dumps(benchmark(args.dir, args.cycles, args.volume, args.speed, args.interval,
+                                          args.latency), indent=2, sort_keys=True)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                f.write(report + '\n')
+        else:
+            sys.stdout.write(report + '\n')
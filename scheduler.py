@@ -0,0 +1,181 @@
+import os
+import time
+import calendar
+import threading
+from typing import List, Dict, Any, Optional
+import logging
+
+from database import CrisisDatabase, get_database
+from telemetry import ApiTelemetry
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Free-tier calls per month; override with e.g. MEDIASTACK_MONTHLY_QUOTA. None means unmetered.
+DEFAULT_QUOTAS = {
+    'MediaStack': 100,
+    'NewsData.io': 6000,
+    'NewsAPI': 3000,
+    'Weatherstack': 100,
+    'RSS': None
+}
+_QUOTA_ENV = {
+    'MediaStack': 'MEDIASTACK_MONTHLY_QUOTA',
+    'NewsData.io': 'NEWSDATA_MONTHLY_QUOTA',
+    'NewsAPI': 'NEWSAPI_MONTHLY_QUOTA',
+    'Weatherstack': 'WEATHERSTACK_MONTHLY_QUOTA'
+}
+
+# Interval multipliers: quiet sources slow down to QUIET_FACTOR times the even-spend
+# interval, productive sources and open high-severity incidents speed up to ACTIVE_FACTOR
+QUIET_FACTOR = 2.0
+ACTIVE_FACTOR = 0.25
+
+# Weight of the latest poll in the new-item yield average
+YIELD_ALPHA = 0.3
+
+
+def month_bounds(now: float = None):
+    """Start of the current UTC month as a SQLite timestamp, and seconds until the next month"""
+    now = time.time() if now is None else now
+    current = time.gmtime(now)
+    start = f"{current.tm_year:04d}-{current.tm_mon:02d}-01 00:00:00"
+    year, month = (current.tm_year + 1, 1) if current.tm_mon == 12 else (current.tm_year, current.tm_mon + 1)
+    next_month = calendar.timegm((year, month, 1, 0, 0, 0))
+    return start, next_month - now
+
+
+def _quota(source: str, default: Optional[int]) -> Optional[int]:
+    value = os.getenv(_QUOTA_ENV.get(source, ''), '')
+    return int(value) if value.strip().isdigit() else default
+
+
+class PollingScheduler:
+    def __init__(self, db: CrisisDatabase = None, telemetry: ApiTelemetry = None,
+                 quotas: Dict[str, Optional[int]] = None, min_interval: float = 300,
+                 max_interval: float = 6 * 3600, unmetered_interval: float = 900,
+                 active_window_hours: int = 6):
+        """Quota-aware polling intervals per upstream source
+
+        A metered source's base interval spreads its remaining monthly quota evenly
+        over the rest of the month, using the measured calls per poll (Weatherstack
+        makes one call per city). The base is scaled by activity: sources whose
+        recent polls found no new stories slow down, productive ones speed up, and
+        every source polls at the fastest rate while a high-severity incident is
+        open. Spending faster during a crisis shrinks the remaining quota, which
+        lengthens the base interval afterwards, so the quota still lasts the month.
+
+        State lives in the poll_schedule table, so dashboard sessions and collector
+        processes sharing the database share one schedule.
+        """
+        self.db = db or get_database()
+        self.telemetry = telemetry
+        self.quotas = {
+            source: _quota(source, default)
+            for source, default in {**DEFAULT_QUOTAS, **(quotas or {})}.items()
+        }
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.unmetered_interval = unmetered_interval
+        self.active_window_hours = active_window_hours
+        self._lock = threading.Lock()
+
+    def usage(self) -> Dict[str, int]:
+        """Calls per source so far this month, including buffered telemetry"""
+        if self.telemetry is not None:
+            self.telemetry.flush()
+        start, _ = month_bounds()
+        return self.db.count_api_calls_since(start)
+
+    def crisis_active(self) -> bool:
+        """Whether a high-severity incident was reported within the active window"""
+        return any(incident.severity == 'high'
+                   for incident in self.db.get_open_incidents(self.active_window_hours))
+
+    def activity_factor(self, yield_ewma: float, crisis_active: bool) -> float:
+        """Interval multiplier: QUIET_FACTOR with no recent yield, falling towards ACTIVE_FACTOR"""
+        if crisis_active:
+            return ACTIVE_FACTOR
+        return max(ACTIVE_FACTOR, QUIET_FACTOR / (1.0 + yield_ewma))
+
+    def interval(self, source: str, state: Dict[str, Any] = None, usage: Dict[str, int] = None,
+                 crisis_active: bool = None, now: float = None) -> Optional[float]:
+        """Seconds until the next poll of a source; None once its monthly quota is spent"""
+        state = state if state is not None else self.db.get_poll_schedule().get(source, {})
+        crisis_active = self.crisis_active() if crisis_active is None else crisis_active
+        factor = self.activity_factor(state.get('yield_ewma') or 0.0, crisis_active)
+
+        quota = self.quotas.get(source)
+        if quota is None:
+            return max(self.min_interval, min(self.unmetered_interval * factor, self.max_interval))
+
+        usage = self.usage() if usage is None else usage
+        _, seconds_left = month_bounds(now)
+        polls_left = (quota - usage.get(source, 0)) / max(state.get('cost_per_poll') or 1.0, 1.0)
+        if polls_left < 1:
+            return None
+
+        even = seconds_left / polls_left
+        # Quiet periods never stretch the interval past max_interval, unless the
+        # quota itself allows no more
+        return max(self.min_interval, min(even * factor, max(even, self.max_interval)))
+
+    def due(self, sources: List[str], now: float = None) -> List[str]:
+        """Sources whose next poll time has passed; unknown sources are due immediately"""
+        now = time.time() if now is None else now
+        schedule = self.db.get_poll_schedule()
+        return [source for source in sources
+                if (schedule.get(source) or {}).get('next_due_at', 0) <= now]
+
+    def record_polls(self, new_items: Dict[str, int], calls: Dict[str, int] = None, now: float = None):
+        """Update yield and cost per poll of the polled sources and schedule their next poll
+
+        calls are the quota calls each poll made, measured as the change in usage().
+        """
+        now = time.time() if now is None else now
+        calls = calls or {}
+        with self._lock:
+            schedule = self.db.get_poll_schedule()
+            usage = self.usage()
+            crisis_active = self.crisis_active()
+
+            for source, found in new_items.items():
+                state = dict(schedule.get(source) or {})
+                previous = state.get('yield_ewma')
+                state['yield_ewma'] = found if previous is None else \
+                    YIELD_ALPHA * found + (1 - YIELD_ALPHA) * previous
+                if calls.get(source, 0) > 0:
+                    previous_cost = state.get('cost_per_poll')
+                    state['cost_per_poll'] = calls[source] if previous_cost is None else \
+                        YIELD_ALPHA * calls[source] + (1 - YIELD_ALPHA) * previous_cost
+
+                interval = self.interval(source, state, usage, crisis_active, now)
+                next_due = now + interval if interval is not None else now + month_bounds(now)[1]
+                self.db.save_poll_schedule(
+                    source, next_due, interval or 0.0, state['yield_ewma'],
+                    state.get('cost_per_poll') or 1.0, found
+                )
+                if interval is None:
+                    logger.warning(f"{source} monthly quota spent; next poll at the start of next month")
+                else:
+                    logger.info(f"Next {source} poll in {interval / 60:.0f} min "
+                                f"({found} new, yield {state['yield_ewma']:.2f}/poll)")
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Quota, usage and schedule per source for display"""
+        now = time.time()
+        schedule = self.db.get_poll_schedule()
+        usage = self.usage()
+        status = {}
+        for source, quota in self.quotas.items():
+            state = schedule.get(source) or {}
+            status[source] = {
+                'quota': quota,
+                'used': usage.get(source, 0) if quota is not None else None,
+                'remaining': max(quota - usage.get(source, 0), 0) if quota is not None else None,
+                'interval_minutes': round((state.get('interval_seconds') or 0) / 60, 1),
+                'next_poll_in_minutes': round(max((state.get('next_due_at') or 0) - now, 0) / 60, 1),
+                'yield_per_poll': round(state.get('yield_ewma') or 0.0, 2),
+                'polls': state.get('polls', 0)
+            }
+        return status
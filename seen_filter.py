@@ -0,0 +1,184 @@
+import re
+import math
+import time
+import hashlib
+import threading
+from typing import List, Dict, Any, Optional, Iterable
+from urllib.parse import urlsplit, parse_qsl, urlencode
+import logging
+
+from database import CrisisDatabase, get_database, or_bytes
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Query parameters that vary between shares of the same article
+_TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|ref|ref_src|cmpid|ocid|ito|__twitter_impression)$', re.I)
+
+
+def canonical_url(url: str) -> str:
+    """Scheme-less URL with host, path and query normalized; other keys (GUIDs, titles) lowercased
+
+    http and https, a leading www., default ports, a trailing slash, the fragment,
+    tracking parameters and query parameter order do not change the result.
+    """
+    url = (url or '').strip()
+    if '://' not in url:
+        return ' '.join(url.lower().split())
+    parts = urlsplit(url)
+    host = parts.hostname or ''
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(key)
+    ))
+    path = parts.path.rstrip('/') or '/'
+    return f"{host}{path}?{query}" if query else f"{host}{path}"
+
+
+class _Generation:
+    __slots__ = ('created_at', 'items', 'bits')
+
+    def __init__(self, created_at: float, items: int, bits: bytearray):
+        self.created_at = created_at
+        self.items = items
+        self.bits = bits
+
+
+class SeenFilter:
+    def __init__(self, db: CrisisDatabase = None, capacity: int = 100_000, error_rate: float = 0.001,
+                 generations: int = 4, rotate_after: float = 7 * 86400):
+        """Persistent rotating Bloom filter of the items already read from each source
+
+        Keys are (source, canonical URL or GUID). New keys go into the newest of
+        several generations; a lookup checks all of them. A new generation starts
+        once the newest holds capacity keys or is rotate_after seconds old, and the
+        oldest is dropped, so memory stays at generations Bloom filters (about 180 KB
+        each with the defaults) however long the system runs, while items are
+        remembered for roughly (generations - 1) * rotate_after. A false positive,
+        at most error_rate per generation checked, drops one new item.
+
+        The generations are merged into the seen_filter table by flush(), so a restart
+        does not re-read and re-process everything the sources still list, and
+        processes sharing the database do not erase each other's keys.
+        """
+        self.db = db or get_database()
+        self.capacity = capacity
+        self.max_generations = generations
+        self.rotate_after = rotate_after
+        self.num_bits = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._params = f"{self.num_bits}:{self.num_hashes}"
+
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._generations: List[_Generation] = self._load()
+        if not self._generations:
+            self._generations.append(self._new_generation(time.time()))
+
+    def _new_generation(self, now: float) -> _Generation:
+        return _Generation(now, 0, bytearray((self.num_bits + 7) // 8))
+
+    def _load(self) -> List[_Generation]:
+        try:
+            rows = self.db.get_seen_filter()
+        except Exception as e:
+            logger.error(f"Could not load the seen filter: {e}")
+            return []
+        # Generations sized for other parameters cannot be read; start over
+        return [_Generation(row['created_at'], row['items'], bytearray(row['bits']))
+                for row in rows if row['params'] == self._params][-self.max_generations:]
+
+    def _positions(self, source: str, key: str) -> List[int]:
+        digest = hashlib.blake2b(f"{source}\n{canonical_url(key)}".encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        step = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * step) % self.num_bits for i in range(self.num_hashes)]
+
+    @staticmethod
+    def _contains(generation: _Generation, positions: List[int]) -> bool:
+        bits = generation.bits
+        return all(bits[position >> 3] & (1 << (position & 7)) for position in positions)
+
+    def is_seen(self, source: str, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        positions = self._positions(source, key)
+        with self._lock:
+            return any(self._contains(generation, positions) for generation in self._generations)
+
+    def add(self, source: str, keys: Iterable[Optional[str]]):
+        now = time.time()
+        hashed = [self._positions(source, key) for key in keys if key]
+        with self._lock:
+            for positions in hashed:
+                current = self._generations[-1]
+                if current.items >= self.capacity or now - current.created_at >= self.rotate_after:
+                    current = self._new_generation(now)
+                    self._generations = (self._generations + [current])[-self.max_generations:]
+                if self._contains(current, positions):
+                    continue
+                for position in positions:
+                    current.bits[position >> 3] |= 1 << (position & 7)
+                current.items += 1
+                self._dirty = True
+
+    def flush(self):
+        """Merge the generations into the stored filter if keys were added since the last flush
+
+        Keys other processes stored in the meantime are taken over into this filter.
+        """
+        with self._lock:
+            if not self._dirty:
+                return
+            rows = [(number, generation.created_at, generation.items, self._params, bytes(generation.bits))
+                    for number, generation in enumerate(self._generations)]
+            self._dirty = False
+        try:
+            merged = self.db.save_seen_filter(rows, self.max_generations)
+        except Exception as e:
+            logger.error(f"Could not store the seen filter: {e}")
+            with self._lock:
+                self._dirty = True
+            return
+
+        with self._lock:
+            generations = {generation.created_at: generation for generation in self._generations}
+            for row in merged:
+                if row['params'] != self._params:
+                    continue
+                generation = generations.get(row['created_at'])
+                if generation is None:
+                    generations[row['created_at']] = _Generation(row['created_at'], row['items'],
+                                                                 bytearray(row['bits']))
+                    continue
+                # Keys added here while the merge was written stay in our bits
+                generation.bits = or_bytes(generation.bits, row['bits'])
+                generation.items = max(generation.items, row['items'])
+            self._generations = sorted(generations.values(),
+                                       key=lambda generation: generation.created_at)[-self.max_generations:]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'generations': len(self._generations),
+                'items': sum(generation.items for generation in self._generations),
+                'bytes': sum(len(generation.bits) for generation in self._generations),
+                'newest_items': self._generations[-1].items
+            }
+
+
+_filters: Dict[int, SeenFilter] = {}
+_filters_lock = threading.Lock()
+
+
+def get_seen_filter(db: CrisisDatabase = None) -> SeenFilter:
+    """Return the process-wide seen filter for a database, shared by all collectors"""
+    db = db or get_database()
+    with _filters_lock:
+        if id(db) not in _filters:
+            _filters[id(db)] = SeenFilter(db)
+        return _filters[id(db)]
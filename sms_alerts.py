@@ -1,16 +1,17 @@
 import os
 from twilio.rest import Client
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple, Union
 import logging
 from datetime import datetime, timedelta
 from utils import calculate_distance, get_coordinates
-import sqlite3
+from database import CrisisDatabase, get_database
+from models import CrisisEvent, WeatherAlert, Incident
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SMSAlerter:
-    def __init__(self):
+    def __init__(self, db: CrisisDatabase = None):
         """Initialize SMS alerter with Twilio credentials"""
         self.account_sid = os.getenv("TWILIO_ACCOUNT_SID")
         self.auth_token = os.getenv("TWILIO_AUTH_TOKEN")
@@ -22,8 +23,8 @@ class SMSAlerter:
             logger.warning("Twilio credentials not found")
             self.client = None
         
-        # Initialize user database
-        self._init_user_database()
+        # Subscribers and sent alerts live in the shared crisis database
+        self.db = db or get_database()
         
         # SMS templates for different languages
         self.sms_templates = {
@@ -45,45 +46,6 @@ class SMSAlerter:
             }
         }
     
-    def _init_user_database(self):
-        """Initialize SQLite database for user registrations"""
-        try:
-            conn = sqlite3.connect('sms_users.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sms_users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    phone_number TEXT UNIQUE NOT NULL,
-                    latitude REAL,
-                    longitude REAL,
-                    alert_radius INTEGER DEFAULT 50,
-                    language TEXT DEFAULT 'English',
-                    crisis_types TEXT DEFAULT 'all',
-                    registered_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    active BOOLEAN DEFAULT TRUE
-                )
-            ''')
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS sent_alerts (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    phone_number TEXT NOT NULL,
-                    alert_type TEXT NOT NULL,
-                    crisis_type TEXT,
-                    location TEXT,
-                    sent_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    message_sid TEXT
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
-            logger.info("User database initialized")
-            
-        except Exception as e:
-            logger.error(f"Error initializing user database: {str(e)}")
-    
     def register_user(self, phone_number: str, alert_radius: int = 50, location: str = None, 
                      language: str = 'English', crisis_types: List[str] = None) -> bool:
         """Register user for SMS alerts"""
@@ -102,17 +64,9 @@ class SMSAlerter:
                 crisis_types_str = ','.join(crisis_types)
             
             # Store in database
-            conn = sqlite3.connect('sms_users.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT OR REPLACE INTO sms_users 
-                (phone_number, latitude, longitude, alert_radius, language, crisis_types)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (phone_number, latitude, longitude, alert_radius, language, crisis_types_str))
-            
-            conn.commit()
-            conn.close()
+            if not self.db.register_sms_user(phone_number, location, latitude, longitude,
+                                             alert_radius, language, crisis_types_str):
+                return False
             
             # Send welcome message
             self._send_welcome_message(phone_number, language)
@@ -124,7 +78,7 @@ class SMSAlerter:
             logger.error(f"Error registering user: {str(e)}")
             return False
     
-    def send_crisis_alert(self, crisis_data: Dict[str, Any]) -> List[str]:
+    def send_crisis_alert(self, crisis_data: Union[CrisisEvent, Incident]) -> List[str]:
         """Send crisis alerts to relevant users"""
         if not self.client:
             logger.warning("Twilio client not available")
@@ -156,7 +110,8 @@ class SMSAlerter:
                     )
                     
                     # Log sent alert
-                    self._log_sent_alert(phone_number, 'crisis', crisis_data, message_obj.sid)
+                    self._log_sent_alert(phone_number, 'crisis', crisis_data.crisis_type,
+                                         crisis_data.location, message_obj.sid)
                     sent_to.append(phone_number)
                     
                     logger.info(f"Crisis alert sent to {phone_number}")
@@ -170,7 +125,18 @@ class SMSAlerter:
             logger.error(f"Error sending crisis alerts: {str(e)}")
             return []
     
-    def send_weather_alert(self, weather_data: Dict[str, Any]) -> List[str]:
+    def send_incident_alerts(self, changes: List[Tuple[Incident, str]]) -> Dict[int, List[str]]:
+        """Alert subscribers about incidents that were just opened or escalated
+
+        Follow-up reports on a known incident do not trigger another SMS.
+        """
+        sent = {}
+        for incident, change in changes:
+            if change in ('new', 'escalated'):
+                sent[incident.id] = self.send_crisis_alert(incident)
+        return sent
+    
+    def send_weather_alert(self, weather_data: WeatherAlert) -> List[str]:
         """Send weather alerts to relevant users"""
         if not self.client:
             logger.warning("Twilio client not available")
@@ -198,7 +164,8 @@ class SMSAlerter:
                     )
                     
                     # Log sent alert
-                    self._log_sent_alert(phone_number, 'weather', weather_data, message_obj.sid)
+                    self._log_sent_alert(phone_number, 'weather', weather_data.alert_type,
+                                         weather_data.city, message_obj.sid)
                     sent_to.append(phone_number)
                     
                     logger.info(f"Weather alert sent to {phone_number}")
@@ -212,31 +179,17 @@ class SMSAlerter:
             logger.error(f"Error sending weather alerts: {str(e)}")
             return []
     
-    def _get_relevant_users(self, crisis_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _get_relevant_users(self, crisis_data: Union[CrisisEvent, Incident]) -> List[Dict[str, Any]]:
         """Get users who should receive this crisis alert"""
         try:
-            conn = sqlite3.connect('sms_users.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM sms_users WHERE active = TRUE')
-            all_users = cursor.fetchall()
-            conn.close()
+            all_users = self.db.get_active_sms_users()
             
             relevant_users = []
-            crisis_lat = crisis_data.get('latitude', 20.5937)
-            crisis_lon = crisis_data.get('longitude', 78.9629)
-            crisis_type = crisis_data.get('crisis_type', '')
+            crisis_lat = crisis_data.latitude
+            crisis_lon = crisis_data.longitude
+            crisis_type = crisis_data.crisis_type
             
-            for user_row in all_users:
-                user = {
-                    'phone_number': user_row[1],
-                    'latitude': user_row[2],
-                    'longitude': user_row[3],
-                    'alert_radius': user_row[4],
-                    'language': user_row[5],
-                    'crisis_types': user_row[6]
-                }
-                
+            for user in all_users:
                 # Check if user wants this type of crisis
                 if user['crisis_types'] != 'all':
                     user_crisis_types = user['crisis_types'].split(',')
@@ -262,30 +215,16 @@ class SMSAlerter:
             logger.error(f"Error getting relevant users: {str(e)}")
             return []
     
-    def _get_relevant_users_weather(self, weather_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def _get_relevant_users_weather(self, weather_data: WeatherAlert) -> List[Dict[str, Any]]:
         """Get users who should receive weather alerts"""
         try:
-            conn = sqlite3.connect('sms_users.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT * FROM sms_users WHERE active = TRUE')
-            all_users = cursor.fetchall()
-            conn.close()
+            all_users = self.db.get_active_sms_users()
             
             relevant_users = []
-            weather_lat = weather_data.get('latitude', 20.5937)
-            weather_lon = weather_data.get('longitude', 78.9629)
+            weather_lat = weather_data.latitude
+            weather_lon = weather_data.longitude
             
-            for user_row in all_users:
-                user = {
-                    'phone_number': user_row[1],
-                    'latitude': user_row[2],
-                    'longitude': user_row[3],
-                    'alert_radius': user_row[4],
-                    'language': user_row[5],
-                    'crisis_types': user_row[6]
-                }
-                
+            for user in all_users:
                 # Check distance for weather alerts (smaller radius)
                 if user['latitude'] and user['longitude']:
                     distance = calculate_distance(
@@ -305,44 +244,32 @@ class SMSAlerter:
             logger.error(f"Error getting relevant users for weather: {str(e)}")
             return []
     
-    def _create_crisis_message(self, crisis_data: Dict[str, Any], language: str = 'English') -> str:
+    def _create_crisis_message(self, crisis_data: Union[CrisisEvent, Incident], language: str = 'English') -> str:
         """Create crisis alert message"""
         template = self.sms_templates.get(language, self.sms_templates['English'])['crisis_alert']
         
         return template.format(
-            crisis_type=crisis_data.get('crisis_type', 'Unknown').title(),
-            location=crisis_data.get('location', 'Unknown'),
-            severity=crisis_data.get('severity', 'Unknown').title()
+            crisis_type=(crisis_data.crisis_type or 'Unknown').title(),
+            location=crisis_data.location or 'Unknown',
+            severity=(crisis_data.severity or 'Unknown').title()
         )
     
-    def _create_weather_message(self, weather_data: Dict[str, Any], language: str = 'English') -> str:
+    def _create_weather_message(self, weather_data: WeatherAlert, language: str = 'English') -> str:
         """Create weather alert message"""
         template = self.sms_templates.get(language, self.sms_templates['English'])['weather_alert']
         
         return template.format(
-            weather_type=weather_data.get('type', 'Weather Alert'),
-            location=weather_data.get('city', 'Unknown'),
-            description=weather_data.get('description', 'Check local weather')
+            weather_type=weather_data.label,
+            location=weather_data.city or 'Unknown',
+            description=weather_data.description or 'Check local weather'
         )
     
-    def _should_send_alert(self, phone_number: str, crisis_data: Dict[str, Any]) -> bool:
+    def _should_send_alert(self, phone_number: str, crisis_data: Union[CrisisEvent, Incident]) -> bool:
         """Check if we should send alert to avoid spam"""
         try:
-            conn = sqlite3.connect('sms_users.db')
-            cursor = conn.cursor()
-            
             # Check if similar alert sent in last 2 hours
-            two_hours_ago = datetime.now() - timedelta(hours=2)
-            
-            cursor.execute('''
-                SELECT COUNT(*) FROM sent_alerts 
-                WHERE phone_number = ? AND crisis_type = ? AND location = ? 
-                AND sent_at > ?
-            ''', (phone_number, crisis_data.get('crisis_type'), 
-                  crisis_data.get('location'), two_hours_ago))
-            
-            count = cursor.fetchone()[0]
-            conn.close()
+            count = self.db.count_recent_alerts(phone_number, crisis_data.crisis_type,
+                                                crisis_data.location, hours=2)
             
             return count == 0
             
@@ -350,21 +277,11 @@ class SMSAlerter:
             logger.error(f"Error checking alert history: {str(e)}")
             return True  # Send if unsure
     
-    def _log_sent_alert(self, phone_number: str, alert_type: str, data: Dict[str, Any], message_sid: str):
+    def _log_sent_alert(self, phone_number: str, alert_type: str, crisis_type: str,
+                        location: str, message_sid: str):
         """Log sent alert to database"""
         try:
-            conn = sqlite3.connect('sms_users.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                INSERT INTO sent_alerts 
-                (phone_number, alert_type, crisis_type, location, message_sid)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (phone_number, alert_type, data.get('crisis_type', data.get('type')), 
-                  data.get('location', data.get('city')), message_sid))
-            
-            conn.commit()
-            conn.close()
+            self.db.log_sent_alert(phone_number, alert_type, crisis_type, location, message_sid)
             
         except Exception as e:
             logger.error(f"Error logging sent alert: {str(e)}")
@@ -396,12 +313,8 @@ class SMSAlerter:
     def unregister_user(self, phone_number: str) -> bool:
         """Unregister user from SMS alerts"""
         try:
-            conn = sqlite3.connect('sms_users.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('UPDATE sms_users SET active = FALSE WHERE phone_number = ?', (phone_number,))
-            conn.commit()
-            conn.close()
+            if not self.db.deactivate_sms_user(phone_number):
+                return False
             
             logger.info(f"User {phone_number} unregistered from SMS alerts")
             return True
@@ -413,21 +326,7 @@ class SMSAlerter:
     def get_user_stats(self) -> Dict[str, int]:
         """Get statistics about registered users"""
         try:
-            conn = sqlite3.connect('sms_users.db')
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT COUNT(*) FROM sms_users WHERE active = TRUE')
-            active_users = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM sent_alerts WHERE DATE(sent_at) = DATE("now")')
-            alerts_today = cursor.fetchone()[0]
-            
-            conn.close()
-            
-            return {
-                'active_users': active_users,
-                'alerts_sent_today': alerts_today
-            }
+            return self.db.get_sms_user_stats()
             
         except Exception as e:
             logger.error(f"Error getting user stats: {str(e)}")
@@ -0,0 +1,146 @@
+import time
+import atexit
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional
+from urllib.parse import urlsplit
+import logging
+
+from database import CrisisDatabase, get_database
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class ApiCall:
+    """Measurements for one outbound request, filled in while the request runs"""
+    __slots__ = ('api_name', 'endpoint', 'started', 'timestamp', 'status_code',
+                 'bytes_received', 'items_returned', 'error_message')
+
+    def __init__(self, api_name: str, endpoint: str = None):
+        self.api_name = api_name
+        self.endpoint = endpoint
+        self.started = time.perf_counter()
+        self.timestamp = time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime())
+        self.status_code = None
+        self.bytes_received = 0
+        self.items_returned = 0
+        self.error_message = None
+
+    def set_response(self, response):
+        """Capture status and payload size from a requests response"""
+        self.status_code = response.status_code
+        self.bytes_received = len(response.content or b'')
+        if response.status_code >= 400:
+            self.error_message = f"HTTP {response.status_code}"
+
+
+def _endpoint_of(url: str) -> str:
+    """Strip the query string so API keys never reach the usage log"""
+    if not url:
+        return None
+    parts = urlsplit(url)
+    return f"{parts.netloc}{parts.path}" if parts.netloc else parts.path
+
+
+class ApiTelemetry:
+    def __init__(self, db: CrisisDatabase = None, flush_interval: float = 5.0,
+                 batch_size: int = 200, max_buffer: int = 10000):
+        """Buffer API usage records in memory and write them in batches from a background thread"""
+        self.db = db or get_database()
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        # Oldest records are dropped if the writer falls far behind
+        self._buffer = deque(maxlen=max_buffer)
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+
+        self._thread = threading.Thread(target=self._run, name='api-telemetry-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    @contextmanager
+    def track(self, api_name: str, url: str = None):
+        """Time an outbound call and record latency, status, bytes and items returned"""
+        call = ApiCall(api_name, _endpoint_of(url))
+        try:
+            yield call
+        except Exception as e:
+            call.error_message = f"{type(e).__name__}: {str(e)}"[:500]
+            raise
+        finally:
+            self._enqueue(call)
+
+    def record(self, api_name: str, endpoint: str = None, status_code: int = None,
+               response_time: float = None, bytes_received: int = 0, items_returned: int = 0,
+               error_message: str = None):
+        """Buffer a usage record measured elsewhere"""
+        self._buffer.append((
+            api_name, _endpoint_of(endpoint), time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime()),
+            status_code, response_time, bytes_received, items_returned, error_message
+        ))
+        self._maybe_wake()
+
+    def _enqueue(self, call: ApiCall):
+        """Turn a finished call into a buffered row"""
+        self._buffer.append((
+            call.api_name, call.endpoint, call.timestamp, call.status_code,
+            round(time.perf_counter() - call.started, 4), call.bytes_received,
+            call.items_returned, call.error_message
+        ))
+        self._maybe_wake()
+
+    def _maybe_wake(self):
+        """Wake the writer early once a full batch is waiting"""
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write all buffered records, returns the number written"""
+        with self._flush_lock:
+            written = 0
+            while self._buffer:
+                batch = []
+                while self._buffer and len(batch) < self.batch_size:
+                    batch.append(self._buffer.popleft())
+                self.db.log_api_usage_batch(batch)
+                written += len(batch)
+            return written
+
+    def _run(self):
+        """Background loop flushing on an interval or when a batch fills up"""
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing API telemetry: {str(e)}")
+
+    def close(self):
+        """Stop the writer thread and flush what is left"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wake.set()
+        self._thread.join(timeout=self.flush_interval)
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing API telemetry on shutdown: {str(e)}")
+
+
+_telemetry: Dict[int, ApiTelemetry] = {}
+_telemetry_lock = threading.Lock()
+
+
+def get_telemetry(db: CrisisDatabase = None) -> ApiTelemetry:
+    """Return the process-wide telemetry writer for a database"""
+    db = db or get_database()
+    with _telemetry_lock:
+        if id(db) not in _telemetry:
+            _telemetry[id(db)] = ApiTelemetry(db)
+        return _telemetry[id(db)]
@@ -7,6 +7,8 @@ import re
 import requests
 import logging
 
+from features import get_feature_extractor, severity_scores
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -205,32 +207,7 @@ def extract_numbers_from_text(text: str) -> list:
     if not text:
         return []
     
-    # Find numbers that might indicate severity
-    patterns = [
-        r'(\d+)\s*(dead|killed|died|deaths?)',
-        r'(\d+)\s*(injured|hurt|wounded)',
-        r'(\d+)\s*(missing|displaced|evacuated)',
-        r'(\d+)\s*(houses?|buildings?|homes?)\s*(destroyed|damaged|collapsed)',
-        r'magnitude\s*(\d+\.?\d*)',
-        r'(\d+)\s*(kmph|km/h|mph)\s*(wind|speed)',
-        r'(\d+)\s*(mm|cm|inches?)\s*(rain|rainfall|precipitation)'
-    ]
-    
-    numbers = []
-    text_lower = text.lower()
-    
-    for pattern in patterns:
-        matches = re.findall(pattern, text_lower)
-        for match in matches:
-            try:
-                if isinstance(match, tuple):
-                    numbers.append(float(match[0]))
-                else:
-                    numbers.append(float(match))
-            except ValueError:
-                continue
-    
-    return numbers
+    return get_feature_extractor().extract(text).numbers
 
 def validate_phone_number(phone_number: str) -> bool:
     """Validate Indian phone number format"""
@@ -287,43 +264,11 @@ def get_crisis_severity_score(text: str, numbers: list = None) -> float:
     if not text:
         return 0.0
     
-    text_lower = text.lower()
-    score = 0.0
-    
-    # High severity keywords
-    high_severity = ['catastrophic', 'devastating', 'massive', 'severe', 'extreme', 'major', 'critical', 'emergency', 'disaster']
-    for keyword in high_severity:
-        if keyword in text_lower:
-            score += 0.3
-    
-    # Medium severity keywords
-    medium_severity = ['moderate', 'significant', 'considerable', 'notable', 'substantial', 'serious']
-    for keyword in medium_severity:
-        if keyword in text_lower:
-            score += 0.2
-    
-    # Action keywords that indicate severity
-    action_keywords = ['evacuate', 'rescue', 'emergency', 'alert', 'warning', 'declare']
-    for keyword in action_keywords:
-        if keyword in text_lower:
-            score += 0.1
-    
-    # Number-based severity
-    if numbers is None:
-        numbers = extract_numbers_from_text(text)
-    
-    if numbers:
-        max_number = max(numbers)
-        if max_number > 100:
-            score += 0.4
-        elif max_number > 50:
-            score += 0.3
-        elif max_number > 10:
-            score += 0.2
-        elif max_number > 0:
-            score += 0.1
+    features = get_feature_extractor().extract(text)
+    if numbers is not None:
+        features.numbers = list(numbers)
     
-    return min(score, 1.0)  # Cap at 1.0
+    return float(severity_scores([features])[0])
 
 def is_recent_news(published_date: str, hours_threshold: int = 24) -> bool:
     """Check if news is recent (within threshold hours)"""